@@ -2,3 +2,4 @@ HELP_ARGS = ["--help", "-h"]
 GUI_ARGS = ["--gui", "-g"]
 CONSOLE_ARGS = ["--console", "-c"]
 SETTINGS_ARGS = ["--settings", "-s"]
+QUERY_ARGS = ["--query", "-q"]
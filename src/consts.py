@@ -1,7 +1,10 @@
 SETTINGS_PATH = "data_storage/settings/settings.json"
+METRIC_STORE_PATH = "data_storage/metrics/metrics.bin"
+METRIC_LOG_PATH = "data_storage/metrics/log"
 
 DEFAULT_SETTINGS = {
     "cpu_percent_interval": 0.1,
+    "backend": "psutil",
     "video_format": "mp4",
     "fps": 30,
     "monitor_resolution": "1920x1080",
@@ -1 +1 @@
-from . import settings
+from . import metrics, settings
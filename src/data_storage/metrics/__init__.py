@@ -0,0 +1 @@
+from . import columnar_log, metric_store
@@ -0,0 +1,343 @@
+import logging
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+import consts
+
+COLUMN_SUFFIX = ".f64"
+TIMESTAMP_COLUMN = "timestamp"
+
+# Samples are buffered in memory and written in batches, one write() per column per batch.
+FLUSH_EVERY = 60
+
+# Rows older than RETENTION seconds are dropped. Trimming rewrites every column, so it only runs once the
+# log spans RETENTION + TRIM_SLACK seconds, i.e. about once per TRIM_SLACK.
+RETENTION = 7 * 86400
+TRIM_SLACK = 86400
+
+# Written before a trim and removed after it, so a trim interrupted by a crash is finished on the next open,
+# and readers know not to map the columns while some are trimmed and others are not.
+TRIM_JOURNAL = "trim.journal"
+
+# How long readers wait for a trim to finish before giving up, and how often they look.
+TRIM_WAIT = 30.0
+TRIM_POLL = 0.1
+
+_VALID_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class ColumnarLog:
+    """
+    An append-only, columnar on-disk log of metric samples.
+
+    Every metric is stored in its own file of little-endian doubles next to a timestamp column, so
+    a query only touches the columns it needs and can map them as arrays. Samples are buffered and
+    written in batches of FLUSH_EVERY rows. Rows older than `retention` seconds are dropped, so the
+    log does not grow forever.
+
+    Attributes:
+        directory (str): Directory holding one <metric>.f64 file per column.
+        rows (int): Number of rows written or buffered so far.
+
+    Methods:
+        append(timestamp: float, values: Dict[str, float]) -> None: Appends one row.
+        flush() -> None: Writes the buffered rows to disk.
+        close() -> None: Flushes and closes all column files.
+
+    Usage:
+        log = ColumnarLog(consts.METRIC_LOG_PATH)
+        log.append(time.time(), {"cpu": 12.5, "ram": 40.1})
+        log.close()
+
+    Notes:
+        - Timestamps must not go backwards, because queries binary-search the timestamp column.
+          Rows older than the last row are dropped.
+        - Columns that appear later are back-filled with NaN; on open, columns left uneven by a crash
+          are padded or truncated to the length of the timestamp column.
+        - Old rows are dropped by rewriting each column without them and renaming it into place; the
+          timestamp column is rewritten last. This copies the whole log, so it runs on a background
+          thread, and rows appended meanwhile stay buffered until it is done. Use open_columns() to
+          map columns consistently while a trim may be running.
+    """
+
+    def __init__(
+        self,
+        directory: str = consts.METRIC_LOG_PATH,
+        flush_every: int = FLUSH_EVERY,
+        retention: float = RETENTION,
+    ) -> None:
+        self.directory = directory
+        self.flush_every = flush_every
+        self.retention = retention
+        os.makedirs(directory, exist_ok=True)
+        self._finish_trim()
+
+        self.rows = self._stored_rows()
+        self._first_timestamp = self._read_timestamp(0)
+        self._last_timestamp = self._read_timestamp(self.rows - 1)
+        self._files: Dict[str, BinaryIO] = {}
+        self._buffers: Dict[str, array] = {}
+        self._buffered = 0
+        self._trimmer: Optional[threading.Thread] = None
+
+        for name in [TIMESTAMP_COLUMN] + list_columns(directory):
+            self._open_column(name, self.rows)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name + COLUMN_SUFFIX)
+
+    def _stored_rows(self) -> int:
+        path = self._path(TIMESTAMP_COLUMN)
+        return os.path.getsize(path) // 8 if os.path.isfile(path) else 0
+
+    def _read_timestamp(self, row: int) -> float:
+        if not 0 <= row < self.rows:
+            return -math.inf
+        with open(self._path(TIMESTAMP_COLUMN), "rb") as file:
+            file.seek(row * 8)
+            timestamp = array("d")
+            timestamp.frombytes(file.read(8))
+        return timestamp[0]
+
+    def _trim_column(self, name: str, rows: int, cut: int) -> None:
+        """Drops the first `cut` rows of a column that still holds `rows` rows."""
+        path = self._path(name)
+        if os.path.getsize(path) // 8 != rows:
+            # Already trimmed before an interrupted trim was resumed.
+            return
+        with open(path, "rb") as source, open(path + ".tmp", "wb") as target:
+            source.seek(cut * 8)
+            shutil.copyfileobj(source, target)
+        os.replace(path + ".tmp", path)
+
+    def _trim(self, rows: int, cut: int) -> None:
+        journal = os.path.join(self.directory, TRIM_JOURNAL)
+        with open(journal, "w") as file:
+            file.write(f"{rows} {cut}\n")
+        for name in list_columns(self.directory) + [TIMESTAMP_COLUMN]:
+            self._trim_column(name, rows, cut)
+        os.remove(journal)
+
+    def _finish_trim(self) -> None:
+        """Finishes a trim that was interrupted by a crash, before the columns are opened."""
+        try:
+            with open(os.path.join(self.directory, TRIM_JOURNAL)) as file:
+                rows, cut = (int(value) for value in file.read().split())
+        except (OSError, ValueError):
+            return
+        logging.info("Finishing an interrupted trim of the metric log %s", self.directory)
+        self._trim(rows, cut)
+
+    def _background_trim(self, rows: int, cut: int) -> None:
+        try:
+            self._trim(rows, cut)
+        except OSError:
+            # The journal is left behind; the trim is finished on the sampler thread in _trim_done().
+            logging.exception("Failed to trim the metric log %s", self.directory)
+
+    def _apply_retention(self) -> None:
+        """Starts dropping the rows older than the retention, once the log spans retention + TRIM_SLACK seconds."""
+        if self._trimmer is not None or self._last_timestamp - self._first_timestamp < self.retention + TRIM_SLACK:
+            return
+        timestamps = ColumnView(self._path(TIMESTAMP_COLUMN))
+        try:
+            cut = bisect_left(timestamps.values, self._last_timestamp - self.retention)
+        finally:
+            timestamps.close()
+        for file in self._files.values():
+            file.close()
+        self._trimmer = threading.Thread(
+            target=self._background_trim, args=(self.rows - self._buffered, cut), name="metric-log-trim", daemon=True
+        )
+        self._trimmer.start()
+
+    def _trim_done(self, wait: bool = False) -> bool:
+        """
+        Returns whether the column files can be written, reopening them once a background trim finished.
+
+        Args:
+            wait (bool): Wait for a running trim instead of returning False.
+        """
+        if self._trimmer is None:
+            return True
+        if self._trimmer.is_alive() and not wait:
+            return False
+        self._trimmer.join()
+        self._trimmer = None
+        # Redoes the trim if it failed; otherwise the journal is gone and this does nothing.
+        self._finish_trim()
+        stored = self._stored_rows()
+        self.rows = stored + self._buffered
+        self._first_timestamp = self._read_timestamp(0)
+        for name, file in self._files.items():
+            file.close()
+            # Columns created during the trim were padded to the old length; they only hold NaN.
+            self._files[name] = self._open_file(name, stored)
+        return True
+
+    def _open_file(self, name: str, rows: int) -> BinaryIO:
+        """Opens a column for appending, padding it with NaN or truncating it to `rows` rows."""
+        file = open(self._path(name), "a+b")
+        size = os.fstat(file.fileno()).st_size
+        length = min(size // 8, rows)
+        if size != length * 8:
+            file.truncate(length * 8)
+        if length < rows:
+            (array("d", [math.nan]) * (rows - length)).tofile(file)
+        return file
+
+    def _open_column(self, name: str, rows: int) -> None:
+        self._files[name] = self._open_file(name, rows)
+        self._buffers[name] = array("d", [math.nan]) * self._buffered
+
+    def append(self, timestamp: float, values: Dict[str, float]) -> None:
+        """
+        Appends one row. Metrics missing from `values` are stored as NaN.
+
+        Args:
+            timestamp (float): Wall-clock time of the sample (time.time()).
+            values (Dict[str, float]): Metric values by name.
+        """
+        if timestamp < self._last_timestamp:
+            return
+        if not self.rows:
+            self._first_timestamp = timestamp
+        self._last_timestamp = timestamp
+
+        for name in values.keys() - self._buffers.keys():
+            if not _VALID_NAME.match(name):
+                logging.warning("Skipping metric with an invalid name: %r", name)
+                continue
+            self._open_column(name, self.rows - self._buffered)
+
+        for name, buffer in self._buffers.items():
+            if name == TIMESTAMP_COLUMN:
+                buffer.append(timestamp)
+            else:
+                buffer.append(values.get(name, math.nan))
+
+        self.rows += 1
+        self._buffered += 1
+        if self._buffered >= self.flush_every:
+            self.flush()
+
+    def _write(self) -> None:
+        if not self._buffered:
+            return
+        # The timestamp column goes last, so a crash never leaves rows without values.
+        for name in sorted(self._buffers, key=lambda column: column == TIMESTAMP_COLUMN):
+            self._buffers[name].tofile(self._files[name])
+            self._files[name].flush()
+            del self._buffers[name][:]
+        self._buffered = 0
+
+    def flush(self) -> None:
+        """Writes the buffered rows to disk, one write per column, unless a trim is running."""
+        if not self._trim_done():
+            return
+        self._write()
+        self._apply_retention()
+
+    def close(self) -> None:
+        """Waits for a running trim, writes the buffered rows and closes all column files."""
+        self._trim_done(wait=True)
+        self._write()
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+
+def list_columns(directory: str = consts.METRIC_LOG_PATH) -> List[str]:
+    """
+    Returns the metric columns stored in a log directory.
+
+    Args:
+        directory (str): The log directory.
+
+    Returns:
+        List[str]: Metric names, without the timestamp column.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name[: -len(COLUMN_SUFFIX)]
+        for name in os.listdir(directory)
+        if name.endswith(COLUMN_SUFFIX) and name != TIMESTAMP_COLUMN + COLUMN_SUFFIX
+    )
+
+
+class ColumnView:
+    """
+    A read-only, memory-mapped view of one column of a ColumnarLog.
+
+    Attributes:
+        values (memoryview): The column as a flat view of doubles.
+
+    Methods:
+        close() -> None: Releases the view and unmaps the file.
+    """
+
+    def __init__(self, path: str, rows: Optional[int] = None) -> None:
+        self._map: Optional[mmap.mmap] = None
+        self.values = memoryview(b"").cast("d")
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size // 8 * 8
+            if rows is not None:
+                size = min(size, rows * 8)
+            if size:
+                self._map = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+                self.values = memoryview(self._map).cast("d")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def close(self) -> None:
+        """Releases the view and unmaps the file."""
+        self.values.release()
+        if self._map is not None:
+            self._map.close()
+
+
+def open_columns(directory: str, names: Sequence[str], wait: float = TRIM_WAIT) -> Tuple[ColumnView, List[ColumnView]]:
+    """
+    Maps the timestamp column and some metric columns of a log so that their rows line up.
+
+    A trim replaces the columns one by one, so a column mapped during a trim may already have lost
+    its oldest rows while the timestamp column has not. The columns are mapped only while no trim
+    journal exists, and mapped again if the timestamp column was replaced in the meantime.
+
+    Args:
+        directory (str): The log directory.
+        names (Sequence[str]): The metric columns to map.
+        wait (float): How long to wait for a running trim, in seconds.
+
+    Returns:
+        Tuple[ColumnView, List[ColumnView]]: The timestamp column and the metric columns, each
+        limited to the length of the timestamp column.
+
+    Raises:
+        TimeoutError: If a trim is still running after `wait` seconds.
+    """
+    journal = os.path.join(directory, TRIM_JOURNAL)
+    timestamp_path = os.path.join(directory, TIMESTAMP_COLUMN + COLUMN_SUFFIX)
+    deadline = time.monotonic() + wait
+    while True:
+        if not os.path.exists(journal):
+            inode = os.stat(timestamp_path).st_ino
+            timestamps = ColumnView(timestamp_path)
+            columns = [ColumnView(os.path.join(directory, name + COLUMN_SUFFIX), len(timestamps)) for name in names]
+            if not os.path.exists(journal) and os.stat(timestamp_path).st_ino == inode:
+                return timestamps, columns
+            for view in [timestamps] + columns:
+                view.close()
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"The metric log {directory} is being trimmed, try again later")
+        time.sleep(TRIM_POLL)
@@ -0,0 +1,264 @@
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Sequence
+
+import consts
+
+MAGIC = b"LSMSTORE"
+VERSION = 1
+
+# magic, version, field count, header size, record size, capacity, committed record count
+HEADER = struct.Struct("<8sHHIIIQ")
+COUNT_OFFSET = HEADER.size - 8
+COUNT = struct.Struct("<Q")
+FIELD_NAME_SIZE = 32
+
+# Every record starts with its 1-based sequence number and a wall-clock timestamp.
+RECORD_PREFIX = 2
+
+# One day of samples at one sample per second.
+DEFAULT_CAPACITY = 86400
+
+
+def _header_size(field_count: int) -> int:
+    return HEADER.size + FIELD_NAME_SIZE * field_count
+
+
+class MetricStoreError(Exception):
+    pass
+
+
+class MetricStore:
+    """
+    A crash-safe, fixed-size on-disk store of metric samples, written through mmap.
+
+    The file holds a header (format, field names, committed record count) followed by a ring of
+    fixed-size records of doubles: a sequence number, a wall-clock timestamp and one value per field.
+    Appending copies the values into the mapping with a single struct.pack_into call, so there is no
+    write() syscall or fsync per sample; the kernel writes the pages back on its own schedule and
+    they survive a crash or kill -9 of the monitor.
+
+    The sequence number of a ring slot is cleared before its values are overwritten, the new
+    sequence number is written after the values, and the committed count in the header after that.
+    A record that was being written when the process died therefore has no valid sequence number
+    and is ignored, so at most the in-flight record is lost.
+
+    Attributes:
+        path (str): Path of the store file.
+        fields (List[str]): Names of the stored metrics, in record order.
+        capacity (int): Number of records kept before the oldest is overwritten.
+
+    Methods:
+        append(timestamp: float, values: Dict[str, float]) -> None: Appends one record.
+        close() -> None: Flushes and unmaps the file.
+
+    Usage:
+        1. Open (or create) a store for a set of metrics:
+            store = MetricStore("data_storage/metrics/metrics.bin", ["cpu", "ram"])
+
+        2. Append samples:
+            store.append(time.time(), {"cpu": 12.5, "ram": 40.1})
+
+    Notes:
+        - If the file exists with a different layout (for example after a CPU count change), it is
+          recreated.
+        - Use MetricStoreReader to read the file, also from other processes.
+    """
+
+    def __init__(self, path: str, fields: Sequence[str], capacity: int = DEFAULT_CAPACITY) -> None:
+        self.path = path
+        self.fields = list(fields)
+        self.capacity = capacity
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._record = struct.Struct(f"<{len(self.fields) + RECORD_PREFIX}d")
+        self._values = struct.Struct(f"<{len(self.fields) + 1}d")
+        self._sequence = struct.Struct("<d")
+        self._header_size = _header_size(len(self.fields))
+        self._size = self._header_size + self._record.size * capacity
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644), "r+b")
+        if not self._matches_layout():
+            logging.info("Creating metric store %s", path)
+            self._initialize()
+        self._map: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), self._size)
+        self.count = self._recover_count()
+
+    def _expected_header(self) -> bytes:
+        """Returns the header without the committed record count, followed by the field names."""
+        fields = len(self.fields)
+        header = HEADER.pack(MAGIC, VERSION, fields, self._header_size, self._record.size, self.capacity, 0)
+        names = b"".join(name.encode()[:FIELD_NAME_SIZE].ljust(FIELD_NAME_SIZE, b"\0") for name in self.fields)
+        return header[:COUNT_OFFSET] + names
+
+    def _matches_layout(self) -> bool:
+        if os.fstat(self._file.fileno()).st_size != self._size:
+            return False
+        self._file.seek(0)
+        header = self._file.read(self._header_size)
+        expected = self._expected_header()
+        return header[:COUNT_OFFSET] == expected[:COUNT_OFFSET] and header[HEADER.size :] == expected[COUNT_OFFSET:]
+
+    def _initialize(self) -> None:
+        self._file.truncate(0)
+        self._file.truncate(self._size)
+        expected = self._expected_header()
+        self._file.seek(0)
+        self._file.write(expected[:COUNT_OFFSET] + COUNT.pack(0) + expected[COUNT_OFFSET:])
+        self._file.flush()
+
+    def _recover_count(self) -> int:
+        assert self._map is not None
+        count = COUNT.unpack_from(self._map, COUNT_OFFSET)[0]
+        # The process may have died between committing a record and updating the header.
+        offset = self._header_size + (count % self.capacity) * self._record.size
+        if self._sequence.unpack_from(self._map, offset)[0] == count + 1:
+            count += 1
+            COUNT.pack_into(self._map, COUNT_OFFSET, count)
+        return int(count)
+
+    def append(self, timestamp: float, values: Dict[str, float]) -> None:
+        """
+        Appends one record. Fields missing from `values` are stored as NaN, unknown names are ignored.
+
+        Args:
+            timestamp (float): Wall-clock time of the sample (time.time()).
+            values (Dict[str, float]): Metric values by name.
+        """
+        if self._map is None:
+            raise MetricStoreError(f"{self.path} is closed")
+
+        offset = self._header_size + (self.count % self.capacity) * self._record.size
+        row = [timestamp] + [float("nan")] * len(self.fields)
+        for name, value in values.items():
+            i = self._index.get(name)
+            if i is not None:
+                row[i + 1] = value
+
+        # Invalidate the slot first: until the values are complete, it must not carry the sequence
+        # number of the record it is replacing, which readers would still accept.
+        self._sequence.pack_into(self._map, offset, 0.0)
+        self._values.pack_into(self._map, offset + self._sequence.size, *row)
+        self.count += 1
+        self._sequence.pack_into(self._map, offset, float(self.count))
+        COUNT.pack_into(self._map, COUNT_OFFSET, self.count)
+
+    def close(self) -> None:
+        """Flushes and unmaps the file."""
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+            self._file.close()
+
+
+class MetricStoreReader:
+    """
+    Read-only access to a MetricStore file, safe to use while the monitor is writing it.
+
+    The file is mapped read-only and exposed as a two-dimensional memoryview of doubles
+    (one row per record), so reading history does not copy the file. The sequence number of a record
+    is checked before and after its value is read, and records the writer touched in between are
+    skipped, so a reader racing the writer never returns a torn row.
+
+    Attributes:
+        fields (List[str]): Names of the stored metrics.
+        capacity (int): Number of records the file holds.
+        records (memoryview): The record ring as a (capacity, len(fields) + 2) view of doubles.
+
+    Methods:
+        count -> int: Number of records committed so far.
+        timestamps(last: int) -> List[float]: Returns the timestamps of the newest records, oldest first.
+        column(name: str, last: int) -> List[float]: Returns the values of one metric, oldest first.
+        close() -> None: Unmaps the file.
+
+    Usage:
+        reader = MetricStoreReader(consts.METRIC_STORE_PATH)
+        cpu = reader.column("cpu", last=60)
+        reader.close()
+    """
+
+    def __init__(self, path: str = consts.METRIC_STORE_PATH) -> None:
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, field_count, header_size, record_size, capacity, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise MetricStoreError(f"{path} is not a metric store")
+
+        self.fields = [
+            bytes(self._map[HEADER.size + i * FIELD_NAME_SIZE : HEADER.size + (i + 1) * FIELD_NAME_SIZE])
+            .rstrip(b"\0")
+            .decode()
+            for i in range(field_count)
+        ]
+        self.capacity = capacity
+        self._columns = record_size // 8
+        self._view = memoryview(self._map)
+        self.records = self._view[header_size : header_size + record_size * capacity].cast(
+            "d", shape=[capacity, self._columns]
+        )
+
+    @property
+    def count(self) -> int:
+        """The number of records committed so far, including records that were overwritten."""
+        return int(COUNT.unpack_from(self._map, COUNT_OFFSET)[0])
+
+    def _read(self, column: int, last: Optional[int]) -> List[float]:
+        count = self.count
+        first = max(count - self.capacity, 0)
+        if last is not None:
+            first = max(first, count - last)
+        records = self.records
+        values = []
+        for index in range(first, count):
+            row = index % self.capacity
+            sequence = index + 1
+            # Skip rows whose sequence number does not match, i.e. rows that are being written right now.
+            if records[row, 0] != sequence:
+                continue
+            value = records[row, column]
+            # The writer clears the sequence number before overwriting a row, so a row it started
+            # overwriting while the value was read no longer matches.
+            if records[row, 0] == sequence:
+                values.append(value)
+        return values
+
+    def timestamps(self, last: Optional[int] = None) -> List[float]:
+        """
+        Returns the timestamps of the newest records, oldest first.
+
+        Args:
+            last (int, optional): Number of newest records to return. All stored records if omitted.
+
+        Returns:
+            List[float]: Wall-clock timestamps.
+        """
+        return self._read(1, last)
+
+    def column(self, name: str, last: Optional[int] = None) -> List[float]:
+        """
+        Returns the values of one metric, oldest first.
+
+        Args:
+            name (str): The metric name.
+            last (int, optional): Number of newest records to return. All stored records if omitted.
+
+        Returns:
+            List[float]: The values, NaN where the metric had no value.
+
+        Raises:
+            KeyError: If the store has no such metric.
+        """
+        if name not in self.fields:
+            raise KeyError(name)
+        return self._read(self.fields.index(name) + RECORD_PREFIX, last)
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self.records.release()
+        self._view.release()
+        self._map.close()
@@ -1,7 +1,13 @@
 import curses
+from typing import Optional
 
+from system.sampler import Sampler
+from system.snapshot import SystemSnapshot
 from system.system_interface import SystemInterface
 
+# How long getch() waits for a key before the screen is checked for a new snapshot, in milliseconds.
+INPUT_TIMEOUT_MS = 100
+
 
 class ConsoleInterface:
     """
@@ -26,28 +32,48 @@ class ConsoleInterface:
         Initialize the ConsoleInterface object.
 
         This method initializes the ConsoleInterface object by creating an instance of the
-        SystemInterface class to interact with the system and retrieve system information.
+        SystemInterface class to interact with the system and retrieve system information, and a
+        Sampler that collects the information in a background thread.
         """
         self.system_interface = SystemInterface()
+        self.sampler = Sampler(
+            self.system_interface.get_snapshot,
+            interval=self.system_interface.tick_interval(),
+            next_deadline=self.system_interface.next_deadline,
+        )
 
-    def update_console(self, stdscr: "curses.window") -> None:
+    def update_console(self, stdscr: "curses.window", snapshot: Optional[SystemSnapshot]) -> None:
         """
         Update the console interface with system information.
 
         This method updates the console interface by clearing the screen, displaying a message,
-        retrieving progress bars and disk information from the SystemInterface object, and
+        rendering progress bars and disk information from the given snapshot, and
         refreshing the screen.
 
         Args:
             stdscr (curses window): The curses window object representing the console screen.
+            snapshot (SystemSnapshot or None): The snapshot to render, or None if none was taken yet.
         """
         stdscr.clear()
         stdscr.addstr(0, 0, "Press 'q' to quit.")
 
-        progress_bars = self.system_interface.get_progress_bars()
+        if snapshot is None:
+            stdscr.addstr(2, 0, "Collecting system information...")
+            stdscr.refresh()
+            return
+
+        progress_bars = self.system_interface.get_progress_bars(snapshot)
+        progress_bars += self.system_interface.get_history_bars(snapshot)
+        progress_bars += [""] + self.system_interface.get_process_bars(snapshot)
+        progress_bars += [""] + self.system_interface.get_cgroup_bars(snapshot)
+        gpu_process_bars = self.system_interface.get_gpu_process_bars(snapshot)
+        if gpu_process_bars:
+            progress_bars += [""] + gpu_process_bars
+        progress_bars += ["", self.system_interface.get_ticker_bar("Sampler", self.sampler.ticker)]
 
-        for i, progress_bar in enumerate(progress_bars):
-            stdscr.addstr(i + 2, 0, progress_bar)
+        height, width = stdscr.getmaxyx()
+        for i, progress_bar in enumerate(progress_bars[: max(height - 3, 0)]):
+            stdscr.addnstr(i + 2, 0, progress_bar, width - 1)
 
         stdscr.addstr(str(len(progress_bars) + 2), 0)
 
@@ -58,21 +84,30 @@ class ConsoleInterface:
         Run the console interface.
 
         This method starts the console interface by initializing the curses library, setting up the
-        console screen, and entering the main loop. The console interface is continuously updated
-        until the user presses 'q' to quit.
+        console screen, and entering the main loop. The screen is redrawn whenever the sampler
+        publishes a new snapshot, until the user presses 'q' to quit.
         """
         stdscr = curses.initscr()
         curses.cbreak()
         stdscr.keypad(True)
-        stdscr.nodelay(True)
+        stdscr.timeout(INPUT_TIMEOUT_MS)
+
+        self.sampler.start()
+        drawn_snapshot: Optional[SystemSnapshot] = None
+        self.update_console(stdscr, None)
 
         while True:
-            self.update_console(stdscr)
+            snapshot = self.sampler.latest
+            if snapshot is not drawn_snapshot:
+                self.update_console(stdscr, snapshot)
+                drawn_snapshot = snapshot
 
             key = stdscr.getch()
             if key == ord("q"):
                 break
 
+        self.sampler.stop()
+        self.system_interface.close()
         curses.nocbreak()
         stdscr.keypad(False)
         curses.echo()
@@ -1,4 +1,5 @@
 import logging
+import time
 import tkinter as tk
 from tkinter import Event
 from typing import Optional
@@ -6,18 +7,30 @@ from typing import Optional
 from processes.screen_recording import ScreenRecorder
 from processes.screenshot import Screenshot
 from settings import KeyBindings
+from system.sampler import Sampler
 from system.system_interface import ExtendedSystemInterface, SystemInterface
+from system.ticker import Ticker
 
 logging.basicConfig(filename="screenshot.log", level=logging.INFO)
 
+# Time between two redraws of the window in seconds.
+REFRESH_INTERVAL = 1.0
+
 
 class GuiInterface:
     def __init__(self) -> None:
         """
         Initialize the GUI interface and set up initial configurations.
         """
-        self.system_interface = SystemInterface()
         self.extended_system_interface = ExtendedSystemInterface()
+        self.system_interface: SystemInterface = self.extended_system_interface
+        self.sampler = Sampler(
+            self.system_interface.get_snapshot,
+            interval=self.system_interface.tick_interval(),
+            next_deadline=self.system_interface.next_deadline,
+        )
+
+        self.ticker = Ticker(REFRESH_INTERVAL)
 
         self.root = tk.Tk()
         self.root.title("System Monitor")
@@ -122,21 +135,43 @@ class GuiInterface:
     def update_gui(self) -> None:
         """
         Update the system information displayed in the application window every second.
+
+        The values come from the background sampler, so this method only renders and never waits for a collector.
+        The next update is scheduled against the absolute deadline of the ticker, so the time spent rendering does
+        not make the refresh drift.
         """
         if not self.is_alive():
             return
+        self.ticker.tick()
+
+        snapshot = self.sampler.latest
 
-        if self.minimalize:
-            cpu_load = self.extended_system_interface.get_average_cpu_load()
-            gpu_usage = self.extended_system_interface.get_gpu_usage_percentage()
-            ram_usage = self.extended_system_interface.get_memory_usage_gb()
+        if snapshot is None:
+            text = "Collecting system information..."
+        elif self.minimalize:
+            cpu_load = self.extended_system_interface.get_average_cpu_load(snapshot)
+            gpu_usage = self.extended_system_interface.get_gpu_usage_percentage(snapshot)
+            ram_usage = self.extended_system_interface.get_memory_usage_gb(snapshot)
             text = f"{cpu_load}\n{gpu_usage}\n{ram_usage}"
         else:
-            progress_bars = self.system_interface.get_progress_bars()
-            text = "\n".join(progress_bars) + "\n"
+            progress_bars = self.system_interface.get_progress_bars(snapshot)
+            history_bars = self.system_interface.get_history_bars(snapshot)
+            process_bars = self.system_interface.get_process_bars(snapshot)
+            cgroup_bars = self.system_interface.get_cgroup_bars(snapshot)
+            gpu_process_bars = self.system_interface.get_gpu_process_bars(snapshot)
+            if gpu_process_bars:
+                cgroup_bars += [""] + gpu_process_bars
+            ticker_bars = [
+                self.system_interface.get_ticker_bar("Sampler", self.sampler.ticker),
+                self.system_interface.get_ticker_bar("Display", self.ticker),
+            ]
+            text = "\n".join(
+                progress_bars + history_bars + [""] + process_bars + [""] + cgroup_bars + [""] + ticker_bars
+            )
+            text += "\n"
 
         self.label.config(text=text)
-        self.after_id = self.root.after(1000, self.update_gui)
+        self.after_id = self.root.after(round(self.ticker.remaining() * 1000), self.update_gui)
 
     def stop_update(self) -> None:
         """Stops the scheduled GUI updates."""
@@ -145,6 +180,7 @@ class GuiInterface:
 
     def on_close(self) -> None:
         """Called when the GUI window is closed."""
+        self.sampler.stop()
         self.stop_update()
         self.root.after_cancel(self.after_id)
         self.root.destroy()
@@ -153,7 +189,11 @@ class GuiInterface:
         """
         Start the Tkinter event loop to run the application.
         """
-        self.after_id = self.root.after(1000, self.update_gui)
+        self.sampler.start()
+        self.ticker.reset(time.monotonic() + REFRESH_INTERVAL)
+        self.after_id = self.root.after(round(REFRESH_INTERVAL * 1000), self.update_gui)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.mainloop()
+        self.sampler.stop()
+        self.system_interface.close()
         self.root.quit()
@@ -32,6 +32,11 @@ class SettingsWindow(tk.Tk):
             textvariable=self.cpu_percent_interval_var,
         ).pack()
 
+        # Create and initialize a StringVar for the system information backend
+        self.backend_var = tk.StringVar(value=settings.SystemInfo.backend)
+        ttk.Label(self, text="System Information Backend:").pack()
+        ttk.Combobox(self, values=["psutil", "procfs"], textvariable=self.backend_var).pack()
+
         # Create and initialize a StringVar for Video extension
         self.video_extension_var = tk.StringVar(value=settings.ScreenRecording.video_extension)
         ttk.Label(self, text="Video Extension:").pack()
@@ -127,6 +132,12 @@ class SettingsWindow(tk.Tk):
             messagebox.showerror("Error", "Invalid FPS value!")
             return
 
+        # Validate Backend
+        backend = self.backend_var.get()
+        if backend not in ["psutil", "procfs"]:
+            messagebox.showerror("Error", "Invalid system information backend!")
+            return
+
         # Validate Video Format
         video_format = self.video_extension_var.get()
         if video_format not in [
@@ -182,6 +193,7 @@ class SettingsWindow(tk.Tk):
             json.dump(
                 {
                     "cpu_percent_interval": float(self.cpu_percent_interval_var.get()),
+                    "backend": backend,
                     "video_format": video_format,
                     "fps": fps,
                     "monitor_resolution": monitor_resolution,
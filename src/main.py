@@ -4,12 +4,14 @@ import platform
 import sys
 
 import data_storage
-from args import CONSOLE_ARGS, GUI_ARGS, HELP_ARGS, SETTINGS_ARGS
+from args import CONSOLE_ARGS, GUI_ARGS, HELP_ARGS, QUERY_ARGS, SETTINGS_ARGS
+from data_storage.metrics import query
 from interfaces import console as console_interface
 from interfaces import greeting as greeting_interface
 from interfaces import gui as gui_interface
 from interfaces import settings_interface
 from system.checkers import nvidia_checker
+from system.video_cards.drm import get_drm
 
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -87,11 +89,30 @@ def get_help_text() -> str:
         return "Help file not found."
 
 
+def launch_interface() -> None:
+    """
+    Launches the interface selected by the command-line arguments, or the greeting window if there are none.
+    """
+    if len(sys.argv) > 1:
+        if any(arg in sys.argv for arg in GUI_ARGS):
+            gui = gui_interface.gui_interface.GuiInterface()
+            gui.run()
+        elif any(arg in sys.argv for arg in CONSOLE_ARGS):
+            console = console_interface.console_interface.ConsoleInterface()
+            console.run()
+        elif any(arg in sys.argv for arg in SETTINGS_ARGS):
+            settings = settings_interface.settings_window.SettingsWindow()
+            settings.run()
+    else:
+        greeting = greeting_interface.window.MainWindow()
+        greeting.run()
+
+
 def main() -> None:
     """
     Main function to run the program.
 
-    It checks the operating system and the presence of an NVIDIA graphics card,
+    It checks the operating system and the presence of an NVIDIA, AMD or Intel graphics card,
     then launches the appropriate interface or displays relevant messages.
 
     Usage:
@@ -99,6 +120,8 @@ def main() -> None:
         To run the console version: python(3) main.py --console or python(3) main.py -c
         To display this help message: python(3) main.py --help or python(3) main.py -h
         To display the settings interface: python(3) main.py --settings or python(3) main.py -s
+        To query the recorded history: python(3) main.py --query cpu --start 7d --step 1h --agg p95
+            (or, without loading the collectors: python(3) -m data_storage.metrics.query cpu --start 7d)
     """
 
     if any(arg in sys.argv for arg in HELP_ARGS):
@@ -108,14 +131,22 @@ def main() -> None:
         print(help_text)
         sys.exit(0)
 
+    if any(arg in sys.argv for arg in QUERY_ARGS):
+        sys.exit(query.main([arg for arg in sys.argv[1:] if arg not in QUERY_ARGS]))
+
     logging.debug("Starting program...")
 
     if platform.system() == "Windows":
         print("This program is intended for Linux and is not supported on Windows.")
         sys.exit(1)
     else:
-        if not nvidia_checker.CheckNvidia().is_nvidia_gpu_present():
+        # Keeps the NVML session open and the DRM cards resolved while the interface runs, so both are
+        # probed only once.
+        checker = nvidia_checker.CheckNvidia()
+        drm = get_drm()
+        if not checker.is_nvidia_gpu_present() and not drm.devices():
             print(
+                f"\n{checker.error}"
                 "\nThe full functionality of the program can be obtained only with an Nvidia video card."
                 "\nIf you have an NVIDIA graphics card, check if the drivers are installed."
                 "\nTry(Ubuntu): sudo ubuntu-drivers autoinstall"
@@ -125,19 +156,9 @@ def main() -> None:
                 sys.exit(0)
 
         if json_status():
-            if len(sys.argv) > 1:
-                if any(arg in sys.argv for arg in GUI_ARGS):
-                    gui = gui_interface.gui_interface.GuiInterface()
-                    gui.run()
-                elif any(arg in sys.argv for arg in CONSOLE_ARGS):
-                    console = console_interface.console_interface.ConsoleInterface()
-                    console.run()
-                elif any(arg in sys.argv for arg in SETTINGS_ARGS):
-                    settings = settings_interface.settings_window.SettingsWindow()
-                    settings.run()
-            else:
-                greeting = greeting_interface.window.MainWindow()
-                greeting.run()
+            launch_interface()
+        checker.close()
+        drm.close()
 
 
 if __name__ == "__main__":
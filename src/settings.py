@@ -7,9 +7,11 @@ class SystemInfo:
 
     Attributes:
         cpu_percent_interval (float): Interval for measuring CPU load in seconds. Default value is 0.1.
+        backend (str): Source of the system values, "psutil" or "procfs". Default value is "psutil".
     """
 
     cpu_percent_interval: float = 0.1
+    backend: str = "psutil"
 
 
 class ScreenRecording:
@@ -62,6 +64,7 @@ def load_settings_from_json(file_path: str) -> None:
         with open(file_path) as json_file:
             data = json.load(json_file)
             SystemInfo.cpu_percent_interval = data.get("cpu_percent_interval", 0.1)
+            SystemInfo.backend = data.get("backend", "psutil")
             ScreenRecording.video_extension = data.get("video_format", "mp4")
             ScreenRecording.frame_rate = data.get("fps", 30)
             ScreenRecording.monitor_resolution = data.get("monitor_resolution", "1920x1080")
@@ -1,7 +1,18 @@
-from typing import Optional
+import glob
+import math
+import os
+import time
+from typing import Dict, Optional
 
 import psutil
 
+from .procfs import PersistentFile, read_attribute
+
+POWER_SUPPLY_PATH = "/sys/class/power_supply"
+
+# Time constant of the exponentially weighted discharge rate, in seconds.
+RATE_SMOOTHING = 60.0
+
 
 class Battery:
     """
@@ -21,6 +32,8 @@ class Battery:
 
     Notes:
         - The Battery class depends on the psutil module for battery information.
+        - The SnapshotCollector reads the battery through BatteryMonitor instead, which also estimates
+          the discharge rate and the time remaining.
     """
 
     @staticmethod
@@ -63,3 +76,203 @@ class Battery:
             return float(battery.percent)
 
         return None
+
+
+def find_battery(power_supply_path: str = POWER_SUPPLY_PATH) -> Optional[str]:
+    """
+    Returns the sysfs directory of the system battery.
+
+    Args:
+        power_supply_path (str): The power_supply class directory.
+
+    Returns:
+        str or None: The first supply of type "Battery" that powers the system (not a peripheral such
+        as a wireless mouse), or None if there is none.
+    """
+    for supply in sorted(glob.glob(os.path.join(power_supply_path, "*"))):
+        if read_attribute(os.path.join(supply, "type")) != "Battery":
+            continue
+        if read_attribute(os.path.join(supply, "scope")) == "Device":
+            continue
+        if os.path.exists(os.path.join(supply, "energy_now")) or os.path.exists(os.path.join(supply, "charge_now")):
+            return supply
+    return None
+
+
+class BatteryState:
+    """
+    The battery state of one tick.
+
+    Attributes:
+        percent (float): Remaining capacity as a percentage.
+        status (str): The kernel status, for example "Charging", "Discharging", "Full" or "Not charging".
+        plugged (bool): Whether the system runs on external power.
+        power (Optional[float]): Smoothed charge or discharge power in watts, or None until it is known.
+        time_remaining (Optional[float]): Seconds until the battery is empty when discharging, or full
+            when charging, at the smoothed rate; None if it cannot be estimated.
+    """
+
+    __slots__ = ("percent", "status", "plugged", "power", "time_remaining")
+
+    def __init__(
+        self,
+        percent: float,
+        status: str,
+        plugged: bool,
+        power: Optional[float] = None,
+        time_remaining: Optional[float] = None,
+    ) -> None:
+        self.percent = percent
+        self.status = status
+        self.plugged = plugged
+        self.power = power
+        self.time_remaining = time_remaining
+
+
+class BatteryMonitor:
+    """
+    A class that reads the battery from sysfs and estimates its discharge rate and time remaining.
+
+    psutil.sensors_battery() lists /sys/class/power_supply and opens every attribute on each call.
+    Here the battery directory is resolved once and the attributes the estimate needs (status,
+    capacity, energy_now or charge_now, power_now or current_now) are kept open and re-read each tick.
+
+    The discharge rate is an exponentially weighted moving average with a RATE_SMOOTHING time
+    constant, updated in O(1) per tick from power_now, or from the change of energy_now when the
+    driver does not report power. It restarts whenever the battery switches between charging and
+    discharging.
+
+    Methods:
+        read() -> Optional[BatteryState]: Returns the battery state, or None if there is no battery.
+        close() -> None: Closes the battery attributes.
+
+    Usage:
+        1. Initialize an instance of the BatteryMonitor class:
+            battery_monitor = BatteryMonitor()
+
+        2. Read on every tick:
+            state = battery_monitor.read()
+            if state is not None:
+                print(state.percent, state.power, state.time_remaining)
+
+    Notes:
+        - Batteries that report charge (µAh, µA) instead of energy (µWh, µW) are converted with voltage_now.
+        - If an attribute cannot be read (for example after the battery was removed), the battery is
+          resolved again on the next read.
+    """
+
+    def __init__(self, power_supply_path: str = POWER_SUPPLY_PATH) -> None:
+        self.power_supply_path = power_supply_path
+        self.path: Optional[str] = None
+        self.files: Dict[str, PersistentFile] = {}
+        self._charge_based = False
+        self._rate: Optional[float] = None
+        self._charging: Optional[bool] = None
+        self._last_energy: Optional[float] = None
+        self._last_energy_time = 0.0
+        self._last_rate_time = 0.0
+        self._open()
+
+    def _open(self) -> None:
+        self.close()
+        self.path = find_battery(self.power_supply_path)
+        if self.path is None:
+            return
+        # Energy-based batteries report µWh and µW; charge-based ones µAh and µA, converted with voltage_now.
+        self._charge_based = not os.path.exists(os.path.join(self.path, "energy_now"))
+        prefix = "charge" if self._charge_based else "energy"
+        names = {
+            "status": "status",
+            "capacity": "capacity",
+            "now": f"{prefix}_now",
+            "full": f"{prefix}_full",
+            "rate": "current_now" if self._charge_based else "power_now",
+            "voltage": "voltage_now",
+        }
+        for key, name in names.items():
+            path = os.path.join(self.path, name)
+            if os.path.exists(path):
+                self.files[key] = PersistentFile(path, size=32)
+
+    def _read_uint(self, key: str) -> Optional[int]:
+        file = self.files.get(key)
+        return file.read_uint() if file is not None else None
+
+    def _read_scaled(self, key: str, voltage: Optional[int]) -> Optional[float]:
+        """Reads an energy attribute in Wh or a power attribute in W, converting charge or current if needed."""
+        value = self._read_uint(key)
+        if value is None:
+            return None
+        if not self._charge_based:
+            return value / 1e6
+        if not voltage:
+            return None
+        return value * voltage / 1e12
+
+    def _update_rate(self, charging: bool, energy: Optional[float], power: Optional[float], now: float) -> None:
+        if charging != self._charging:
+            self._rate = None
+            self._last_energy = None
+        self._charging = charging
+
+        # Some drivers report no or a zero power_now. For them the rate is the change of energy_now,
+        # which the firmware only updates every few seconds, so it is taken between two updates.
+        sample = power or None
+        if sample is None and energy is not None:
+            if self._last_energy is None:
+                self._last_energy, self._last_energy_time = energy, now
+            elif energy != self._last_energy and now > self._last_energy_time:
+                sample = abs(energy - self._last_energy) * 3600 / (now - self._last_energy_time)
+                self._last_energy, self._last_energy_time = energy, now
+        if sample is None:
+            return
+
+        if self._rate is None:
+            self._rate = sample
+        else:
+            weight = 1 - math.exp(-(now - self._last_rate_time) / RATE_SMOOTHING)
+            self._rate += weight * (sample - self._rate)
+        self._last_rate_time = now
+
+    def _read_state(self) -> BatteryState:
+        status = self.files["status"].read_text()
+        charging = status == "Charging"
+        plugged = status != "Discharging"
+
+        voltage = self._read_uint("voltage")
+        energy = self._read_scaled("now", voltage)
+        energy_full = self._read_scaled("full", voltage)
+        power = self._read_scaled("rate", voltage)
+        percent = self._read_uint("capacity")
+        if percent is None and energy is not None and energy_full:
+            percent = round(energy / energy_full * 100)
+
+        self._update_rate(charging, energy, power, time.monotonic())
+
+        time_remaining = None
+        if self._rate and energy is not None and status in ("Charging", "Discharging"):
+            remaining_energy = (energy_full or energy) - energy if charging else energy
+            time_remaining = max(remaining_energy, 0.0) / self._rate * 3600
+        power_watts = round(self._rate, 2) if self._rate is not None else None
+        return BatteryState(float(percent or 0), status, plugged, power_watts, time_remaining)
+
+    def read(self) -> Optional[BatteryState]:
+        """
+        Returns the battery state and the smoothed rate and time remaining.
+
+        Returns:
+            BatteryState or None: The battery state, or None if there is no battery.
+        """
+        if self.path is None or "status" not in self.files:
+            return None
+        try:
+            return self._read_state()
+        except (OSError, ValueError):
+            self._open()
+            return None
+
+    def close(self) -> None:
+        """Closes the battery attributes."""
+        for file in self.files.values():
+            file.close()
+        self.files = {}
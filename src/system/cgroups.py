@@ -0,0 +1,325 @@
+import ctypes
+import heapq
+import logging
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .pressure import parse_pressure
+from .procfs import read_file
+
+# The unified (v2) hierarchy is mounted at the first path on pure v2 hosts and at the second on hybrid hosts.
+CGROUP_ROOTS = ("/sys/fs/cgroup", "/sys/fs/cgroup/unified")
+
+SORT_KEYS = ("cpu", "memory", "io")
+
+# inotify(7) event layout and flags: subdirectories created, removed or renamed, queue overflow, watch removed.
+_EVENT = struct.Struct("iIII")
+_WATCH_MASK = 0x100 | 0x200 | 0x40 | 0x80 | 0x01000000
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+
+# Number of cgroups kept in a snapshot and rendered by the interfaces.
+TOP_CGROUPS = 5
+
+
+def find_cgroup_root() -> Optional[str]:
+    """
+    Returns the mount point of the cgroup v2 hierarchy.
+
+    Returns:
+        str or None: The root directory, or None if cgroup v2 is not mounted.
+    """
+    for root in CGROUP_ROOTS:
+        if os.path.isfile(os.path.join(root, "cgroup.controllers")):
+            return root
+    return None
+
+
+def _read_keyed(content: bytes, key: bytes) -> int:
+    """Returns the value of a "key value" line of a flat-keyed cgroup file such as cpu.stat."""
+    for line in content.splitlines():
+        name, _, value = line.partition(b" ")
+        if name == key:
+            return int(value)
+    return 0
+
+
+def _read_io_bytes(content: bytes) -> Tuple[int, int]:
+    """Sums rbytes and wbytes over all devices of an io.stat file."""
+    read_bytes = write_bytes = 0
+    for line in content.splitlines():
+        for field in line.split()[1:]:
+            name, _, value = field.partition(b"=")
+            if name == b"rbytes":
+                read_bytes += int(value)
+            elif name == b"wbytes":
+                write_bytes += int(value)
+    return read_bytes, write_bytes
+
+
+class CgroupUsage:
+    """
+    The resource usage of one cgroup for one tick.
+
+    Attributes:
+        path (str): The cgroup path relative to the hierarchy root, for example "/system.slice/nginx.service".
+        leaf (bool): Whether the cgroup has no child cgroups.
+        cpu_percent (float): CPU usage since the previous tick, where 100 is one fully used core.
+        memory (int): Memory charged to the cgroup in bytes.
+        read_rate (float): Bytes read per second since the previous tick.
+        write_rate (float): Bytes written per second since the previous tick.
+        memory_pressure (float): Share of the last 10 seconds some tasks stalled on memory, as a percentage.
+    """
+
+    __slots__ = ("path", "leaf", "cpu_percent", "memory", "read_rate", "write_rate", "memory_pressure")
+
+    def __init__(
+        self,
+        path: str,
+        leaf: bool,
+        cpu_percent: float,
+        memory: int,
+        read_rate: float,
+        write_rate: float,
+        memory_pressure: float,
+    ) -> None:
+        self.path = path
+        self.leaf = leaf
+        self.cpu_percent = cpu_percent
+        self.memory = memory
+        self.read_rate = read_rate
+        self.write_rate = write_rate
+        self.memory_pressure = memory_pressure
+
+    @property
+    def io_rate(self) -> float:
+        """Bytes read and written per second."""
+        return self.read_rate + self.write_rate
+
+
+class DirectoryWatcher:
+    """
+    Reports the directories whose subdirectories were created, removed or renamed, using inotify.
+
+    cgroupfs does not update directory modification times when cgroups come and go, but mkdir and
+    rmdir on it raise the usual inotify events on the parent directory.
+
+    Methods:
+        watch(directory: str) -> None: Starts reporting changes below a directory.
+        changed() -> Optional[Set[str]]: Returns the directories changed since the previous call.
+        close() -> None: Closes the inotify descriptor.
+    """
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: Dict[int, str] = {}
+
+    def watch(self, directory: str) -> None:
+        """
+        Starts reporting changes of the subdirectories of a directory.
+
+        Args:
+            directory (str): The directory to watch.
+
+        Raises:
+            OSError: If the watch cannot be added, for example when max_user_watches is reached.
+        """
+        descriptor = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed", directory)
+        self._paths[descriptor] = directory
+
+    def changed(self) -> Optional[Set[str]]:
+        """
+        Returns the directories whose subdirectories changed since the previous call.
+
+        Returns:
+            Set[str] or None: The changed directories, or None if the event queue overflowed and
+            every directory must be listed again.
+        """
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    return None
+                if mask & _IN_IGNORED:
+                    self._paths.pop(descriptor, None)
+                elif descriptor in self._paths:
+                    changed.add(self._paths[descriptor])
+
+    def close(self) -> None:
+        """Closes the inotify descriptor, which removes every watch."""
+        os.close(self.fd)
+        self._paths.clear()
+
+
+class CgroupMonitor:
+    """
+    An aggregated view of CPU, memory, I/O and memory pressure per cgroup v2 group.
+
+    Systemd slices, services and containers each get their own cgroup, so reading the cgroup
+    counters shows which of them is hot without summing thousands of processes. The tree is listed
+    once and then only again below directories that inotify reports as changed; unchanged subtrees
+    reuse the cached child lists. Without inotify the whole tree is listed on every sample.
+
+    Methods:
+        sample() -> List[CgroupUsage]: Reads the counters of every cgroup and turns them into rates.
+        top(n: int, key: str, leaves_only: bool) -> List[CgroupUsage]: Returns the n heaviest cgroups.
+        close() -> None: Closes the inotify descriptor.
+
+    Usage:
+        1. Initialize an instance of the CgroupMonitor class:
+            cgroups = CgroupMonitor()
+
+        2. Sample on every tick and pick the top cgroups:
+            cgroups.sample()
+            for usage in cgroups.top(5, "cpu"):
+                print(usage.path, usage.cpu_percent)
+
+    Notes:
+        - The first sample reports zero rates, because there is no previous tick yet.
+        - Counters of controllers that are not enabled for a cgroup read as zero.
+        - Counters are keyed by path and inode, so a cgroup recreated under the same name starts over.
+        - On hosts without cgroup v2, sample() returns an empty list.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root if root is not None else find_cgroup_root()
+        self.entries: List[CgroupUsage] = []
+        self._children: Dict[str, List[Tuple[str, int]]] = {}
+        self._counters: Dict[Tuple[str, int], Tuple[int, int, int]] = {}
+        self._last_sample_time: Optional[float] = None
+        self.watcher: Optional[DirectoryWatcher] = None
+        if self.root is not None:
+            try:
+                self.watcher = DirectoryWatcher()
+            except (OSError, AttributeError):
+                logging.warning("inotify is not available, the cgroup tree will be listed on every sample.")
+
+    def _list(self, directory: str) -> List[Tuple[str, int]]:
+        if self.watcher is not None and directory not in self._children:
+            try:
+                self.watcher.watch(directory)
+            except OSError:
+                logging.warning("Could not watch %s, falling back to listing the cgroup tree every sample.", directory)
+                self.watcher.close()
+                self.watcher = None
+        with os.scandir(directory) as entries:
+            return [(entry.path, entry.inode()) for entry in entries if entry.is_dir(follow_symlinks=False)]
+
+    def _walk(self) -> List[Tuple[str, int, bool]]:
+        changed = self.watcher.changed() if self.watcher is not None else None
+        if changed is None:
+            # Without inotify, or after its event queue overflowed, every directory is listed again.
+            self._children = {}
+            changed = set()
+
+        children: Dict[str, List[Tuple[str, int]]] = {}
+        cgroups = []
+        pending = [(self.root, os.stat(self.root).st_ino)] if self.root is not None else []
+        while pending:
+            directory, inode = pending.pop()
+            cached = self._children.get(directory)
+            if cached is None or directory in changed:
+                try:
+                    cached = self._list(directory)
+                except OSError:
+                    # The cgroup was removed while the tree was being walked.
+                    continue
+            children[directory] = cached
+            cgroups.append((directory, inode, not cached))
+            pending.extend(cached)
+        self._children = children
+        return cgroups
+
+    def _read(self, directory: str, inode: int, leaf: bool, elapsed: float) -> Tuple[CgroupUsage, Tuple[int, int, int]]:
+        cpu_usec = _read_keyed(read_file(os.path.join(directory, "cpu.stat")) or b"", b"usage_usec")
+        read_bytes, write_bytes = _read_io_bytes(read_file(os.path.join(directory, "io.stat")) or b"")
+        memory = (read_file(os.path.join(directory, "memory.current")) or b"").strip()
+        memory_pressure = parse_pressure(read_file(os.path.join(directory, "memory.pressure")) or b"")
+        pressure = memory_pressure.get("some", (0.0, 0.0, 0))[0]
+        counters = (cpu_usec, read_bytes, write_bytes)
+
+        cpu_percent = read_rate = write_rate = 0.0
+        previous = self._counters.get((directory, inode))
+        if previous is not None and elapsed > 0:
+            cpu_percent = round(max(cpu_usec - previous[0], 0) / 1e6 / elapsed * 100, 1)
+            read_rate = max(read_bytes - previous[1], 0) / elapsed
+            write_rate = max(write_bytes - previous[2], 0) / elapsed
+
+        path = directory[len(self.root or "") :] or "/"
+        usage = CgroupUsage(
+            path,
+            leaf,
+            cpu_percent,
+            int(memory) if memory.isdigit() else 0,
+            read_rate,
+            write_rate,
+            pressure,
+        )
+        return usage, counters
+
+    def sample(self) -> List[CgroupUsage]:
+        """
+        Reads the counters of every cgroup and turns them into rates since the previous sample.
+
+        Returns:
+            List[CgroupUsage]: One entry per cgroup, the root included.
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_sample_time if self._last_sample_time is not None else 0.0
+
+        entries = []
+        counters: Dict[Tuple[str, int], Tuple[int, int, int]] = {}
+        for directory, inode, leaf in self._walk():
+            usage, cgroup_counters = self._read(directory, inode, leaf, elapsed)
+            entries.append(usage)
+            counters[(directory, inode)] = cgroup_counters
+
+        self._counters = counters
+        self._last_sample_time = now
+        self.entries = entries
+        return entries
+
+    def top(self, n: int = TOP_CGROUPS, key: str = "cpu", leaves_only: bool = True) -> List[CgroupUsage]:
+        """
+        Returns the n heaviest cgroups of the last sample.
+
+        Args:
+            n (int): Number of cgroups to return.
+            key (str): "cpu", "memory" or "io".
+            leaves_only (bool): Only rank cgroups without children (services and containers rather than
+                the slices that contain them, whose counters include their children).
+
+        Returns:
+            List[CgroupUsage]: The cgroups, heaviest first.
+
+        Raises:
+            ValueError: If the key is unknown.
+        """
+        entries = [usage for usage in self.entries if usage.leaf] if leaves_only else self.entries
+        if key == "cpu":
+            return heapq.nlargest(n, entries, key=lambda usage: usage.cpu_percent)
+        if key == "memory":
+            return heapq.nlargest(n, entries, key=lambda usage: usage.memory)
+        if key == "io":
+            return heapq.nlargest(n, entries, key=lambda usage: usage.io_rate)
+        raise ValueError(f"Unknown sort key {key!r}, expected one of {SORT_KEYS}")
+
+    def close(self) -> None:
+        """Closes the inotify descriptor."""
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
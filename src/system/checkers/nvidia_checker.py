@@ -1,6 +1,6 @@
-import sys
+from typing import Optional
 
-import pynvml
+from ..video_cards.nvml_session import NvmlCapabilities, NvmlSession, get_session
 
 
 class CheckNvidia:
@@ -9,6 +9,7 @@ class CheckNvidia:
 
     Methods:
         is_nvidia_gpu_present() -> bool: Checks the presence of an NVIDIA graphics card on the system.
+        close() -> None: Releases the checker's reference to the NVML session.
 
     Usage:
         1. Initialize an instance of the CheckNvidia class:
@@ -22,45 +23,51 @@ class CheckNvidia:
                 print("No NVIDIA GPU found.")
 
     Notes:
-        - The CheckNvidia class depends on the pynvml module for NVIDIA GPU information.
+        - The CheckNvidia class depends on the pynvml module for NVIDIA GPU information, through the
+          NVML session shared by the whole process. The GPUs are probed once, when the session is first
+          acquired, and is_nvidia_gpu_present() only returns the cached result.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, session: Optional[NvmlSession] = None) -> None:
         """
-        Initializes the CheckNvidia class and initializes the pynvml library.
+        Initializes the CheckNvidia class and takes a reference to the shared NVML session.
+
+        Args:
+            session (NvmlSession, optional): The session to use instead of the shared one.
         """
-        self.nvidia_present = False
-        try:
-            pynvml.nvmlInit()
-        except pynvml.nvml.NVMLError_LibraryNotFound:
-            print("NVML library not founded")
-            self.nvidia_present = False
-            return
+        self.session = session if session is not None else get_session()
+        self.capabilities: NvmlCapabilities = self.session.acquire()
+        self._released = False
 
     def __del__(self) -> None:
         """
-        Shuts down the pynvml library when the instance is destroyed.
+        Releases the NVML session when the instance is destroyed.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Releases the checker's reference to the NVML session; NVML is shut down with the last reference.
+        """
+        if not getattr(self, "_released", True):
+            self._released = True
+            self.session.release()
+
+    @property
+    def error(self) -> str:
+        """
+        Returns why no NVIDIA GPU can be used.
+
+        Returns:
+            str: The probe error, or "" if an NVIDIA GPU is present.
         """
-        if self.nvidia_present:
-            pynvml.nvmlShutdown()
+        return self.capabilities.error
 
-    @staticmethod
-    def is_nvidia_gpu_present() -> bool:
+    def is_nvidia_gpu_present(self) -> bool:
         """
         Checks the presence of an NVIDIA graphics card on the system.
 
         Returns:
             bool: True if an NVIDIA graphics card is present, otherwise False.
         """
-        try:
-            device_count = pynvml.nvmlDeviceGetCount()
-            return bool(device_count > 0)
-        except pynvml.NVMLError_LibraryNotFound:
-            print(
-                "\nThe NVIDIA System Management Interface library (libnvidia-ml.so) was not found."
-                "\nPlease install the appropriate NVIDIA drivers for your GPU.\n"
-            )
-            sys.exit(1)
-        except pynvml.NVMLError as err:
-            print(f"NVIDIA video card verification error: {err}\n")
-            return False
+        return self.capabilities.available
@@ -0,0 +1,316 @@
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import psutil
+
+from .battery import BatteryMonitor, find_battery
+from .cgroups import CgroupMonitor, CgroupUsage
+from .checkers import nvidia_checker
+from .disk_io import DiskIo
+from .mounts import MountMonitor
+from .network import Network
+from .pressure import Pressure
+from .rapl import Rapl
+from .scheduler import Cadence, CadenceScheduler
+from .sensors import TEMPERATURE, SensorReading, Sensors
+from .process_table import ProcessEntry, ProcessTable
+from .processor import Processor
+from .procfs import ProcfsReader
+from .snapshot import SystemSnapshot
+from .video_cards.drm import Drm, get_drm
+from .video_cards.nvidia import GpuProcess, GpuReading, Nvidia
+
+BACKENDS = ("psutil", "procfs")
+
+# Sampling cadence of every source: base, minimum and maximum interval in seconds, the change per
+# second above which it is sampled faster, and the value above which it is always sampled at the minimum.
+CADENCES: Dict[str, Tuple[float, float, float, float, Optional[float]]] = {
+    "cpu": (1.0, 0.5, 2.0, 10.0, 90.0),
+    "memory": (1.0, 1.0, 5.0, 2.0, 90.0),
+    "disk": (5.0, 1.0, 60.0, 0.1, 95.0),
+    "processes": (2.0, 1.0, 5.0, 10.0, None),
+    "cgroups": (2.0, 1.0, 10.0, 10.0, None),
+    "disk_io": (1.0, 1.0, 5.0, 5.0, None),
+    "network": (1.0, 1.0, 5.0, 1.0, None),
+    "pressure": (1.0, 1.0, 5.0, 5.0, 20.0),
+    "sensors": (2.0, 1.0, 10.0, 1.0, 85.0),
+    "power": (1.0, 1.0, 5.0, 5.0, None),
+    "battery": (5.0, 2.0, 30.0, 0.5, None),
+    "gpu": (1.0, 0.5, 5.0, 10.0, 90.0),
+    "gpu_processes": (2.0, 2.0, 10.0, 10.0, 90.0),
+}
+
+
+def _busiest(entries: Sequence[Union[ProcessEntry, CgroupUsage]]) -> float:
+    return max((entry.cpu_percent for entry in entries), default=0.0)
+
+
+def _hottest(readings: List[SensorReading]) -> Optional[float]:
+    return max((reading.value for reading in readings if reading.kind == TEMPERATURE), default=None)
+
+
+def _gpu_usages(readings: List[GpuReading]) -> List[int]:
+    return [reading.usage for reading in readings if reading.usage is not None]
+
+
+class SnapshotCollector:
+    """
+    A class that reads every system source once per tick and returns a SystemSnapshot.
+
+    The Memory, Disk, Processor and Battery getters each query psutil on their own, so rendering all
+    of them costs several reads of the same kernel source. The collector reads virtual memory,
+    disk usage, disk I/O, network, pressure stalls, sensors, CPU frequency and power, and battery state
+    at most once per call to collect(), and refreshes the process table and the cgroup view. The capacity of the other
+    mounts is refreshed on the slower cadence of the MountMonitor.
+
+    Each source is read on its own adaptive cadence (see CADENCES): a CadenceScheduler samples it
+    faster while its value changes quickly or is above its threshold, and backs off while it is flat.
+    Sources that are not due keep the values of their previous read.
+
+    Methods:
+        collect() -> SystemSnapshot: Reads the sources that are due and returns a snapshot.
+        next_deadline() -> float: Returns the monotonic time at which the next source is due.
+        close() -> None: Releases the file descriptors held by the procfs backend and the I/O collectors.
+
+    Usage:
+        1. Initialize an instance of the SnapshotCollector class:
+            collector = SnapshotCollector(backend="procfs")
+
+        2. Take a snapshot and read the values from it:
+            snapshot = collector.collect()
+            print(snapshot.memory_percent)
+
+    Notes:
+        - The "psutil" backend reads memory and disk usage through psutil.
+        - The "procfs" backend reads /proc/stat and /proc/meminfo through a ProcfsReader that keeps the
+          files open, and points the processor's CPU engine at the same reader.
+        - With both backends, per-core CPU frequencies are read from cpufreq by the processor's
+          CpuFrequency; the maximum frequency never changes, so it is read once at construction time.
+        - Whether an NVIDIA GPU is present is taken once from the checker's NVML probe, and the AMD and
+          Intel GPUs are resolved once from DRM sysfs by the process-wide Drm (see get_drm()); ticks make
+          no presence checks.
+    """
+
+    def __init__(
+        self,
+        processor: Optional[Processor] = None,
+        nvidia: Optional[Nvidia] = None,
+        nvidia_check: Optional[nvidia_checker.CheckNvidia] = None,
+        drm: Optional[Drm] = None,
+        disk_path: str = "/",
+        backend: str = "psutil",
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+
+        self.processor = processor if processor is not None else Processor()
+        self.nvidia = nvidia if nvidia is not None else Nvidia()
+        self.nvidia_checker = nvidia_check if nvidia_check is not None else nvidia_checker.CheckNvidia()
+        self.gpu_present = self.nvidia_checker.is_nvidia_gpu_present()
+        self.drm = drm if drm is not None else get_drm()
+        self.drm_present = bool(self.drm.devices())
+        self.disk_path = disk_path
+        self.backend = backend
+        self.process_table = ProcessTable()
+        self.cgroup_monitor = CgroupMonitor()
+        self.disk_io = DiskIo()
+        self.mount_monitor = MountMonitor()
+        self.network = Network()
+        self.pressure = Pressure()
+        self.sensors = Sensors()
+        self.rapl = Rapl()
+        self.battery_monitor = BatteryMonitor()
+        self.scheduler = CadenceScheduler({name: Cadence(*cadence) for name, cadence in CADENCES.items()})
+        self._latest: Dict[str, Any] = {}
+
+        self.procfs: Optional[ProcfsReader] = None
+        if backend == "procfs":
+            self.procfs = ProcfsReader()
+            self.processor.cpu_times.read_counters = self.procfs.read_cpu_counters
+        self.max_cpu_frequency = self.processor.get_max_cpu_frequency()
+
+    def _read_memory(self) -> Tuple[float, int, int]:
+        if self.procfs is not None:
+            return self.procfs.read_memory()
+        memory = psutil.virtual_memory()
+        return float(memory.percent), memory.used, memory.total
+
+    def _read_disk(self) -> Tuple[float, int]:
+        if self.procfs is not None:
+            stat = os.statvfs(self.disk_path)
+            used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+            free = stat.f_bavail * stat.f_frsize
+            # Same formula as psutil: the space reserved for root is not counted as available.
+            percent = round(used / (used + free) * 100, 1) if used + free else 0.0
+            return percent, free
+        disk = psutil.disk_usage(self.disk_path)
+        return float(disk.percent), disk.free
+
+    def _refresh(
+        self, name: str, read: Callable[[], Any], measure: Callable[[Any], Optional[float]], now: float
+    ) -> Any:
+        """Returns a fresh reading of a source if it is due, or its previous reading otherwise."""
+        if name in self._latest and not self.scheduler.due(name, now):
+            return self._latest[name]
+        value = self._latest[name] = read()
+        self.scheduler.record(name, measure(value), now)
+        return value
+
+    def _read_processes(self) -> List[ProcessEntry]:
+        self.process_table.sample()
+        return self.process_table.top(key="cpu")
+
+    def _read_cgroups(self) -> List[CgroupUsage]:
+        self.cgroup_monitor.sample()
+        return self.cgroup_monitor.top(key="cpu")
+
+    def _read_gpus(self) -> Optional[List[GpuReading]]:
+        if not self.gpu_present and not self.drm_present:
+            return None
+        readings = self.nvidia.read() if self.gpu_present else []
+        if self.drm_present:
+            readings += self.drm.read()
+        return readings
+
+    def _read_gpu_processes(self) -> List[GpuProcess]:
+        if not self.gpu_present:
+            return []
+        return self.nvidia.read_processes()
+
+    def metric_names(self) -> List[str]:
+        """
+        Returns the names of every metric SystemSnapshot.metrics() can hold on this system.
+
+        The set depends only on the hardware the collectors found, not on the values of a tick, so it
+        can lay out the metric store before the first snapshot: sources such as RAPL report nothing
+        on their first read, but their metrics are still declared.
+
+        Returns:
+            List[str]: The metric names, sorted.
+        """
+        names = ["cpu", "ram", "disk"] + [f"cpu{i + 1}" for i in range(os.cpu_count() or 1)]
+        names += [f"psi_{resource}" for resource in self.pressure.files]
+        if self.gpu_present or self.drm_present:
+            names.append("gpu")
+        if find_battery(self.battery_monitor.power_supply_path) is not None:
+            names.append("battery")
+        if any(sensor.cpu and sensor.kind == TEMPERATURE for sensor in self.sensors.sensors):
+            names.append("cpu_temp")
+        if self.rapl.domains:
+            names.append("cpu_power")
+        return sorted(names)
+
+    def next_deadline(self) -> float:
+        """
+        Returns the monotonic time at which the next source is due.
+
+        Returns:
+            float: The earliest deadline of the scheduler.
+        """
+        return self.scheduler.next_deadline()
+
+    def collect(self) -> SystemSnapshot:
+        """
+        Reads every source that is due and returns the values as a snapshot.
+
+        Sources that are not due keep the values of their previous read.
+
+        Returns:
+            SystemSnapshot: The values of the current tick.
+        """
+        now = time.monotonic()
+        cpu_usage, core_frequencies = self._refresh(
+            "cpu",
+            lambda: (self.processor.get_cpu_usage(), self.processor.get_core_frequencies()),
+            lambda cpu: cpu[0].total.utilisation,
+            now,
+        )
+        memory_percent, memory_used, memory_total = self._refresh("memory", self._read_memory, lambda m: m[0], now)
+        disk_percent, disk_free = self._refresh("disk", self._read_disk, lambda d: d[0], now)
+        network, tcp_sockets = self._refresh(
+            "network",
+            lambda: (self.network.sample(), self.network.read_tcp_sockets()),
+            lambda net: sum(interface.rx_rate + interface.tx_rate for interface in net[0]) / 1024**2,
+            now,
+        )
+        pressure = self._refresh(
+            "pressure",
+            self.pressure.sample,
+            lambda stats: max((resource.some_rate for resource in stats.values()), default=None),
+            now,
+        )
+        power = self._refresh("power", self.rapl.sample, lambda readings: sum(r.watts for r in readings), now)
+        battery = self._refresh("battery", self.battery_monitor.read, lambda b: b.power if b else None, now)
+        gpus = self._refresh(
+            "gpu", self._read_gpus, lambda readings: max(_gpu_usages(readings or []), default=None), now
+        )
+
+        snapshot = SystemSnapshot(
+            timestamp=now,
+            cpu_load=cpu_usage.per_core_load,
+            cpu_frequency=self.processor.cpu_frequency.average(core_frequencies),
+            max_cpu_frequency=self.max_cpu_frequency,
+            memory_percent=memory_percent,
+            memory_used_gb=memory_used / (1024**3),
+            memory_total_gb=memory_total / (1024**3),
+            disk_percent=disk_percent,
+            disk_free_gb=disk_free / (1024**3),
+            cpu_total=cpu_usage.total.utilisation,
+            cpu_iowait=cpu_usage.total.iowait,
+            cpu_steal=cpu_usage.total.steal,
+            cpu_irq=cpu_usage.total.irq,
+            processes=self._refresh("processes", self._read_processes, _busiest, now),
+            cgroups=self._refresh("cgroups", self._read_cgroups, _busiest, now),
+            disk_io=self._refresh(
+                "disk_io",
+                self.disk_io.sample,
+                lambda disks: sum(disk.read_rate + disk.write_rate for disk in disks),
+                now,
+            ),
+            mounts=self.mount_monitor.sample(),
+            network=network,
+            tcp_sockets=tcp_sockets,
+            pressure=pressure,
+            sensors=self._refresh("sensors", self.sensors.read, _hottest, now),
+            core_frequencies=core_frequencies,
+            power=power,
+            gpu_processes=self._refresh(
+                "gpu_processes",
+                self._read_gpu_processes,
+                lambda processes: max((process.sm_usage or 0 for process in processes), default=None),
+                now,
+            ),
+        )
+
+        if battery is not None:
+            snapshot.battery_percent = battery.percent
+            snapshot.battery_plugged = battery.plugged
+            snapshot.battery_power = battery.power
+            snapshot.battery_time_left = battery.time_remaining
+
+        if gpus:
+            snapshot.gpus = gpus
+            # GPUs that do not report utilisation (Intel) are left out of the average rather than counted as idle.
+            usages = _gpu_usages(gpus)
+            snapshot.gpu_usage = round(sum(usages) / len(usages)) if usages else None
+            snapshot.gpu_frequency = sum(reading.frequency for reading in gpus) / len(gpus)
+
+        return snapshot
+
+    def close(self) -> None:
+        """Releases the file descriptors held by the procfs backend, the I/O and GPU collectors, and the NVML session."""
+        if self.procfs is not None:
+            self.procfs.close()
+        self.processor.close()
+        self.cgroup_monitor.close()
+        self.disk_io.close()
+        self.mount_monitor.close()
+        self.network.close()
+        self.pressure.close()
+        self.sensors.close()
+        self.rapl.close()
+        self.battery_monitor.close()
+        self.nvidia.close()
+        self.nvidia_checker.close()
+        self.drm.close()
@@ -0,0 +1,173 @@
+import time
+from typing import Callable, List, Optional
+
+PROC_STAT_PATH = "/proc/stat"
+
+# Column order of a "cpu" line in /proc/stat (guest time is already included in user and nice).
+USER, NICE, SYSTEM, IDLE, IOWAIT, IRQ, SOFTIRQ, STEAL = range(8)
+STAT_COLUMNS = 8
+
+
+class CpuShares:
+    """
+    Utilisation shares of one CPU (or of all CPUs together) over the interval between two ticks.
+
+    Attributes:
+        utilisation (float): Busy time as a percentage (everything except idle and iowait).
+        iowait (float): Time spent idle while waiting for I/O as a percentage.
+        steal (float): Time stolen by the hypervisor as a percentage.
+        irq (float): Time spent servicing hard and soft interrupts as a percentage.
+    """
+
+    __slots__ = ("utilisation", "iowait", "steal", "irq")
+
+    def __init__(self, utilisation: float, iowait: float, steal: float, irq: float) -> None:
+        self.utilisation = utilisation
+        self.iowait = iowait
+        self.steal = steal
+        self.irq = irq
+
+    @classmethod
+    def from_delta(cls, previous: Optional[List[int]], current: List[int]) -> "CpuShares":
+        """
+        Computes the shares from two sets of /proc/stat counters.
+
+        Args:
+            previous (List[int] or None): Counters of the previous tick, or None to measure since boot.
+            current (List[int]): Counters of the current tick.
+
+        Returns:
+            CpuShares: The shares over the interval, each rounded to one decimal place.
+        """
+        if previous is None:
+            delta = current
+        else:
+            delta = [max(now - before, 0) for now, before in zip(current, previous)]
+
+        total = sum(delta)
+        if total == 0:
+            return cls(0.0, 0.0, 0.0, 0.0)
+
+        busy = total - delta[IDLE] - delta[IOWAIT]
+        scale = 100.0 / total
+        return cls(
+            utilisation=round(busy * scale, 1),
+            iowait=round(delta[IOWAIT] * scale, 1),
+            steal=round(delta[STEAL] * scale, 1),
+            irq=round((delta[IRQ] + delta[SOFTIRQ]) * scale, 1),
+        )
+
+
+class CpuUsage:
+    """
+    Aggregate and per-core CPU shares for one tick.
+
+    Attributes:
+        total (CpuShares): Shares of all CPUs together.
+        per_core (List[CpuShares]): Shares of each CPU core, ordered by core number.
+    """
+
+    __slots__ = ("total", "per_core")
+
+    def __init__(self, total: CpuShares, per_core: List[CpuShares]) -> None:
+        self.total = total
+        self.per_core = per_core
+
+    @property
+    def per_core_load(self) -> List[float]:
+        """
+        Returns the utilisation of each core in the shape psutil.cpu_percent(percpu=True) uses.
+
+        Returns:
+            List[float]: A list of CPU load percentages for each CPU core.
+        """
+        return [core.utilisation for core in self.per_core]
+
+
+class CpuTimes:
+    """
+    A non-blocking CPU utilisation engine based on /proc/stat counters.
+
+    Instead of sleeping for an interval like psutil.cpu_percent(interval=...), the engine keeps the
+    counters of the previous tick and computes the shares from the delta to the current one.
+    Taking a sample costs one read of /proc/stat.
+
+    Methods:
+        sample() -> CpuUsage: Reads /proc/stat and returns the shares since the previous sample.
+
+    Usage:
+        1. Initialize an instance of the CpuTimes class:
+            cpu_times = CpuTimes()
+
+        2. Take a sample on every tick:
+            usage = cpu_times.sample()
+            print(usage.total.utilisation, usage.per_core_load)
+
+    Notes:
+        - The first sample reports the average since boot, because there is no previous tick yet.
+        - Samples taken less than min_interval seconds apart return the previous result, so that
+          back-to-back callers do not compute shares from a few jiffies.
+        - read_counters can be replaced by another source of the same counters, such as
+          ProcfsReader.read_cpu_counters.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.0,
+        stat_path: str = PROC_STAT_PATH,
+        read_counters: Optional[Callable[[], List[List[int]]]] = None,
+    ) -> None:
+        self.min_interval = min_interval
+        self.stat_path = stat_path
+        self.read_counters = read_counters if read_counters is not None else self.read_stat_file
+        self._previous_total: Optional[List[int]] = None
+        self._previous_cores: List[Optional[List[int]]] = []
+        self._last_sample_time = 0.0
+        self._last_usage: Optional[CpuUsage] = None
+
+    def read_stat_file(self) -> List[List[int]]:
+        """
+        Reads the "cpu" lines of /proc/stat.
+
+        Returns:
+            List[List[int]]: The aggregate counters followed by the counters of each core.
+        """
+        counters = []
+        with open(self.stat_path, "rb") as file:
+            for line in file:
+                if not line.startswith(b"cpu"):
+                    break
+                counters.append([int(value) for value in line.split()[1 : STAT_COLUMNS + 1]])
+        return counters
+
+    def sample(self) -> CpuUsage:
+        """
+        Reads /proc/stat and returns the CPU shares since the previous sample.
+
+        Returns:
+            CpuUsage: Aggregate and per-core shares.
+        """
+        now = time.monotonic()
+        if self._last_usage is not None and now - self._last_sample_time < self.min_interval:
+            return self._last_usage
+
+        counters = self.read_counters()
+        total_counters, core_counters = counters[0], counters[1:]
+
+        if len(core_counters) != len(self._previous_cores):
+            # CPUs went on- or offline, so the per-core history no longer lines up.
+            self._previous_cores = [None] * len(core_counters)
+
+        usage = CpuUsage(
+            total=CpuShares.from_delta(self._previous_total, total_counters),
+            per_core=[
+                CpuShares.from_delta(previous, current)
+                for previous, current in zip(self._previous_cores, core_counters)
+            ],
+        )
+
+        self._previous_total = total_counters
+        self._previous_cores = list(core_counters)
+        self._last_sample_time = now
+        self._last_usage = usage
+        return usage
@@ -0,0 +1,133 @@
+import glob
+import os
+from typing import List, Optional
+
+from .procfs import CPUFREQ_GLOB, PROC_CPUINFO_PATH, PersistentFile, parse_uint, read_attribute, sort_by_cpu_number
+
+
+class CoreFrequencyLimits:
+    """
+    The frequency limits and governor of one core, which are read once.
+
+    Attributes:
+        minimum (float): Minimum hardware frequency in megahertz (MHz).
+        maximum (float): Maximum hardware frequency in megahertz (MHz).
+        governor (str): The cpufreq scaling governor, for example "schedutil" or "performance".
+    """
+
+    __slots__ = ("minimum", "maximum", "governor")
+
+    def __init__(self, minimum: float, maximum: float, governor: str) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.governor = governor
+
+
+class CpuFrequency:
+    """
+    A class that reads the current frequency of every CPU core from cpufreq in sysfs.
+
+    The scaling_cur_freq file of every core is opened once and re-read with pread into its own
+    preallocated buffer, so a tick costs one pread per core and no directory walk; psutil.cpu_freq()
+    globs, opens and closes the files of every core on every call. The minimum and maximum
+    frequencies and the governor never change while running, so they are read once.
+
+    Attributes:
+        limits (List[CoreFrequencyLimits]): Frequency limits and governor of every core.
+
+    Methods:
+        read() -> List[float]: Returns the current frequency of every core in MHz.
+        average(frequencies: List[float]) -> float: Returns the average of per-core frequencies.
+        read_average() -> float: Returns the average current frequency in MHz.
+        max_frequency() -> float: Returns the highest maximum frequency of all cores in MHz.
+        close() -> None: Closes the cpufreq files.
+
+    Usage:
+        1. Initialize an instance of the CpuFrequency class:
+            cpu_frequency = CpuFrequency()
+
+        2. Read on every tick:
+            per_core = cpu_frequency.read()
+            print(per_core, cpu_frequency.max_frequency())
+
+    Notes:
+        - Without cpufreq (for example in virtual machines), the per-core "cpu MHz" values of
+          /proc/cpuinfo are read instead, and no limits are known.
+    """
+
+    def __init__(self, cpufreq_glob: str = CPUFREQ_GLOB) -> None:
+        cpufreq_dirs = sort_by_cpu_number(glob.glob(cpufreq_glob))
+        self.files = [PersistentFile(os.path.join(path, "scaling_cur_freq")) for path in cpufreq_dirs]
+        self.limits = [
+            CoreFrequencyLimits(
+                int(read_attribute(os.path.join(path, "cpuinfo_min_freq")) or 0) / 1000,
+                int(read_attribute(os.path.join(path, "cpuinfo_max_freq")) or 0) / 1000,
+                read_attribute(os.path.join(path, "scaling_governor")) or "",
+            )
+            for path in cpufreq_dirs
+        ]
+        self.cpuinfo: Optional[PersistentFile] = None
+        if not self.files:
+            self.cpuinfo = PersistentFile(PROC_CPUINFO_PATH, size=4096 * (os.cpu_count() or 1), grow=True)
+
+    def _read_cpuinfo(self) -> List[float]:
+        if self.cpuinfo is None:
+            return []
+        buffer = self.cpuinfo.buffer
+        end = self.cpuinfo.read()
+        frequencies = []
+        position = buffer.find(b"cpu MHz", 0, end)
+        while position >= 0:
+            value, position = parse_uint(buffer, position + 7, end)
+            frequencies.append(float(value))
+            position = buffer.find(b"cpu MHz", position, end)
+        return frequencies
+
+    def read(self) -> List[float]:
+        """
+        Returns the current frequency of every core.
+
+        Returns:
+            List[float]: Current frequencies in megahertz (MHz), ordered by CPU number.
+        """
+        if not self.files:
+            return self._read_cpuinfo()
+        return [file.read_uint() / 1000 for file in self.files]
+
+    @staticmethod
+    def average(frequencies: List[float]) -> float:
+        """
+        Returns the average of per-core frequencies.
+
+        Args:
+            frequencies (List[float]): Frequencies as returned by read().
+
+        Returns:
+            float: The average in megahertz (MHz), or 0 if the list is empty.
+        """
+        return sum(frequencies) / len(frequencies) if frequencies else 0.0
+
+    def read_average(self) -> float:
+        """
+        Returns the average current frequency of all cores.
+
+        Returns:
+            float: Current frequency of the CPU in megahertz (MHz).
+        """
+        return self.average(self.read())
+
+    def max_frequency(self) -> float:
+        """
+        Returns the highest maximum frequency of all cores, which is read once at construction time.
+
+        Returns:
+            float: Maximum CPU frequency in megahertz (MHz), or 0 if cpufreq is not available.
+        """
+        return max((limits.maximum for limits in self.limits), default=0.0)
+
+    def close(self) -> None:
+        """Closes the cpufreq files."""
+        for file in self.files:
+            file.close()
+        if self.cpuinfo is not None:
+            self.cpuinfo.close()
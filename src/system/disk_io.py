@@ -0,0 +1,154 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .procfs import PersistentFile
+
+DISKSTATS_PATH = "/proc/diskstats"
+SYS_BLOCK_PATH = "/sys/block"
+
+# /proc/diskstats always counts 512-byte sectors, whatever the logical block size of the device.
+SECTOR_SIZE = 512
+
+# Loop, RAM, compressed-RAM (zram) and network block devices are backed by files, memory or a remote
+# server, not by local storage.
+VIRTUAL_DEVICE_PREFIXES = ("loop", "ram", "zram", "nbd")
+
+# Field positions in a /proc/diskstats line, after major, minor and name.
+_READS, _SECTORS_READ, _READ_MS, _WRITES, _SECTORS_WRITTEN, _WRITE_MS, _IO_MS = 3, 5, 6, 7, 9, 10, 12
+
+
+class DiskIoStats:
+    """
+    The I/O activity of one block device between two ticks.
+
+    Attributes:
+        name (str): The device name, for example "sda" or "nvme0n1".
+        read_rate (float): Megabytes read per second.
+        write_rate (float): Megabytes written per second.
+        read_iops (float): Completed reads per second.
+        write_iops (float): Completed writes per second.
+        await_ms (float): Average time a request took to complete, queueing included, in milliseconds.
+        utilisation (float): Share of the time the device had requests in flight, as a percentage.
+    """
+
+    __slots__ = ("name", "read_rate", "write_rate", "read_iops", "write_iops", "await_ms", "utilisation")
+
+    def __init__(
+        self,
+        name: str,
+        read_rate: float,
+        write_rate: float,
+        read_iops: float,
+        write_iops: float,
+        await_ms: float,
+        utilisation: float,
+    ) -> None:
+        self.name = name
+        self.read_rate = read_rate
+        self.write_rate = write_rate
+        self.read_iops = read_iops
+        self.write_iops = write_iops
+        self.await_ms = await_ms
+        self.utilisation = utilisation
+
+    @property
+    def iops(self) -> float:
+        """Completed reads and writes per second."""
+        return self.read_iops + self.write_iops
+
+
+class DiskIo:
+    """
+    A class that computes throughput, IOPS, await and utilisation per block device from /proc/diskstats.
+
+    /proc/diskstats is kept open and read once per tick; the values are the deltas of its cumulative
+    counters between two samples, computed the same way as iostat.
+
+    Methods:
+        sample() -> List[DiskIoStats]: Reads /proc/diskstats and returns the activity since the previous sample.
+        close() -> None: Closes /proc/diskstats.
+
+    Usage:
+        1. Initialize an instance of the DiskIo class:
+            disk_io = DiskIo()
+
+        2. Sample on every tick:
+            for device in disk_io.sample():
+                print(device.name, device.read_rate, device.utilisation)
+
+    Notes:
+        - Partitions and loop, RAM, zram and nbd devices are skipped unless whole_disks_only is False. A device is a
+          whole disk if it is listed in /sys/block; the listing is refreshed when an unknown device appears.
+        - The first sample returns no devices, because there is no previous tick yet.
+    """
+
+    def __init__(self, whole_disks_only: bool = True, path: str = DISKSTATS_PATH) -> None:
+        self.whole_disks_only = whole_disks_only
+        self.file = PersistentFile(path, size=4096, grow=True)
+        self._whole_disks: Dict[str, bool] = {}
+        self._counters: Dict[str, Tuple[int, ...]] = {}
+        self._last_sample_time: Optional[float] = None
+
+    def _is_shown(self, name: str) -> bool:
+        return not self.whole_disks_only or (self._whole_disks[name] and not name.startswith(VIRTUAL_DEVICE_PREFIXES))
+
+    def _read_counters(self) -> Dict[str, Tuple[int, ...]]:
+        length = self.file.read()
+        lines = [line.split() for line in bytes(self.file.buffer[:length]).splitlines()]
+        devices = {fields[2].decode(): fields for fields in lines if len(fields) > _IO_MS}
+
+        if self.whole_disks_only and not devices.keys() <= self._whole_disks.keys():
+            block_devices = set(os.listdir(SYS_BLOCK_PATH))
+            self._whole_disks = {name: name in block_devices for name in devices}
+
+        return {
+            name: tuple(
+                int(fields[column])
+                for column in (_READS, _SECTORS_READ, _READ_MS, _WRITES, _SECTORS_WRITTEN, _WRITE_MS, _IO_MS)
+            )
+            for name, fields in devices.items()
+            if self._is_shown(name)
+        }
+
+    def sample(self) -> List[DiskIoStats]:
+        """
+        Reads /proc/diskstats and returns the activity of every device since the previous sample.
+
+        Returns:
+            List[DiskIoStats]: One entry per device, in /proc/diskstats order.
+        """
+        now = time.monotonic()
+        counters = self._read_counters()
+        elapsed = now - self._last_sample_time if self._last_sample_time is not None else 0.0
+        previous_counters = self._counters
+        self._counters = counters
+        self._last_sample_time = now
+        if elapsed <= 0:
+            return []
+
+        devices = []
+        for name, current in counters.items():
+            previous = previous_counters.get(name)
+            if previous is None:
+                continue
+            reads, sectors_read, read_ms, writes, sectors_written, write_ms, io_ms = (
+                max(value - old, 0) for value, old in zip(current, previous)
+            )
+            requests = reads + writes
+            devices.append(
+                DiskIoStats(
+                    name,
+                    round(sectors_read * SECTOR_SIZE / 1024**2 / elapsed, 2),
+                    round(sectors_written * SECTOR_SIZE / 1024**2 / elapsed, 2),
+                    round(reads / elapsed, 1),
+                    round(writes / elapsed, 1),
+                    round((read_ms + write_ms) / requests, 2) if requests else 0.0,
+                    round(min(io_ms / (elapsed * 1000) * 100, 100.0), 1),
+                )
+            )
+        return devices
+
+    def close(self) -> None:
+        """Closes /proc/diskstats."""
+        self.file.close()
@@ -0,0 +1,209 @@
+import math
+import time
+from array import array
+from bisect import bisect_left
+from itertools import chain, filterfalse
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from .snapshot import SystemSnapshot
+from .statistics import percentile
+
+# The span of the history: one hour of samples.
+HISTORY_SECONDS = 3600.0
+
+# The capacity of one hour at one sample per second; use MetricHistory.for_interval() for other rates.
+HISTORY_CAPACITY = 3600
+
+
+class WindowStats(NamedTuple):
+    samples: int
+    minimum: float
+    maximum: float
+    mean: float
+
+
+class _RingIndex:
+    """A read-only, oldest-first sequence view over a ring buffer, used for bisecting timestamps."""
+
+    def __init__(self, values: array, start: int, count: int) -> None:
+        self.values = values
+        self.start = start
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> float:
+        return float(self.values[(self.start + index) % len(self.values)])
+
+
+class MetricHistory:
+    """
+    A fixed-memory history of the last N samples of every metric.
+
+    Each metric is stored in a preallocated array of doubles that shares one ring position with a
+    timestamp array, so appending is O(1) and the memory footprint never grows. Metrics that have no
+    value in a tick (for example the battery on a desktop) are stored as NaN and skipped by queries.
+
+    Methods:
+        for_interval(interval: float, seconds: float) -> MetricHistory: Sizes a history for a sampling interval.
+        append(snapshot: SystemSnapshot) -> None: Stores the metrics of a snapshot.
+        metrics() -> List[str]: Returns the names of the stored metrics.
+        window(metric: str, seconds: float) -> List[float]: Returns the values of the last `seconds`.
+        stats(metric: str, seconds: float) -> Optional[WindowStats]: Returns min/max/mean over a window.
+        percentile(metric: str, q: float, seconds: float) -> Optional[float]: Returns a percentile over a window.
+
+    Usage:
+        1. Initialize an instance of the MetricHistory class for the sampler's tick and feed it snapshots:
+            history = MetricHistory.for_interval(sampler.interval)
+            history.append(snapshot)
+
+        2. Query a window:
+            p95_cpu = history.percentile("cpu", 95, seconds=300)
+            ram = history.stats("ram", seconds=60)
+
+    Notes:
+        - Window queries run over contiguous array slices with C-implemented builtins (min, max,
+          math.fsum, sorted) rather than Python loops; the window start is found by binary search.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.columns: Dict[str, array] = {}
+        self._position = 0
+        self._count = 0
+
+    @classmethod
+    def for_interval(cls, interval: float, seconds: float = HISTORY_SECONDS) -> "MetricHistory":
+        """
+        Returns a history that holds `seconds` of samples taken every `interval` seconds.
+
+        Args:
+            interval (float): The shortest time between two samples in seconds, the sampler's tick.
+            seconds (float): The time span the history has to cover. Defaults to one hour.
+
+        Returns:
+            MetricHistory: The history.
+        """
+        return cls(math.ceil(seconds / interval))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def metrics(self) -> List[str]:
+        """
+        Returns the names of the stored metrics.
+
+        Returns:
+            List[str]: Metric names, for example "cpu", "cpu1", "ram".
+        """
+        return list(self.columns)
+
+    def _new_column(self) -> array:
+        return array("d", [math.nan]) * self.capacity
+
+    def append_values(self, timestamp: float, values: Dict[str, float]) -> None:
+        """
+        Stores one sample of several metrics.
+
+        Args:
+            timestamp (float): Monotonic time of the sample in seconds.
+            values (Dict[str, float]): Metric values by name.
+        """
+        position = self._position
+        self.timestamps[position] = timestamp
+
+        for name, column in self.columns.items():
+            column[position] = values.get(name, math.nan)
+
+        for name in values.keys() - self.columns.keys():
+            column = self._new_column()
+            column[position] = values[name]
+            self.columns[name] = column
+
+        self._position = (position + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def append(self, snapshot: SystemSnapshot) -> None:
+        """
+        Stores the metrics of a snapshot.
+
+        Args:
+            snapshot (SystemSnapshot): The snapshot to store.
+        """
+        self.append_values(snapshot.timestamp, snapshot.metrics())
+
+    def _slices(self, values: array, seconds: Optional[float], now: Optional[float]) -> Iterable[memoryview]:
+        start = (self._position - self._count) % self.capacity
+        first = 0
+        if seconds is not None:
+            if now is None:
+                now = time.monotonic()
+            first = bisect_left(_RingIndex(self.timestamps, start, self._count), now - seconds)
+
+        view = memoryview(values)
+        begin = (start + first) % self.capacity
+        length = self._count - first
+        if length <= 0:
+            return ()
+        if begin + length <= self.capacity:
+            return (view[begin : begin + length],)
+        return (view[begin:], view[: begin + length - self.capacity])
+
+    def window(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None) -> List[float]:
+        """
+        Returns the stored values of a metric, oldest first, without the ticks that had no value.
+
+        Args:
+            metric (str): The metric name.
+            seconds (float, optional): Only return the last `seconds`. All samples are returned if omitted.
+            now (float, optional): The monotonic time the window ends at. Defaults to time.monotonic().
+
+        Returns:
+            List[float]: The values in the window.
+        """
+        column = self.columns.get(metric)
+        if column is None:
+            return []
+        return list(filterfalse(math.isnan, chain.from_iterable(self._slices(column, seconds, now))))
+
+    def stats(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None) -> Optional[WindowStats]:
+        """
+        Returns the minimum, maximum and mean of a metric over a window.
+
+        Args:
+            metric (str): The metric name.
+            seconds (float, optional): The window length. The whole history is used if omitted.
+            now (float, optional): The monotonic time the window ends at. Defaults to time.monotonic().
+
+        Returns:
+            WindowStats or None: The statistics, or None if the window holds no values.
+        """
+        values = self.window(metric, seconds, now)
+        if not values:
+            return None
+        return WindowStats(len(values), min(values), max(values), math.fsum(values) / len(values))
+
+    def percentile(
+        self, metric: str, q: float, seconds: Optional[float] = None, now: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Returns a percentile of a metric over a window, for example the p95 CPU load of the last 5 minutes.
+
+        Args:
+            metric (str): The metric name.
+            q (float): The percentile, between 0 and 100.
+            seconds (float, optional): The window length. The whole history is used if omitted.
+            now (float, optional): The monotonic time the window ends at. Defaults to time.monotonic().
+
+        Returns:
+            float or None: The percentile, or None if the window holds no values.
+        """
+        values = self.window(metric, seconds, now)
+        if not values:
+            return None
+        values.sort()
+        return percentile(values, q)
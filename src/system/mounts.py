@@ -0,0 +1,227 @@
+import math
+import operator
+import os
+import re
+import select
+import time
+from array import array
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+FILESYSTEMS_PATH = "/proc/filesystems"
+
+# statvfs() of every mount is much slower to change than CPU load, so it runs on its own cadence.
+STATVFS_INTERVAL = 10.0
+
+# Number of statvfs samples kept per mount for the fill-rate regression (5 minutes at the default cadence).
+FILL_WINDOW = 30
+
+# ZFS datasets are not backed by a block device of their own, but they are real storage.
+EXTRA_FILESYSTEMS = ("zfs",)
+
+_OCTAL_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+def _unescape(field: str) -> str:
+    """Decodes the octal escapes (for example "\\040" for a space) of a mountinfo path."""
+    return _OCTAL_ESCAPE.sub(lambda match: chr(int(match.group(1), 8)), field)
+
+
+def read_block_filesystems(path: str = FILESYSTEMS_PATH) -> List[str]:
+    """
+    Returns the filesystem types that store data on a device, as listed in /proc/filesystems.
+
+    Args:
+        path (str): The path of /proc/filesystems.
+
+    Returns:
+        List[str]: The filesystem types not marked "nodev", plus EXTRA_FILESYSTEMS.
+    """
+    with open(path) as file:
+        types = [line.split()[0] for line in file if line.strip() and not line.startswith("nodev")]
+    return types + list(EXTRA_FILESYSTEMS)
+
+
+class MountUsage:
+    """
+    The capacity of one mounted filesystem.
+
+    Attributes:
+        mountpoint (str): Where the filesystem is mounted.
+        device (str): The mounted device, for example "/dev/sda2".
+        fstype (str): The filesystem type, for example "ext4".
+        total (int): Size of the filesystem in bytes.
+        free (int): Bytes available to unprivileged users.
+        percent (float): Used space as a percentage, with the same formula as psutil.disk_usage().
+        time_to_full (Optional[float]): Estimated seconds until the filesystem is full at the current
+            fill rate, or None if it is not filling up.
+    """
+
+    __slots__ = ("mountpoint", "device", "fstype", "total", "free", "percent", "time_to_full")
+
+    def __init__(
+        self,
+        mountpoint: str,
+        device: str,
+        fstype: str,
+        total: int = 0,
+        free: int = 0,
+        percent: float = 0.0,
+        time_to_full: Optional[float] = None,
+    ) -> None:
+        self.mountpoint = mountpoint
+        self.device = device
+        self.fstype = fstype
+        self.total = total
+        self.free = free
+        self.percent = percent
+        self.time_to_full = time_to_full
+
+
+class _FillWindow:
+    """The last FILL_WINDOW (time, used bytes) samples of one mount, as two parallel arrays."""
+
+    def __init__(self, capacity: int) -> None:
+        self.times = array("d")
+        self.used = array("d")
+        self.capacity = capacity
+
+    def append(self, timestamp: float, used: float) -> None:
+        if len(self.times) == self.capacity:
+            del self.times[0]
+            del self.used[0]
+        self.times.append(timestamp)
+        self.used.append(used)
+
+    def fill_rate(self) -> Optional[float]:
+        """
+        Returns the least-squares slope of used bytes over time, in bytes per second.
+
+        The sums run over the whole arrays with C-implemented builtins (math.fsum, map, operator.mul)
+        instead of a Python loop over the samples.
+        """
+        count = len(self.times)
+        if count < 2:
+            return None
+        # Shifting the times to start at zero keeps the sums of squares small and precise.
+        origin = self.times[0]
+        times = array("d", map(operator.sub, self.times, repeat(origin)))
+        sum_t = math.fsum(times)
+        sum_u = math.fsum(self.used)
+        sum_tt = math.fsum(map(operator.mul, times, times))
+        sum_tu = math.fsum(map(operator.mul, times, self.used))
+        denominator = count * sum_tt - sum_t * sum_t
+        if denominator <= 0:
+            return None
+        return (count * sum_tu - sum_t * sum_u) / denominator
+
+
+class MountMonitor:
+    """
+    Capacity tracking across every real mounted filesystem, with a time-to-full estimate per mount.
+
+    The mount table is parsed once and then only again when the kernel signals a change of
+    /proc/self/mountinfo through poll() (POLLPRI/POLLERR), which happens on every mount and unmount.
+    Each mount is statvfs'd at most every STATVFS_INTERVAL seconds, and the last FILL_WINDOW samples
+    feed a linear regression of used space over time.
+
+    Methods:
+        sample() -> List[MountUsage]: Returns the capacity of every mount, refreshing it when due.
+        close() -> None: Closes /proc/self/mountinfo.
+
+    Usage:
+        1. Initialize an instance of the MountMonitor class:
+            mounts = MountMonitor()
+
+        2. Sample on every tick; statvfs only runs when the interval has elapsed:
+            for mount in mounts.sample():
+                print(mount.mountpoint, mount.percent, mount.time_to_full)
+
+    Notes:
+        - Only filesystems stored on a device are tracked (see read_block_filesystems()); a device mounted
+          several times (bind mounts) is tracked once, at its first mountpoint.
+    """
+
+    def __init__(
+        self,
+        interval: float = STATVFS_INTERVAL,
+        window: int = FILL_WINDOW,
+        path: str = MOUNTINFO_PATH,
+    ) -> None:
+        self.interval = interval
+        self.window = window
+        self.filesystems = set(read_block_filesystems())
+        self.mounts: List[MountUsage] = []
+        self._windows: Dict[Tuple[str, str], _FillWindow] = {}
+        self._last_statvfs: Optional[float] = None
+
+        self._file = open(path, "rb")
+        self._poll = select.poll()
+        self._poll.register(self._file, select.POLLPRI | select.POLLERR)
+        self._read_mounts()
+
+    def _read_mounts(self) -> None:
+        self._file.seek(0)
+        mounts = []
+        devices = set()
+        for line in self._file.read().decode(errors="replace").splitlines():
+            fields, _, fs_fields = line.partition(" - ")
+            mount_fields = fields.split()
+            fstype, source = fs_fields.split()[:2]
+            device_number = mount_fields[2]
+            if fstype not in self.filesystems or device_number in devices:
+                continue
+            devices.add(device_number)
+            mounts.append(MountUsage(_unescape(mount_fields[4]), _unescape(source), fstype))
+
+        self.mounts = mounts
+        self._windows = {
+            (mount.mountpoint, mount.device): self._windows.get((mount.mountpoint, mount.device))
+            or _FillWindow(self.window)
+            for mount in mounts
+        }
+        self._last_statvfs = None
+
+    def _mounts_changed(self) -> bool:
+        return bool(self._poll.poll(0))
+
+    def _statvfs(self, mount: MountUsage, now: float) -> MountUsage:
+        try:
+            stat = os.statvfs(mount.mountpoint)
+        except OSError:
+            return mount
+        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        free = stat.f_bavail * stat.f_frsize
+        # Same formula as psutil: the space reserved for root is not counted as available.
+        percent = round(used / (used + free) * 100, 1) if used + free else 0.0
+
+        window = self._windows[(mount.mountpoint, mount.device)]
+        window.append(now, used)
+        fill_rate = window.fill_rate()
+        time_to_full = free / fill_rate if fill_rate and fill_rate > 0 else None
+        return MountUsage(
+            mount.mountpoint, mount.device, mount.fstype, stat.f_blocks * stat.f_frsize, free, percent, time_to_full
+        )
+
+    def sample(self) -> List[MountUsage]:
+        """
+        Returns the capacity of every mount, re-reading the mount table if it changed and running
+        statvfs if the interval has elapsed.
+
+        Returns:
+            List[MountUsage]: One entry per mounted filesystem, in mount order.
+        """
+        if self._mounts_changed():
+            self._read_mounts()
+        now = time.monotonic()
+        if self._last_statvfs is None or now - self._last_statvfs >= self.interval:
+            # New objects rather than updates in place, so snapshots holding the previous list never change.
+            self.mounts = [self._statvfs(mount, now) for mount in self.mounts]
+            self._last_statvfs = now
+        return self.mounts
+
+    def close(self) -> None:
+        """Closes /proc/self/mountinfo."""
+        self._poll.unregister(self._file)
+        self._file.close()
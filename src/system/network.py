@@ -0,0 +1,210 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .procfs import PersistentFile
+
+NET_DEV_PATH = "/proc/net/dev"
+SOCKSTAT_PATH = "/proc/net/sockstat"
+SOCKSTAT6_PATH = "/proc/net/sockstat6"
+
+LOOPBACK_INTERFACE = "lo"
+
+# Columns of /proc/net/dev kept per interface: rx bytes, packets, errs, drop and tx bytes, packets, errs, drop.
+_NET_DEV_COLUMNS = (0, 1, 2, 3, 8, 9, 10, 11)
+
+
+def counter_delta(previous: int, current: int) -> int:
+    """
+    Returns how much a kernel counter grew, allowing for one wraparound or a reset.
+
+    Interface counters are 64-bit, but some drivers still report 32-bit values, so a counter that
+    went down wrapped at 2**32 if its previous value fitted in 32 bits. A 64-bit counter never
+    wraps in practice; if it went down, the interface was re-created or its driver reset it, and
+    it has grown by its current value since.
+
+    Args:
+        previous (int): The value read on the previous tick.
+        current (int): The value read on this tick.
+
+    Returns:
+        int: The growth of the counter.
+    """
+    if current >= previous:
+        return current - previous
+    if previous >= 2**32:
+        return current
+    return current + 2**32 - previous
+
+
+class InterfaceStats:
+    """
+    The traffic of one network interface between two ticks.
+
+    Attributes:
+        name (str): The interface name, for example "eth0".
+        rx_rate (float): Bytes received per second.
+        tx_rate (float): Bytes sent per second.
+        rx_packets (float): Packets received per second.
+        tx_packets (float): Packets sent per second.
+        errors (int): Receive and transmit errors since the previous tick.
+        drops (int): Received and transmitted packets dropped since the previous tick.
+    """
+
+    __slots__ = ("name", "rx_rate", "tx_rate", "rx_packets", "tx_packets", "errors", "drops")
+
+    def __init__(
+        self,
+        name: str,
+        rx_rate: float,
+        tx_rate: float,
+        rx_packets: float,
+        tx_packets: float,
+        errors: int,
+        drops: int,
+    ) -> None:
+        self.name = name
+        self.rx_rate = rx_rate
+        self.tx_rate = tx_rate
+        self.rx_packets = rx_packets
+        self.tx_packets = tx_packets
+        self.errors = errors
+        self.drops = drops
+
+
+class TcpSockets:
+    """
+    The TCP socket counts of /proc/net/sockstat and /proc/net/sockstat6.
+
+    Attributes:
+        in_use (int): IPv4 and IPv6 sockets in use (every state but TIME_WAIT).
+        orphan (int): Sockets no longer attached to a process.
+        time_wait (int): Sockets in TIME_WAIT.
+        allocated (int): Allocated sockets, TIME_WAIT included.
+    """
+
+    __slots__ = ("in_use", "orphan", "time_wait", "allocated")
+
+    def __init__(self, in_use: int = 0, orphan: int = 0, time_wait: int = 0, allocated: int = 0) -> None:
+        self.in_use = in_use
+        self.orphan = orphan
+        self.time_wait = time_wait
+        self.allocated = allocated
+
+
+def _sockstat_fields(content: bytes, protocol: bytes) -> Dict[bytes, int]:
+    """Returns the "name value" pairs of one protocol line of a sockstat file."""
+    for line in content.splitlines():
+        label, _, values = line.partition(b":")
+        if label == protocol:
+            fields = values.split()
+            return {fields[i]: int(fields[i + 1]) for i in range(0, len(fields) - 1, 2)}
+    return {}
+
+
+class Network:
+    """
+    A class that derives per-interface throughput and TCP socket counts from /proc/net.
+
+    /proc/net/dev and /proc/net/sockstat are kept open and read once per tick. Only the counters of
+    the previous tick are kept, and rates are computed from their deltas with counter_delta(), so
+    a counter that wraps around does not produce a negative or huge rate.
+
+    Methods:
+        sample() -> List[InterfaceStats]: Returns the traffic of every interface since the previous sample.
+        read_tcp_sockets() -> TcpSockets: Returns the current TCP socket counts.
+        close() -> None: Closes the /proc/net files.
+
+    Usage:
+        1. Initialize an instance of the Network class:
+            network = Network()
+
+        2. Sample on every tick:
+            for interface in network.sample():
+                print(interface.name, interface.rx_rate, interface.tx_rate)
+            print(network.read_tcp_sockets().in_use)
+
+    Notes:
+        - The loopback interface is skipped unless skip_loopback is False.
+        - The first sample returns no interfaces, because there is no previous tick yet.
+    """
+
+    def __init__(self, skip_loopback: bool = True) -> None:
+        self.skip_loopback = skip_loopback
+        self.net_dev = PersistentFile(NET_DEV_PATH, size=4096, grow=True)
+        self.sockstat = PersistentFile(SOCKSTAT_PATH, size=512, grow=True)
+        self.sockstat6 = PersistentFile(SOCKSTAT6_PATH, size=512, grow=True) if os.path.exists(SOCKSTAT6_PATH) else None
+        self._counters: Dict[str, Tuple[int, ...]] = {}
+        self._last_sample_time: Optional[float] = None
+
+    def _read_counters(self) -> Dict[str, Tuple[int, ...]]:
+        length = self.net_dev.read()
+        counters = {}
+        # The first two lines are column headers.
+        for line in bytes(self.net_dev.buffer[:length]).splitlines()[2:]:
+            name, _, values = line.partition(b":")
+            interface = name.strip().decode()
+            if self.skip_loopback and interface == LOOPBACK_INTERFACE:
+                continue
+            fields = values.split()
+            counters[interface] = tuple(int(fields[column]) for column in _NET_DEV_COLUMNS)
+        return counters
+
+    def sample(self) -> List[InterfaceStats]:
+        """
+        Reads /proc/net/dev and returns the traffic of every interface since the previous sample.
+
+        Returns:
+            List[InterfaceStats]: One entry per interface, in /proc/net/dev order.
+        """
+        now = time.monotonic()
+        counters = self._read_counters()
+        elapsed = now - self._last_sample_time if self._last_sample_time is not None else 0.0
+        previous_counters = self._counters
+        self._counters = counters
+        self._last_sample_time = now
+        if elapsed <= 0:
+            return []
+
+        interfaces = []
+        for name, current in counters.items():
+            previous = previous_counters.get(name)
+            if previous is None:
+                continue
+            rx_bytes, rx_packets, rx_errors, rx_drops, tx_bytes, tx_packets, tx_errors, tx_drops = map(
+                counter_delta, previous, current
+            )
+            interfaces.append(
+                InterfaceStats(
+                    name,
+                    rx_bytes / elapsed,
+                    tx_bytes / elapsed,
+                    round(rx_packets / elapsed, 1),
+                    round(tx_packets / elapsed, 1),
+                    rx_errors + tx_errors,
+                    rx_drops + tx_drops,
+                )
+            )
+        return interfaces
+
+    def read_tcp_sockets(self) -> TcpSockets:
+        """
+        Reads the TCP socket counts of /proc/net/sockstat and /proc/net/sockstat6.
+
+        Returns:
+            TcpSockets: The current counts, IPv4 and IPv6 together.
+        """
+        length = self.sockstat.read()
+        tcp = _sockstat_fields(bytes(self.sockstat.buffer[:length]), b"TCP")
+        in_use = tcp.get(b"inuse", 0)
+        if self.sockstat6 is not None:
+            length = self.sockstat6.read()
+            in_use += _sockstat_fields(bytes(self.sockstat6.buffer[:length]), b"TCP6").get(b"inuse", 0)
+        return TcpSockets(in_use, tcp.get(b"orphan", 0), tcp.get(b"tw", 0), tcp.get(b"alloc", 0))
+
+    def close(self) -> None:
+        """Closes the /proc/net files."""
+        self.net_dev.close()
+        self.sockstat.close()
+        if self.sockstat6 is not None:
+            self.sockstat6.close()
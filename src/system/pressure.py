@@ -0,0 +1,148 @@
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from .procfs import PersistentFile
+
+PRESSURE_PATH = "/proc/pressure"
+RESOURCES = ("cpu", "memory", "io")
+
+
+def parse_pressure(content: bytes) -> Dict[str, Tuple[float, float, int]]:
+    """
+    Parses a PSI file such as /proc/pressure/memory or a cgroup's memory.pressure.
+
+    Args:
+        content (bytes): The content of the file.
+
+    Returns:
+        Dict[str, Tuple[float, float, int]]: (avg10, avg60, total) by line kind, "some" and, when
+        present, "full". The averages are percentages, total is in microseconds.
+    """
+    lines = {}
+    for line in content.splitlines():
+        kind, _, values = line.partition(b" ")
+        fields = dict(field.partition(b"=")[::2] for field in values.split())
+        lines[kind.decode()] = (float(fields[b"avg10"]), float(fields[b"avg60"]), int(fields[b"total"]))
+    return lines
+
+
+class PressureStats:
+    """
+    The Pressure Stall Information of one resource.
+
+    "some" is the share of time at least one task was stalled on the resource, "full" the share of
+    time all non-idle tasks were stalled at once (not reported for CPU by older kernels).
+
+    Attributes:
+        resource (str): "cpu", "memory" or "io".
+        some_rate (float): "some" stall time since the previous tick, as a percentage of the tick.
+        full_rate (float): "full" stall time since the previous tick, as a percentage of the tick.
+        some_avg10 (float): Kernel average of "some" over the last 10 seconds, as a percentage.
+        some_avg60 (float): Kernel average of "some" over the last 60 seconds, as a percentage.
+        full_avg10 (float): Kernel average of "full" over the last 10 seconds, as a percentage.
+        full_avg60 (float): Kernel average of "full" over the last 60 seconds, as a percentage.
+    """
+
+    __slots__ = ("resource", "some_rate", "full_rate", "some_avg10", "some_avg60", "full_avg10", "full_avg60")
+
+    def __init__(
+        self,
+        resource: str,
+        some_rate: float,
+        full_rate: float,
+        some_avg10: float,
+        some_avg60: float,
+        full_avg10: float,
+        full_avg60: float,
+    ) -> None:
+        self.resource = resource
+        self.some_rate = some_rate
+        self.full_rate = full_rate
+        self.some_avg10 = some_avg10
+        self.some_avg60 = some_avg60
+        self.full_avg10 = full_avg10
+        self.full_avg60 = full_avg60
+
+
+class Pressure:
+    """
+    A class that reads Pressure Stall Information for CPU, memory and I/O from /proc/pressure.
+
+    The three files are kept open and read once per tick. Besides the kernel's avg10/avg60
+    averages, the cumulative "total" stall counters are turned into per-tick stall rates, so a
+    short stall shows up on the tick it happened instead of being smoothed over 10 seconds.
+
+    Methods:
+        sample() -> Dict[str, PressureStats]: Reads the pressure of every resource.
+        close() -> None: Closes the pressure files.
+
+    Usage:
+        1. Initialize an instance of the Pressure class:
+            pressure = Pressure()
+
+        2. Sample on every tick:
+            memory = pressure.sample().get("memory")
+            if memory is not None:
+                print(memory.some_rate, memory.full_avg10)
+
+    Notes:
+        - PSI needs Linux 4.20 or later with CONFIG_PSI, and can be disabled with psi=0 on the kernel
+          command line. Resources whose file cannot be read are left out of the samples.
+        - The first sample reports zero rates, because there is no previous tick yet.
+    """
+
+    def __init__(self, path: str = PRESSURE_PATH) -> None:
+        self.files: Dict[str, PersistentFile] = {}
+        for resource in RESOURCES:
+            try:
+                self.files[resource] = PersistentFile(os.path.join(path, resource), size=256)
+            except OSError:
+                continue
+        self._totals: Dict[str, Tuple[int, int]] = {}
+        self._last_sample_time: Optional[float] = None
+
+    def _read(self, resource: str) -> Dict[str, Tuple[float, float, int]]:
+        file = self.files[resource]
+        length = file.read()
+        return parse_pressure(bytes(file.buffer[:length]))
+
+    def sample(self) -> Dict[str, PressureStats]:
+        """
+        Reads the pressure of every resource and turns the stall counters into rates.
+
+        Returns:
+            Dict[str, PressureStats]: The pressure by resource ("cpu", "memory", "io").
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_sample_time if self._last_sample_time is not None else 0.0
+        self._last_sample_time = now
+
+        stats = {}
+        for resource in list(self.files):
+            try:
+                lines = self._read(resource)
+            except (OSError, KeyError, ValueError):
+                # PSI is compiled in but disabled, reading the file fails with EOPNOTSUPP.
+                self.files.pop(resource).close()
+                continue
+            some_avg10, some_avg60, some_total = lines["some"]
+            full_avg10, full_avg60, full_total = lines.get("full", (0.0, 0.0, 0))
+
+            some_rate = full_rate = 0.0
+            previous = self._totals.get(resource)
+            if previous is not None and elapsed > 0:
+                some_rate = round(min((some_total - previous[0]) / 1e6 / elapsed * 100, 100.0), 2)
+                full_rate = round(min((full_total - previous[1]) / 1e6 / elapsed * 100, 100.0), 2)
+            self._totals[resource] = (some_total, full_total)
+
+            stats[resource] = PressureStats(
+                resource, some_rate, full_rate, some_avg10, some_avg60, full_avg10, full_avg60
+            )
+        return stats
+
+    def close(self) -> None:
+        """Closes the pressure files."""
+        for file in self.files.values():
+            file.close()
+        self.files.clear()
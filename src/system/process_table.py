@@ -0,0 +1,219 @@
+import heapq
+import os
+import pwd
+import time
+from typing import Dict, List, Optional, Tuple
+
+PROC_PATH = "/proc"
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# Field positions in /proc/<pid>/stat after the ")" that closes the command name (field 3 is index 0).
+_UTIME, _STIME, _STARTTIME, _RSS = 11, 12, 19, 21
+
+SORT_KEYS = ("cpu", "memory", "io")
+
+# Number of processes kept in a snapshot and rendered by the interfaces.
+TOP_PROCESSES = 10
+
+
+class ProcessInfo:
+    """
+    Attributes of a process that never change during its lifetime, cached by (pid, start time).
+
+    Attributes:
+        name (str): The command name from /proc/<pid>/stat.
+        cmdline (str): The full command line, or the name in brackets for kernel threads.
+        exe (str): The executable path, or "" if it is not readable.
+        user (str): The name (or uid) of the owner.
+        io_readable (bool): Whether /proc/<pid>/io can be read; it is not retried once access is denied.
+    """
+
+    __slots__ = ("name", "cmdline", "exe", "user", "io_readable")
+
+    def __init__(self, name: str, cmdline: str, exe: str, user: str) -> None:
+        self.name = name
+        self.cmdline = cmdline
+        self.exe = exe
+        self.user = user
+        self.io_readable = True
+
+
+class ProcessEntry:
+    """
+    One row of the process table for one tick.
+
+    Attributes:
+        pid (int): The process id.
+        info (ProcessInfo): The cached static attributes.
+        cpu_percent (float): CPU usage since the previous tick, where 100 is one fully used core.
+        rss (int): Resident memory in bytes.
+        io_rate (float): Bytes read and written per second since the previous tick.
+    """
+
+    __slots__ = ("pid", "info", "cpu_percent", "rss", "io_rate")
+
+    def __init__(self, pid: int, info: ProcessInfo, cpu_percent: float, rss: int, io_rate: float) -> None:
+        self.pid = pid
+        self.info = info
+        self.cpu_percent = cpu_percent
+        self.rss = rss
+        self.io_rate = io_rate
+
+
+class ProcessTable:
+    """
+    An incremental, top-like process table built from /proc.
+
+    Static attributes (name, command line, executable, owner) are read once per process and cached
+    by (pid, start time), so a reused pid never inherits another process's attributes. Every tick
+    only /proc/<pid>/stat and /proc/<pid>/io are re-read, and the top processes are selected with a
+    heap instead of sorting the whole table. /proc/<pid>/io is skipped for processes that have not
+    been scheduled since the previous tick, which on busy hosts is the vast majority.
+
+    Methods:
+        sample() -> List[ProcessEntry]: Re-reads the changing counters of every process.
+        top(n: int, key: str) -> List[ProcessEntry]: Returns the n heaviest processes of the last sample.
+
+    Usage:
+        1. Initialize an instance of the ProcessTable class:
+            table = ProcessTable()
+
+        2. Sample on every tick and pick the top processes:
+            table.sample()
+            for entry in table.top(10, "cpu"):
+                print(entry.pid, entry.info.name, entry.cpu_percent)
+
+    Notes:
+        - The first sample reports 0% CPU and 0 B/s I/O, because there is no previous tick yet.
+        - /proc/<pid>/io of other users' processes is only readable as root; such processes report 0 B/s.
+    """
+
+    def __init__(self, proc_path: str = PROC_PATH) -> None:
+        self.proc_path = proc_path
+        self.entries: List[ProcessEntry] = []
+        self._static: Dict[Tuple[int, int], ProcessInfo] = {}
+        self._counters: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._users: Dict[int, str] = {}
+        self._last_sample_time: Optional[float] = None
+
+    def _user(self, uid: int) -> str:
+        user = self._users.get(uid)
+        if user is None:
+            try:
+                user = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                user = str(uid)
+            self._users[uid] = user
+        return user
+
+    def _read_static(self, directory: str, name: str, uid: int) -> ProcessInfo:
+        try:
+            with open(os.path.join(directory, "cmdline"), "rb") as file:
+                cmdline = file.read().replace(b"\0", b" ").decode(errors="replace").strip()
+        except OSError:
+            cmdline = ""
+        try:
+            exe = os.readlink(os.path.join(directory, "exe"))
+        except OSError:
+            exe = ""
+        return ProcessInfo(name, cmdline or f"[{name}]", exe, self._user(uid))
+
+    @staticmethod
+    def _read_io(directory: str) -> int:
+        with open(os.path.join(directory, "io"), "rb") as file:
+            content = file.read()
+        total = 0
+        for line in content.splitlines():
+            if line.startswith(b"read_bytes:") or line.startswith(b"write_bytes:"):
+                total += int(line.split()[1])
+        return total
+
+    def _read_process(self, pid: int, elapsed: float) -> Tuple[Tuple[int, int], ProcessEntry, Tuple[int, int]]:
+        directory = os.path.join(self.proc_path, str(pid))
+        with open(os.path.join(directory, "stat"), "rb") as file:
+            stat = file.read()
+        name_end = stat.rindex(b")")
+        fields = stat[name_end + 2 :].split()
+        cpu_ticks = int(fields[_UTIME]) + int(fields[_STIME])
+        key = (pid, int(fields[_STARTTIME]))
+
+        info = self._static.get(key)
+        if info is None:
+            name = stat[stat.index(b"(") + 1 : name_end].decode(errors="replace")
+            info = self._read_static(directory, name, os.stat(directory).st_uid)
+
+        previous = self._counters.get(key)
+        if previous is not None and previous[0] == cpu_ticks:
+            # A process that has not run since the previous tick cannot have issued I/O.
+            io_bytes = previous[1]
+        elif info.io_readable:
+            try:
+                io_bytes = self._read_io(directory)
+            except PermissionError:
+                info.io_readable = False
+                io_bytes = 0
+        else:
+            io_bytes = 0
+
+        cpu_percent = io_rate = 0.0
+        if previous is not None and elapsed > 0:
+            cpu_percent = round((cpu_ticks - previous[0]) / CLOCK_TICKS / elapsed * 100, 1)
+            io_rate = max(io_bytes - previous[1], 0) / elapsed
+
+        entry = ProcessEntry(pid, info, cpu_percent, int(fields[_RSS]) * PAGE_SIZE, io_rate)
+        return key, entry, (cpu_ticks, io_bytes)
+
+    def sample(self) -> List[ProcessEntry]:
+        """
+        Re-reads the changing counters of every process and drops processes that have exited.
+
+        Returns:
+            List[ProcessEntry]: One entry per running process.
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_sample_time if self._last_sample_time is not None else 0.0
+
+        entries = []
+        counters: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        static: Dict[Tuple[int, int], ProcessInfo] = {}
+        for directory in os.scandir(self.proc_path):
+            if not directory.name.isdigit():
+                continue
+            try:
+                key, entry, process_counters = self._read_process(int(directory.name), elapsed)
+            except (OSError, ValueError, IndexError):
+                # The process exited while it was being read.
+                continue
+            entries.append(entry)
+            counters[key] = process_counters
+            static[key] = entry.info
+
+        self._static = static
+        self._counters = counters
+        self._last_sample_time = now
+        self.entries = entries
+        return entries
+
+    def top(self, n: int = TOP_PROCESSES, key: str = "cpu") -> List[ProcessEntry]:
+        """
+        Returns the n heaviest processes of the last sample.
+
+        Args:
+            n (int): Number of processes to return.
+            key (str): "cpu", "memory" or "io".
+
+        Returns:
+            List[ProcessEntry]: The processes, heaviest first.
+
+        Raises:
+            ValueError: If the key is unknown.
+        """
+        if key == "cpu":
+            return heapq.nlargest(n, self.entries, key=lambda entry: entry.cpu_percent)
+        if key == "memory":
+            return heapq.nlargest(n, self.entries, key=lambda entry: entry.rss)
+        if key == "io":
+            return heapq.nlargest(n, self.entries, key=lambda entry: entry.io_rate)
+        raise ValueError(f"Unknown sort key {key!r}, expected one of {SORT_KEYS}")
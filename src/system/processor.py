@@ -1,6 +1,8 @@
 import importlib
+from typing import List
 
-import psutil
+from .cpu_times import CpuTimes, CpuUsage
+from .cpufreq import CpuFrequency
 
 module_name = "settings"
 settings = importlib.import_module(module_name)
@@ -13,12 +15,17 @@ class Processor:
     Attributes:
         system_info (settings_interface.SystemInfo): An instance of the SystemInfo class for
         retrieving system information.
+        cpu_times (CpuTimes): The non-blocking engine that computes CPU shares from /proc/stat deltas.
+        cpu_frequency (CpuFrequency): Reads the per-core frequencies from cpufreq through cached descriptors.
 
     Methods:
+        get_cpu_usage() -> CpuUsage: Returns aggregate and per-core CPU shares since the previous call.
         get_cpu_load() -> List[float]: Returns the CPU load as a percentage for each CPU core.
-        get_cpu_frequency() -> int: Returns the current frequency of the CPU in megahertz (MHz).
-        get_max_cpu_frequency() -> int: Returns the maximum CPU frequency in megahertz (MHz).
+        get_core_frequencies() -> List[float]: Returns the current frequency of each CPU core in MHz.
+        get_cpu_frequency() -> float: Returns the current frequency of the CPU in megahertz (MHz).
+        get_max_cpu_frequency() -> float: Returns the maximum CPU frequency in megahertz (MHz).
         check_info() -> None: Prints information about the CPU, including load and frequency.
+        close() -> None: Closes the cpufreq files.
 
     Usage:
         1. Initialize an instance of the Processor class:
@@ -32,19 +39,32 @@ class Processor:
 
     Notes:
         - The Processor class depends on the settings_interface module for system information.
+        - The CPU load is never measured by sleeping. cpu_percent_interval is the minimum spacing
+          between two /proc/stat reads; calls that come sooner reuse the previous result.
     """
 
     def __init__(self) -> None:
         self.system_info = settings.SystemInfo()
+        self.cpu_times = CpuTimes(min_interval=self.system_info.cpu_percent_interval)
+        self.cpu_frequency = CpuFrequency()
 
-    def get_cpu_load(self) -> float:
+    def get_cpu_usage(self) -> CpuUsage:
+        """
+        Returns aggregate and per-core CPU shares (utilisation, iowait, steal, irq) since the previous call.
+
+        Returns:
+            CpuUsage: Aggregate and per-core CPU shares.
+        """
+        return self.cpu_times.sample()
+
+    def get_cpu_load(self) -> List[float]:
         """
         Returns the CPU load as a percentage for each CPU core.
 
         Returns:
-            float: A list of CPU load percentages for each CPU core.
+            List[float]: A list of CPU load percentages for each CPU core.
         """
-        return psutil.cpu_percent(interval=self.system_info.cpu_percent_interval, percpu=True)
+        return self.get_cpu_usage().per_core_load
 
     def check_info(self) -> None:
         """
@@ -55,22 +75,33 @@ class Processor:
         print(f"CPU Frequency: {self.get_cpu_frequency()} MHz")
         print(f"Max CPU Frequency: {self.get_max_cpu_frequency()} MHz")
 
-    @staticmethod
-    def get_cpu_frequency() -> float:
+    def get_core_frequencies(self) -> List[float]:
         """
-        Returns the current frequency of the CPU in megahertz (MHz).
+        Returns the current frequency of each CPU core.
+
+        Returns:
+            List[float]: Current frequencies in megahertz (MHz), ordered by CPU number.
+        """
+        return self.cpu_frequency.read()
+
+    def get_cpu_frequency(self) -> float:
+        """
+        Returns the current frequency of the CPU in megahertz (MHz), averaged over all cores.
 
         Returns:
             float: Current frequency of the CPU in megahertz (MHz).
         """
-        return float(psutil.cpu_freq().current)
+        return self.cpu_frequency.read_average()
 
-    @staticmethod
-    def get_max_cpu_frequency() -> float:
+    def get_max_cpu_frequency(self) -> float:
         """
-        Returns the maximum CPU frequency in megahertz (MHz).
+        Returns the maximum CPU frequency in megahertz (MHz), which is read once at start-up.
 
         Returns:
             float: Maximum CPU frequency in megahertz (MHz).
         """
-        return float(psutil.cpu_freq().max)
+        return self.cpu_frequency.max_frequency()
+
+    def close(self) -> None:
+        """Closes the cpufreq files."""
+        self.cpu_frequency.close()
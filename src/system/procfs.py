@@ -0,0 +1,250 @@
+import os
+from typing import List, Optional, Tuple
+
+PROC_STAT_PATH = "/proc/stat"
+PROC_MEMINFO_PATH = "/proc/meminfo"
+PROC_CPUINFO_PATH = "/proc/cpuinfo"
+CPUFREQ_GLOB = "/sys/devices/system/cpu/cpu[0-9]*/cpufreq"
+
+STAT_COLUMNS = 8
+
+_DIGIT_0 = ord("0")
+_DIGIT_9 = ord("9")
+
+
+def parse_uint(buffer: bytearray, position: int, end: int) -> Tuple[int, int]:
+    """
+    Parses the next unsigned integer in a buffer without creating intermediate strings.
+
+    Args:
+        buffer (bytearray): The buffer to parse.
+        position (int): Where to start looking for the first digit.
+        end (int): The end of the valid data in the buffer.
+
+    Returns:
+        Tuple[int, int]: The parsed value and the position right after its last digit.
+    """
+    while position < end and not _DIGIT_0 <= buffer[position] <= _DIGIT_9:
+        position += 1
+    value = 0
+    while position < end:
+        digit = buffer[position]
+        if not _DIGIT_0 <= digit <= _DIGIT_9:
+            break
+        value = value * 10 + digit - _DIGIT_0
+        position += 1
+    return value, position
+
+
+def read_file(path: str) -> Optional[bytes]:
+    """
+    Reads a small /proc, /sys or cgroup file once, for values that are not re-read every tick.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        bytes or None: The content of the file, or None if it does not exist or cannot be read.
+    """
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def read_attribute(path: str) -> Optional[str]:
+    """
+    Reads a single-value sysfs attribute once, such as a device name or a limit.
+
+    Args:
+        path (str): The path of the attribute.
+
+    Returns:
+        str or None: The stripped content of the attribute, or None if it cannot be read.
+    """
+    content = read_file(path)
+    return content.decode(errors="replace").strip() if content is not None else None
+
+
+def sort_by_cpu_number(paths: List[str]) -> List[str]:
+    """
+    Sorts sysfs paths like /sys/devices/system/cpu/cpu10/... by their CPU number.
+
+    Args:
+        paths (List[str]): Paths that contain a "cpuN" component.
+
+    Returns:
+        List[str]: The paths ordered by N.
+    """
+
+    def cpu_number(path: str) -> int:
+        component = next(part for part in path.split("/") if part.startswith("cpu") and part[3:].isdigit())
+        return int(component[3:])
+
+    return sorted(paths, key=cpu_number)
+
+
+class PersistentFile:
+    """
+    A /proc or /sys file that stays open and is re-read with pread into a preallocated buffer.
+
+    procfs and sysfs regenerate the content of a file on every read at offset 0, so there is no
+    need to open and close the file on every tick.
+
+    Attributes:
+        path (str): The path of the file.
+        buffer (bytearray): The buffer the file is read into.
+        length (int): The number of valid bytes in the buffer after the last read.
+
+    Methods:
+        read() -> int: Re-reads the file into the buffer and returns the number of bytes read.
+        read_uint() -> int: Re-reads the file and parses its first unsigned integer.
+        read_int() -> int: Re-reads a file that holds a single, possibly negative integer.
+        read_text() -> str: Re-reads the file and returns its stripped content.
+        close() -> None: Closes the file descriptor.
+
+    Notes:
+        - With grow=False, files larger than the buffer are truncated to its size, which is used to read
+          only the head of a file (for example the "cpu" lines of /proc/stat).
+    """
+
+    def __init__(self, path: str, size: int = 64, grow: bool = False) -> None:
+        self.path = path
+        self.grow = grow
+        self.buffer = bytearray(size)
+        self.length = 0
+        self.fd: Optional[int] = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+
+    def read(self) -> int:
+        """
+        Re-reads the file into the buffer.
+
+        Returns:
+            int: The number of valid bytes in the buffer.
+        """
+        if self.fd is None:
+            raise ValueError(f"{self.path} is closed")
+        self.length = os.preadv(self.fd, [self.buffer], 0)
+        while self.grow and self.length == len(self.buffer):
+            self.buffer = bytearray(len(self.buffer) * 2)
+            self.length = os.preadv(self.fd, [self.buffer], 0)
+        return self.length
+
+    def read_uint(self) -> int:
+        """
+        Re-reads the file and parses its first unsigned integer.
+
+        Returns:
+            int: The first unsigned integer in the file.
+        """
+        length = self.read()
+        return parse_uint(self.buffer, 0, length)[0]
+
+    def read_int(self) -> int:
+        """
+        Re-reads a file that holds a single, possibly negative integer, such as a temperature.
+
+        Returns:
+            int: The integer in the file.
+
+        Raises:
+            ValueError: If the file does not hold a single integer.
+        """
+        length = self.read()
+        return int(self.buffer[:length])
+
+    def read_text(self) -> str:
+        """
+        Re-reads the file and returns its content. Meant for values that are read once.
+
+        Returns:
+            str: The stripped content of the file.
+        """
+        length = self.read()
+        return self.buffer[:length].decode(errors="replace").strip()
+
+    def close(self) -> None:
+        """Closes the file descriptor."""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ProcfsReader:
+    """
+    A low-level reader for the /proc and /sys values the monitor uses, as an alternative to psutil.
+
+    The reader keeps /proc/stat and /proc/meminfo open and re-reads them with pread into
+    preallocated buffers. Only the fields the monitor renders are parsed. CPU frequencies are read
+    by CpuFrequency, which the processor uses with both backends.
+
+    Methods:
+        read_cpu_counters() -> List[List[int]]: Returns the "cpu" counters of /proc/stat.
+        read_memory() -> Tuple[float, int, int]: Returns memory usage percent, used bytes and total bytes.
+        close() -> None: Closes all file descriptors.
+
+    Usage:
+        1. Initialize an instance of the ProcfsReader class:
+            reader = ProcfsReader()
+
+        2. Read the values on every tick:
+            percent, used, total = reader.read_memory()
+
+    Notes:
+        - The "cpu" lines of /proc/stat are split and converted with bytes.split() and int(), which run
+          in C. On a 128-CPU /proc/stat this takes about 0.40 ms per read against 0.45 ms for open()
+          and split(); walking the digits with parse_uint() in Python took 1.47 ms.
+    """
+
+    def __init__(self) -> None:
+        cpu_count = os.cpu_count() or 1
+        # A "cpu" line is at most ~ 8 * 20 digits; the rest of /proc/stat is never read.
+        self.stat = PersistentFile(PROC_STAT_PATH, size=200 * (cpu_count + 1))
+        self.meminfo = PersistentFile(PROC_MEMINFO_PATH, size=4096)
+
+    def read_cpu_counters(self) -> List[List[int]]:
+        """
+        Returns the counters of the "cpu" lines of /proc/stat.
+
+        Returns:
+            List[List[int]]: The aggregate counters followed by the counters of each core.
+        """
+        end = self.stat.read()
+        counters = []
+        for line in self.stat.buffer[:end].split(b"\n"):
+            if not line.startswith(b"cpu"):
+                break
+            counters.append(list(map(int, line.split()[1 : STAT_COLUMNS + 1])))
+        return counters
+
+    def _meminfo_field(self, name: bytes, end: int) -> int:
+        position = self.meminfo.buffer.find(name, 0, end)
+        if position < 0:
+            return 0
+        return parse_uint(self.meminfo.buffer, position + len(name), end)[0] * 1024
+
+    def read_memory(self) -> Tuple[float, int, int]:
+        """
+        Returns the memory usage in the same terms as psutil.virtual_memory().
+
+        Returns:
+            Tuple[float, int, int]: Usage as a percentage, used bytes and total bytes.
+        """
+        end = self.meminfo.read()
+        total = self._meminfo_field(b"MemTotal:", end)
+        free = self._meminfo_field(b"MemFree:", end)
+        available = self._meminfo_field(b"MemAvailable:", end)
+        buffers = self._meminfo_field(b"Buffers:", end)
+        cached = self._meminfo_field(b"\nCached:", end) + self._meminfo_field(b"SReclaimable:", end)
+
+        used = total - free - cached - buffers
+        if used < 0:
+            used = total - free
+        percent = round((total - available) / total * 100, 1) if total else 0.0
+        return percent, used, total
+
+    def close(self) -> None:
+        """Closes all file descriptors."""
+        self.stat.close()
+        self.meminfo.close()
@@ -0,0 +1,140 @@
+import glob
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from .procfs import PersistentFile, read_attribute
+
+# The MSR-based zones "intel-rapl:0", "intel-rapl:0:0", ... The "intel-rapl-mmio:0" zone of recent Intel
+# CPUs is another interface to the same package counter, so it is not matched.
+POWERCAP_GLOB = "/sys/class/powercap/intel-rapl:*"
+
+# Package domains are named "package-0", "package-1", ... one per socket.
+PACKAGE_DOMAIN_PREFIX = "package-"
+
+# Joins the package name and the name of one of its subdomains, as in "package-0/core".
+SUBDOMAIN_SEPARATOR = "/"
+
+
+class PowerReading:
+    """
+    The average power of one RAPL domain between two ticks.
+
+    Attributes:
+        domain (str): The domain name, for example "package-0", "psys", or "package-0/core",
+            "package-0/uncore" and "package-0/dram" for the subdomains of a package.
+        watts (float): Average power in watts.
+    """
+
+    __slots__ = ("domain", "watts")
+
+    def __init__(self, domain: str, watts: float) -> None:
+        self.domain = domain
+        self.watts = watts
+
+    @property
+    def is_package(self) -> bool:
+        """Whether the domain is a whole CPU package."""
+        return self.domain.startswith(PACKAGE_DOMAIN_PREFIX) and SUBDOMAIN_SEPARATOR not in self.domain
+
+
+class _RaplDomain:
+    """A discovered RAPL domain: its name, the wraparound range of its counter and its energy file, kept open."""
+
+    __slots__ = ("name", "max_energy_range", "file")
+
+    def __init__(self, name: str, max_energy_range: int, path: str) -> None:
+        self.name = name
+        self.max_energy_range = max_energy_range
+        self.file = PersistentFile(path, size=32)
+
+
+class Rapl:
+    """
+    A class that turns the RAPL energy counters of powercap into CPU package, core and DRAM power.
+
+    Each domain's energy_uj counter is opened once and re-read with pread every tick; the power is
+    the energy consumed since the previous tick divided by the elapsed time. The counters wrap
+    around at max_energy_range_uj, which is read once per domain.
+
+    Methods:
+        sample() -> List[PowerReading]: Returns the average power of every domain since the previous sample.
+        close() -> None: Closes the energy files.
+
+    Usage:
+        1. Initialize an instance of the Rapl class:
+            rapl = Rapl()
+
+        2. Sample on every tick:
+            for reading in rapl.sample():
+                print(reading.domain, reading.watts)
+
+    Notes:
+        - Intel and AMD CPUs both expose RAPL as "intel-rapl" powercap zones. Subdomains are named after
+          their package, so the core and DRAM power of each socket can be told apart.
+        - Domains are reported once by name, even if the glob matches two zones for the same domain.
+        - Since Linux 5.10, energy_uj is only readable by root; domains that cannot be opened are skipped.
+        - The first sample returns no readings, because there is no previous tick yet.
+    """
+
+    def __init__(self, powercap_glob: str = POWERCAP_GLOB) -> None:
+        self.domains: List[_RaplDomain] = []
+        names = set()
+        for zone in sorted(glob.glob(powercap_glob)):
+            energy_path = os.path.join(zone, "energy_uj")
+            name = self._domain_name(zone)
+            if name is None or name in names or not os.path.exists(energy_path):
+                continue
+            try:
+                with open(os.path.join(zone, "max_energy_range_uj")) as range_file:
+                    max_energy_range = int(range_file.read())
+                self.domains.append(_RaplDomain(name, max_energy_range, energy_path))
+                names.add(name)
+            except (OSError, ValueError):
+                logging.debug("Skipping unreadable RAPL domain %s", zone)
+        self._energy: Dict[str, int] = {}
+        self._last_sample_time: Optional[float] = None
+
+    @staticmethod
+    def _domain_name(zone: str) -> Optional[str]:
+        """Returns the name of a zone, prefixed with its package name for a subzone such as "intel-rapl:0:1"."""
+        name = read_attribute(os.path.join(zone, "name"))
+        parent, _, _ = os.path.basename(zone).rpartition(":")
+        if name is None or ":" not in parent:
+            return name
+        package = read_attribute(os.path.join(os.path.dirname(zone), parent, "name"))
+        return f"{package}{SUBDOMAIN_SEPARATOR}{name}" if package else name
+
+    def sample(self) -> List[PowerReading]:
+        """
+        Reads every energy counter and returns the average power since the previous sample.
+
+        Returns:
+            List[PowerReading]: One reading per domain, in powercap order.
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_sample_time if self._last_sample_time is not None else 0.0
+        self._last_sample_time = now
+
+        readings = []
+        energy = {}
+        for domain in self.domains:
+            key = domain.file.path
+            try:
+                energy[key] = current = domain.file.read_uint()
+            except OSError:
+                continue
+            previous = self._energy.get(key)
+            if previous is None or elapsed <= 0:
+                continue
+            consumed = current - previous if current >= previous else domain.max_energy_range - previous + current
+            readings.append(PowerReading(domain.name, round(consumed / 1e6 / elapsed, 2)))
+        self._energy = energy
+        return readings
+
+    def close(self) -> None:
+        """Closes the energy files."""
+        for domain in self.domains:
+            domain.file.close()
+        self.domains = []
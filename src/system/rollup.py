@@ -0,0 +1,278 @@
+import math
+import time
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .history import WindowStats
+from .snapshot import SystemSnapshot
+
+# (resolution in seconds, number of buckets): 15 minutes of 1 s, 3 hours of 10 s, 1 day of 1 min, 1 week of 1 h.
+ROLLUP_TIERS: Tuple[Tuple[float, int], ...] = ((1.0, 900), (10.0, 1080), (60.0, 1440), (3600.0, 168))
+
+
+class Bucket(NamedTuple):
+    start: float
+    minimum: float
+    maximum: float
+    mean: float
+    samples: int
+
+
+class _TierColumn:
+    """The min, max, sum and count arrays of one metric in one tier."""
+
+    __slots__ = ("minimum", "maximum", "total", "count")
+
+    def __init__(self, capacity: int) -> None:
+        self.minimum = array("d", [math.inf]) * capacity
+        self.maximum = array("d", [-math.inf]) * capacity
+        self.total = array("d", bytes(8 * capacity))
+        self.count = array("L", bytes(array("L").itemsize * capacity))
+
+    def reset(self, position: int) -> None:
+        self.minimum[position] = math.inf
+        self.maximum[position] = -math.inf
+        self.total[position] = 0.0
+        self.count[position] = 0
+
+    def add(self, position: int, value: float) -> None:
+        if value < self.minimum[position]:
+            self.minimum[position] = value
+        if value > self.maximum[position]:
+            self.maximum[position] = value
+        self.total[position] += value
+        self.count[position] += 1
+
+
+class RollupTier:
+    """
+    One downsampling tier: a ring of fixed-width time buckets holding min, max, sum and count per metric.
+
+    Every raw sample updates the bucket it falls into, so aggregates are maintained incrementally and
+    never recomputed from raw samples.
+
+    Attributes:
+        resolution (float): Bucket width in seconds.
+        capacity (int): Number of buckets kept.
+
+    Methods:
+        add(timestamp: float, values: Dict[str, float]) -> None: Adds one raw sample of several metrics.
+        buckets(metric: str, seconds: float) -> List[Bucket]: Returns the non-empty buckets of a window.
+        stats(metric: str, seconds: float) -> Optional[WindowStats]: Aggregates the buckets of a window.
+    """
+
+    def __init__(self, resolution: float, capacity: int) -> None:
+        self.resolution = resolution
+        self.capacity = capacity
+        self.columns: Dict[str, _TierColumn] = {}
+        self._bucket_ids = array("q", [-1]) * capacity
+        self._current_bucket: Optional[int] = None
+        self._position = 0
+
+    @property
+    def span(self) -> float:
+        """The time span covered by the tier in seconds."""
+        return self.resolution * self.capacity
+
+    def _advance(self, bucket: int) -> None:
+        if self._current_bucket is None:
+            steps = 1
+        else:
+            steps = min(bucket - self._current_bucket, self.capacity)
+        for _ in range(steps):
+            self._position = (self._position + 1) % self.capacity
+            self._bucket_ids[self._position] = -1
+            for column in self.columns.values():
+                column.reset(self._position)
+        self._bucket_ids[self._position] = bucket
+        self._current_bucket = bucket
+
+    def add(self, timestamp: float, values: Dict[str, float]) -> None:
+        """
+        Adds one raw sample of several metrics to the bucket it falls into.
+
+        Args:
+            timestamp (float): Monotonic time of the sample in seconds.
+            values (Dict[str, float]): Metric values by name.
+        """
+        bucket = int(timestamp // self.resolution)
+        if self._current_bucket is None or bucket > self._current_bucket:
+            self._advance(bucket)
+        elif bucket < self._current_bucket:
+            # Out-of-order samples would land in a bucket that was already closed.
+            return
+
+        position = self._position
+        for name, value in values.items():
+            if math.isnan(value):
+                continue
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = _TierColumn(self.capacity)
+            column.add(position, value)
+
+    def _positions(self, seconds: Optional[float], now: Optional[float]) -> Sequence[int]:
+        if self._current_bucket is None:
+            return ()
+        oldest = self._current_bucket - self.capacity + 1
+        if seconds is not None:
+            if now is None:
+                now = time.monotonic()
+            oldest = max(oldest, int((now - seconds) // self.resolution))
+        count = self._current_bucket - oldest + 1
+        return [(self._position - offset) % self.capacity for offset in range(count - 1, -1, -1)]
+
+    def buckets(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None) -> List[Bucket]:
+        """
+        Returns the non-empty buckets of a metric, oldest first.
+
+        Args:
+            metric (str): The metric name.
+            seconds (float, optional): Only return buckets of the last `seconds`. All buckets if omitted.
+            now (float, optional): The monotonic time the window ends at. Defaults to time.monotonic().
+
+        Returns:
+            List[Bucket]: The buckets with their start time, min, max, mean and sample count.
+        """
+        column = self.columns.get(metric)
+        if column is None:
+            return []
+        return [
+            Bucket(
+                start=self._bucket_ids[position] * self.resolution,
+                minimum=column.minimum[position],
+                maximum=column.maximum[position],
+                mean=column.total[position] / column.count[position],
+                samples=column.count[position],
+            )
+            for position in self._positions(seconds, now)
+            if column.count[position] and self._bucket_ids[position] >= 0
+        ]
+
+    def stats(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None) -> Optional[WindowStats]:
+        """
+        Aggregates the buckets of a window into min, max and mean.
+
+        Args:
+            metric (str): The metric name.
+            seconds (float, optional): The window length. All buckets are used if omitted.
+            now (float, optional): The monotonic time the window ends at. Defaults to time.monotonic().
+
+        Returns:
+            WindowStats or None: The statistics, or None if the window holds no samples.
+        """
+        column = self.columns.get(metric)
+        if column is None:
+            return None
+        positions = [
+            position
+            for position in self._positions(seconds, now)
+            if column.count[position] and self._bucket_ids[position] >= 0
+        ]
+        if not positions:
+            return None
+        count = sum(column.count[position] for position in positions)
+        return WindowStats(
+            samples=count,
+            minimum=min(column.minimum[position] for position in positions),
+            maximum=max(column.maximum[position] for position in positions),
+            mean=math.fsum(column.total[position] for position in positions) / count,
+        )
+
+
+class MetricRollup:
+    """
+    Multi-resolution rollups of every metric, from 1 second up to 1 hour buckets.
+
+    Memory is bounded by the number of tiers, buckets and metrics, independent of how long the
+    monitor runs, which makes day-long history affordable on machines with many cores.
+
+    Methods:
+        append(snapshot: SystemSnapshot) -> None: Adds the metrics of a snapshot to every tier.
+        tier(resolution: float) -> RollupTier: Returns the tier with the given resolution.
+        tier_for(seconds: float) -> RollupTier: Returns the coarsest tier that still resolves a window.
+        stats(metric: str, seconds: float) -> Optional[WindowStats]: Aggregates a window from the best tier.
+
+    Usage:
+        1. Initialize an instance of the MetricRollup class and feed it snapshots:
+            rollup = MetricRollup()
+            rollup.append(snapshot)
+
+        2. Query day-long history:
+            day = rollup.stats("cpu", seconds=86400)
+            minutes = rollup.tier(60).buckets("ram", seconds=3600)
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[float, int]] = ROLLUP_TIERS) -> None:
+        self.tiers = [RollupTier(resolution, capacity) for resolution, capacity in sorted(tiers)]
+
+    def append_values(self, timestamp: float, values: Dict[str, float]) -> None:
+        """
+        Adds one raw sample of several metrics to every tier.
+
+        Args:
+            timestamp (float): Monotonic time of the sample in seconds.
+            values (Dict[str, float]): Metric values by name.
+        """
+        for tier in self.tiers:
+            tier.add(timestamp, values)
+
+    def append(self, snapshot: SystemSnapshot) -> None:
+        """
+        Adds the metrics of a snapshot to every tier.
+
+        Args:
+            snapshot (SystemSnapshot): The snapshot to add.
+        """
+        self.append_values(snapshot.timestamp, snapshot.metrics())
+
+    def tier(self, resolution: float) -> RollupTier:
+        """
+        Returns the tier with the given resolution.
+
+        Args:
+            resolution (float): Bucket width in seconds.
+
+        Returns:
+            RollupTier: The tier.
+
+        Raises:
+            KeyError: If there is no tier with that resolution.
+        """
+        for tier in self.tiers:
+            if tier.resolution == resolution:
+                return tier
+        raise KeyError(f"No rollup tier with a resolution of {resolution} s")
+
+    def tier_for(self, seconds: float, min_buckets: int = 60) -> RollupTier:
+        """
+        Returns the coarsest tier that covers a window and still splits it into at least min_buckets buckets.
+
+        Args:
+            seconds (float): The window length.
+            min_buckets (int): The smallest number of buckets the window should be resolved into.
+
+        Returns:
+            RollupTier: The tier to answer the query from.
+        """
+        chosen = self.tiers[-1]
+        for tier in reversed(self.tiers):
+            if tier.span >= seconds:
+                chosen = tier
+            if tier.span >= seconds and seconds / tier.resolution >= min_buckets:
+                break
+        return chosen
+
+    def stats(self, metric: str, seconds: float, now: Optional[float] = None) -> Optional[WindowStats]:
+        """
+        Aggregates a window of a metric from the tier picked by tier_for().
+
+        Args:
+            metric (str): The metric name.
+            seconds (float): The window length.
+            now (float, optional): The monotonic time the window ends at. Defaults to time.monotonic().
+
+        Returns:
+            WindowStats or None: The statistics, or None if the window holds no samples.
+        """
+        return self.tier_for(seconds).stats(metric, seconds, now)
@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from .scheduler import DUE_SLACK
+from .snapshot import SystemSnapshot
+from .ticker import Ticker
+
+
+class Sampler(threading.Thread):
+    """
+    A background thread that takes SystemSnapshots and publishes the latest one.
+
+    The interfaces only read `latest` and render it, so a slow collector (NVML, a busy /proc) never
+    stalls the Tk or curses loop. The handoff is a single reference assignment, which is atomic in
+    CPython, so neither side takes a lock.
+
+    The thread wakes on the absolute deadlines of a Ticker, so the time a snapshot takes does not
+    push the following ones back, and late or skipped ticks are recorded in the ticker.
+
+    Attributes:
+        collect (Callable[[], SystemSnapshot]): The function that takes one snapshot.
+        interval (float): Time between two ticks in seconds.
+        next_deadline (Optional[Callable[[], float]]): Returns the monotonic time at which the next snapshot is
+            due, for collectors with their own cadence. When it is given, ticks on which nothing is due are
+            left out, so the interval should be the collector's shortest one.
+        ticker (Ticker): The tick deadlines and their lateness and skipped-tick statistics.
+
+    Methods:
+        latest -> Optional[SystemSnapshot]: The most recently published snapshot, or None before the first one.
+        stop() -> None: Stops the thread and waits for it to finish.
+
+    Usage:
+        1. Initialize and start the sampler:
+            sampler = Sampler(
+                system_interface.get_snapshot,
+                interval=system_interface.tick_interval(),
+                next_deadline=system_interface.next_deadline,
+            )
+            sampler.start()
+
+        2. Read the latest snapshot from the render loop:
+            snapshot = sampler.latest
+            if snapshot is not None:
+                progress_bars = system_interface.get_progress_bars(snapshot)
+
+        3. Stop the sampler when the interface closes:
+            sampler.stop()
+    """
+
+    def __init__(
+        self,
+        collect: Callable[[], SystemSnapshot],
+        interval: float = 1.0,
+        next_deadline: Optional[Callable[[], float]] = None,
+    ) -> None:
+        super().__init__(name="system-sampler", daemon=True)
+        self.collect = collect
+        self.interval = interval
+        self.next_deadline = next_deadline
+        self.ticker = Ticker(interval)
+        self._latest: Optional[SystemSnapshot] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def latest(self) -> Optional[SystemSnapshot]:
+        """
+        Returns the most recently published snapshot.
+
+        Returns:
+            SystemSnapshot or None: The latest snapshot, or None if no snapshot was taken yet.
+        """
+        return self._latest
+
+    def run(self) -> None:
+        """
+        Takes snapshots until stop() is called. Errors of a single tick are logged and skipped.
+        """
+        self.ticker.reset()
+        while not self.ticker.wait(self._stop_event):
+            now = time.monotonic()
+            self.ticker.tick(now)
+            if self.next_deadline is not None and self.next_deadline() > now + DUE_SLACK:
+                continue
+            try:
+                self._latest = self.collect()
+            except Exception:
+                logging.exception("Failed to collect a system snapshot.")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the thread and waits for it to finish.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the current tick to finish.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -0,0 +1,179 @@
+import math
+from typing import Dict, Optional, Tuple
+
+# Factors applied to the interval of a metric that changes quickly or stays flat.
+SPEED_UP = 0.5
+BACK_OFF = 1.5
+
+# A change slower than this share of the tolerance counts as flat.
+FLAT_SHARE = 0.25
+
+# Intervals longer than this many seconds are rounded up to a multiple of it, so metrics that adapt
+# at different rates still fall due on shared ticks instead of waking the sampler separately.
+TICK = 1.0
+
+# Metrics due within this many seconds of each other are read in the same tick.
+DUE_SLACK = 0.05
+
+
+class Cadence:
+    """
+    The sampling cadence of one metric: its interval range and how it adapts.
+
+    Attributes:
+        base (float): Interval in seconds until the metric has shown how it behaves.
+        minimum (float): Shortest interval in seconds, used while the value changes quickly.
+        maximum (float): Longest interval in seconds, reached while the value stays flat.
+        tolerance (float): Change per second above which the value counts as changing quickly.
+        threshold (Optional[float]): Value at or above which the metric is always sampled at the
+            minimum interval, or None.
+        interval (float): The current interval in seconds.
+        next_due (float): Monotonic time at which the metric is due again.
+    """
+
+    __slots__ = ("base", "minimum", "maximum", "tolerance", "threshold", "interval", "next_due", "_last")
+
+    def __init__(
+        self, base: float, minimum: float, maximum: float, tolerance: float, threshold: Optional[float] = None
+    ) -> None:
+        if not 0 < minimum <= base <= maximum:
+            raise ValueError(f"Expected 0 < minimum <= base <= maximum, got {minimum}, {base}, {maximum}")
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.threshold = threshold
+        self.interval = base
+        self.next_due = 0.0
+        self._last: Optional[Tuple[float, float]] = None
+
+    def adapt(self, value: Optional[float], now: float) -> None:
+        """
+        Adjusts the interval to a new value of the metric and schedules the next sample.
+
+        Args:
+            value (float, optional): The value just read, or None if the metric has no value.
+            now (float): Monotonic time of the read.
+        """
+        if value is not None:
+            if self.threshold is not None and value >= self.threshold:
+                self.interval = self.minimum
+            elif self._last is not None and now > self._last[1]:
+                change = abs(value - self._last[0]) / (now - self._last[1])
+                if change > self.tolerance:
+                    self.interval = max(self.interval * SPEED_UP, self.minimum)
+                elif change <= self.tolerance * FLAT_SHARE:
+                    self.interval = min(self.interval * BACK_OFF, self.maximum)
+            self._last = (value, now)
+        interval = self.interval if self.interval < TICK else math.ceil(self.interval / TICK - 1e-9) * TICK
+        # Keep the deadlines on the grid of the previous one, so a late read does not delay every later one.
+        next_due = self.next_due + interval
+        self.next_due = next_due if next_due > now else now + interval
+
+
+class CadenceScheduler:
+    """
+    A class that decides, per metric, whether it is due on the current tick.
+
+    Every metric declares a Cadence. After each read the scheduler halves the metric's interval
+    (down to its minimum) if the value changed faster than its tolerance, drops it straight to
+    the minimum if the value crossed its threshold, and stretches it by half (up to its maximum)
+    if the value was flat. Values that barely move, such as disk capacity, end up being read
+    rarely on an idle host, while a CPU spike is followed at the shortest interval.
+
+    Methods:
+        add(name: str, cadence: Cadence) -> None: Registers a metric.
+        due(name: str, now: float) -> bool: Returns whether a metric should be read now.
+        record(name: str, value: Optional[float], now: float) -> None: Adapts a metric's cadence after a read.
+        interval(name: str) -> float: Returns a metric's current interval.
+        next_deadline() -> float: Returns the monotonic time at which the next metric is due.
+        shortest_interval() -> float: Returns the shortest minimum interval of all metrics.
+
+    Usage:
+        1. Initialize an instance of the CadenceScheduler class and register the metrics:
+            scheduler = CadenceScheduler({"cpu": Cadence(1.0, 0.5, 2.0, tolerance=10.0, threshold=90.0)})
+
+        2. On every tick, read only the metrics that are due:
+            now = time.monotonic()
+            if scheduler.due("cpu", now):
+                scheduler.record("cpu", read_cpu_load(), now)
+
+        3. Sleep until the next metric is due:
+            time.sleep(max(scheduler.next_deadline() - time.monotonic(), 0))
+
+    Notes:
+        - A metric registered with no value yet is due immediately.
+        - Intervals of TICK or more are rounded up to a multiple of it, and metrics that become due within
+          DUE_SLACK seconds of each other are read together, so the sampler does not wake up
+          separately for each of them.
+    """
+
+    def __init__(self, cadences: Optional[Dict[str, Cadence]] = None) -> None:
+        self.cadences: Dict[str, Cadence] = dict(cadences) if cadences is not None else {}
+
+    def add(self, name: str, cadence: Cadence) -> None:
+        """
+        Registers a metric.
+
+        Args:
+            name (str): The metric name.
+            cadence (Cadence): Its interval range and thresholds.
+        """
+        self.cadences[name] = cadence
+
+    def due(self, name: str, now: float) -> bool:
+        """
+        Returns whether a metric should be read now. Metrics without a cadence are always due.
+
+        Args:
+            name (str): The metric name.
+            now (float): The current monotonic time.
+
+        Returns:
+            bool: True if the metric is due.
+        """
+        cadence = self.cadences.get(name)
+        return cadence is None or now + DUE_SLACK >= cadence.next_due
+
+    def record(self, name: str, value: Optional[float], now: float) -> None:
+        """
+        Adapts a metric's cadence to the value just read and schedules its next read.
+
+        Args:
+            name (str): The metric name.
+            value (float, optional): The value that drives the cadence, or None if there is none.
+            now (float): Monotonic time of the read.
+        """
+        cadence = self.cadences.get(name)
+        if cadence is not None:
+            cadence.adapt(value, now)
+
+    def interval(self, name: str) -> float:
+        """
+        Returns a metric's current interval.
+
+        Args:
+            name (str): The metric name.
+
+        Returns:
+            float: The interval in seconds.
+        """
+        return self.cadences[name].interval
+
+    def next_deadline(self) -> float:
+        """
+        Returns the monotonic time at which the next metric is due.
+
+        Returns:
+            float: The earliest deadline, or 0 if no metric is registered.
+        """
+        return min((cadence.next_due for cadence in self.cadences.values()), default=0.0)
+
+    def shortest_interval(self) -> float:
+        """
+        Returns the shortest minimum interval of all metrics, the period at which a sampler has to tick.
+
+        Returns:
+            float: The interval in seconds, or TICK if no metric is registered.
+        """
+        return min((cadence.minimum for cadence in self.cadences.values()), default=TICK)
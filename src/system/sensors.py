@@ -0,0 +1,195 @@
+import glob
+import logging
+import os
+import socket
+import time
+from typing import List, Optional, Set
+
+from .procfs import PersistentFile, read_attribute
+
+HWMON_PATH = "/sys/class/hwmon"
+THERMAL_PATH = "/sys/class/thermal"
+
+# hwmon drivers and thermal zones that measure the CPU die.
+CPU_SENSOR_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal")
+CPU_THERMAL_ZONES = ("x86_pkg_temp", "cpu-thermal", "cpu_thermal")
+
+# Labels of the whole-package temperature of Intel (coretemp) and AMD (k10temp) CPUs.
+CPU_PACKAGE_LABELS = ("Package id", "Tctl", "Tdie")
+
+# After a read error the sensors are discovered again, but not more often than this, in seconds.
+RESCAN_INTERVAL = 60.0
+
+NETLINK_KOBJECT_UEVENT = 15
+_HOTPLUG_SUBSYSTEMS = (b"SUBSYSTEM=hwmon", b"SUBSYSTEM=thermal")
+
+TEMPERATURE = "temperature"
+FAN = "fan"
+
+
+class SensorReading:
+    """
+    One temperature or fan reading.
+
+    Attributes:
+        chip (str): The hwmon driver name (for example "coretemp") or thermal zone type.
+        label (str): The sensor label (for example "Core 0"), or the chip and file name if it has none.
+        kind (str): TEMPERATURE or FAN.
+        value (float): Degrees Celsius for temperatures, RPM for fans.
+        cpu (bool): Whether the sensor measures the CPU.
+    """
+
+    __slots__ = ("chip", "label", "kind", "value", "cpu")
+
+    def __init__(self, chip: str, label: str, kind: str, value: float, cpu: bool) -> None:
+        self.chip = chip
+        self.label = label
+        self.kind = kind
+        self.value = value
+        self.cpu = cpu
+
+
+class _Sensor:
+    """A discovered sensor: what it measures and its value file, kept open."""
+
+    __slots__ = ("chip", "label", "kind", "cpu", "file", "scale")
+
+    def __init__(self, chip: str, label: str, kind: str, cpu: bool, path: str, scale: float) -> None:
+        self.chip = chip
+        self.label = label
+        self.kind = kind
+        self.cpu = cpu
+        self.file = PersistentFile(path, size=32)
+        self.scale = scale
+
+
+def _hotplug_socket() -> Optional[socket.socket]:
+    """Opens a non-blocking socket that receives kernel uevents, or returns None if that is not allowed."""
+    try:
+        uevents = socket.socket(
+            socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC, NETLINK_KOBJECT_UEVENT
+        )
+        uevents.bind((0, 1))
+        return uevents
+    except (OSError, AttributeError):
+        return None
+
+
+class Sensors:
+    """
+    A class that reads CPU temperatures, other temperatures and fan speeds from hwmon and thermal zones.
+
+    psutil.sensors_temperatures() walks /sys/class/hwmon and opens every file on each call. Here the
+    sensors are discovered once, their value files are kept open, and every tick only re-reads those
+    files. Sensors are discovered again only when the kernel announces that a hwmon or thermal device
+    was added or removed (a uevent), or after a read error, at most every RESCAN_INTERVAL seconds.
+
+    Methods:
+        discover() -> None: Finds every sensor and opens its value file.
+        read() -> List[SensorReading]: Re-reads every sensor.
+        close() -> None: Closes the value files and the uevent socket.
+
+    Usage:
+        1. Initialize an instance of the Sensors class:
+            sensors = Sensors()
+
+        2. Read on every tick:
+            for reading in sensors.read():
+                print(reading.chip, reading.label, reading.value)
+
+    Notes:
+        - Thermal zones that also register a hwmon device with the same name are reported once.
+    """
+
+    def __init__(self, hwmon_path: str = HWMON_PATH, thermal_path: str = THERMAL_PATH) -> None:
+        self.hwmon_path = hwmon_path
+        self.thermal_path = thermal_path
+        self.sensors: List[_Sensor] = []
+        self._uevents = _hotplug_socket()
+        self._last_discovery = 0.0
+        self.discover()
+
+    def _add(self, chip: str, label: str, kind: str, cpu: bool, path: str, scale: float) -> None:
+        try:
+            self.sensors.append(_Sensor(chip, label, kind, cpu, path, scale))
+        except OSError:
+            logging.debug("Skipping unreadable sensor %s", path)
+
+    def _discover_hwmon(self) -> Set[str]:
+        chips = set()
+        for device in sorted(glob.glob(os.path.join(self.hwmon_path, "hwmon[0-9]*"))):
+            # Older drivers keep their attributes in the device directory.
+            directory = device if os.path.exists(os.path.join(device, "name")) else os.path.join(device, "device")
+            chip = read_attribute(os.path.join(directory, "name")) or os.path.basename(device)
+            cpu = chip in CPU_SENSOR_CHIPS
+            chips.add(chip)
+            for kind, prefix, scale in ((TEMPERATURE, "temp", 1000.0), (FAN, "fan", 1.0)):
+                for path in sorted(glob.glob(os.path.join(directory, f"{prefix}[0-9]*_input"))):
+                    name = path[: -len("_input")]
+                    label = read_attribute(name + "_label") or f"{chip} {os.path.basename(name)}"
+                    self._add(chip, label, kind, cpu, path, scale)
+        return chips
+
+    def _discover_thermal_zones(self, hwmon_chips: Set[str]) -> None:
+        for zone in sorted(glob.glob(os.path.join(self.thermal_path, "thermal_zone[0-9]*"))):
+            zone_type = read_attribute(os.path.join(zone, "type")) or os.path.basename(zone)
+            if zone_type in hwmon_chips:
+                continue
+            self._add(
+                zone_type, zone_type, TEMPERATURE, zone_type in CPU_THERMAL_ZONES, os.path.join(zone, "temp"), 1000.0
+            )
+
+    def discover(self) -> None:
+        """Finds every hwmon and thermal zone sensor and opens its value file, replacing the previous ones."""
+        for sensor in self.sensors:
+            sensor.file.close()
+        self.sensors = []
+        self._discover_thermal_zones(self._discover_hwmon())
+        self._last_discovery = time.monotonic()
+
+    def _hotplugged(self) -> bool:
+        if self._uevents is None:
+            return False
+        hotplugged = False
+        while True:
+            try:
+                event = self._uevents.recv(8192)
+            except BlockingIOError:
+                return hotplugged
+            except OSError:
+                # The receive buffer overflowed and events were lost, so assume the worst.
+                return True
+            hotplugged = hotplugged or any(subsystem in event for subsystem in _HOTPLUG_SUBSYSTEMS)
+
+    def read(self) -> List[SensorReading]:
+        """
+        Re-reads every sensor, discovering the sensors again first if a device was hotplugged.
+
+        Returns:
+            List[SensorReading]: One reading per sensor that could be read.
+        """
+        if self._hotplugged():
+            self.discover()
+
+        readings = []
+        failed = False
+        for sensor in self.sensors:
+            try:
+                value = sensor.file.read_int() / sensor.scale
+            except (OSError, ValueError):
+                failed = True
+                continue
+            readings.append(SensorReading(sensor.chip, sensor.label, sensor.kind, value, sensor.cpu))
+
+        if failed and time.monotonic() - self._last_discovery >= RESCAN_INTERVAL:
+            self.discover()
+        return readings
+
+    def close(self) -> None:
+        """Closes the value files and the uevent socket."""
+        for sensor in self.sensors:
+            sensor.file.close()
+        self.sensors = []
+        if self._uevents is not None:
+            self._uevents.close()
+            self._uevents = None
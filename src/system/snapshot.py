@@ -0,0 +1,232 @@
+from typing import Dict, List, NamedTuple, Optional
+
+from .cgroups import CgroupUsage
+from .disk_io import DiskIoStats
+from .mounts import MountUsage
+from .network import InterfaceStats, TcpSockets
+from .pressure import PressureStats
+from .rapl import PowerReading
+from .sensors import CPU_PACKAGE_LABELS, CPU_THERMAL_ZONES, TEMPERATURE, SensorReading
+from .process_table import ProcessEntry
+from .video_cards.nvidia import GpuProcess, GpuReading
+
+
+class HistorySummary(NamedTuple):
+    """The long-term mean and maximum of a metric and its recent p95, summarised on the sampler thread."""
+
+    mean: float
+    maximum: float
+    p95: Optional[float]
+
+
+class SystemSnapshot:
+    """
+    A compact, typed record holding every value the monitor renders for a single tick.
+
+    The snapshot is produced by the SnapshotCollector, which reads each kernel source exactly once,
+    and is consumed by the rendering methods of SystemInterface and ExtendedSystemInterface.
+
+    Attributes:
+        timestamp (float): Monotonic time (seconds) at which the snapshot was taken.
+        cpu_load (List[float]): CPU load as a percentage for each CPU core.
+        cpu_frequency (float): Current frequency of the CPU in megahertz (MHz).
+        max_cpu_frequency (float): Maximum CPU frequency in megahertz (MHz).
+        core_frequencies (List[float]): Current frequency of each CPU core in megahertz (MHz).
+        power (List[PowerReading]): Power of the RAPL domains (CPU packages, cores, DRAM) in watts.
+        memory_percent (float): Memory usage as a percentage.
+        memory_used_gb (float): Memory usage in gigabytes (GB).
+        memory_total_gb (float): Total memory in gigabytes (GB).
+        disk_percent (float): Disk usage of "/" as a percentage.
+        disk_free_gb (float): Available free space on "/" in gigabytes (GB).
+        battery_percent (Optional[float]): Battery percentage or None if there is no battery.
+        battery_plugged (Optional[bool]): Whether the power supply is plugged in or None if there is no battery.
+        battery_power (Optional[float]): Smoothed battery charge or discharge power in watts, or None if unknown.
+        battery_time_left (Optional[float]): Seconds until the battery is empty (or full, when plugged in),
+            or None if it cannot be estimated.
+        gpu_usage (Optional[int]): Average usage of the GPUs as a percentage or None if no GPU is present.
+        gpu_frequency (Optional[float]): Average GPU frequency in megahertz (MHz) or None if no GPU is present.
+        gpus (List[GpuReading]): Utilisation, memory, temperature, power, clocks and throttling of every GPU.
+        gpu_processes (List[GpuProcess]): The processes using the GPUs most, heaviest first.
+        cpu_total (float): Aggregate CPU utilisation as a percentage.
+        cpu_iowait (float): Aggregate iowait share as a percentage.
+        cpu_steal (float): Aggregate steal share as a percentage.
+        cpu_irq (float): Aggregate hard and soft interrupt share as a percentage.
+        processes (List[ProcessEntry]): The processes using the most CPU, heaviest first.
+        cgroups (List[CgroupUsage]): The services and containers using the most CPU, heaviest first.
+        disk_io (List[DiskIoStats]): Throughput, IOPS, await and utilisation of every disk.
+        mounts (List[MountUsage]): Capacity and time-to-full of every mounted filesystem.
+        network (List[InterfaceStats]): Throughput, packet rates, errors and drops of every network interface.
+        tcp_sockets (Optional[TcpSockets]): TCP socket counts, or None if they were not read.
+        pressure (Dict[str, PressureStats]): Pressure Stall Information by resource ("cpu", "memory", "io").
+        sensors (List[SensorReading]): Temperatures and fan speeds.
+        history (Dict[str, HistorySummary]): The history of "cpu", "ram" and "gpu" up to this tick, by metric.
+
+    Notes:
+        - The class uses __slots__ to keep the per-tick allocation small.
+    """
+
+    __slots__ = (
+        "timestamp",
+        "cpu_load",
+        "cpu_frequency",
+        "max_cpu_frequency",
+        "memory_percent",
+        "memory_used_gb",
+        "memory_total_gb",
+        "disk_percent",
+        "disk_free_gb",
+        "battery_percent",
+        "battery_plugged",
+        "battery_power",
+        "battery_time_left",
+        "gpu_usage",
+        "gpu_frequency",
+        "gpus",
+        "cpu_total",
+        "cpu_iowait",
+        "cpu_steal",
+        "cpu_irq",
+        "processes",
+        "cgroups",
+        "disk_io",
+        "mounts",
+        "network",
+        "tcp_sockets",
+        "pressure",
+        "sensors",
+        "core_frequencies",
+        "power",
+        "gpu_processes",
+        "history",
+    )
+
+    def __init__(
+        self,
+        timestamp: float,
+        cpu_load: List[float],
+        cpu_frequency: float,
+        max_cpu_frequency: float,
+        memory_percent: float,
+        memory_used_gb: float,
+        memory_total_gb: float,
+        disk_percent: float,
+        disk_free_gb: float,
+        battery_percent: Optional[float] = None,
+        battery_plugged: Optional[bool] = None,
+        battery_power: Optional[float] = None,
+        battery_time_left: Optional[float] = None,
+        gpu_usage: Optional[int] = None,
+        gpu_frequency: Optional[float] = None,
+        gpus: Optional[List[GpuReading]] = None,
+        cpu_total: float = 0.0,
+        cpu_iowait: float = 0.0,
+        cpu_steal: float = 0.0,
+        cpu_irq: float = 0.0,
+        processes: Optional[List[ProcessEntry]] = None,
+        cgroups: Optional[List[CgroupUsage]] = None,
+        disk_io: Optional[List[DiskIoStats]] = None,
+        mounts: Optional[List[MountUsage]] = None,
+        network: Optional[List[InterfaceStats]] = None,
+        tcp_sockets: Optional[TcpSockets] = None,
+        pressure: Optional[Dict[str, PressureStats]] = None,
+        sensors: Optional[List[SensorReading]] = None,
+        core_frequencies: Optional[List[float]] = None,
+        power: Optional[List[PowerReading]] = None,
+        gpu_processes: Optional[List[GpuProcess]] = None,
+        history: Optional[Dict[str, HistorySummary]] = None,
+    ) -> None:
+        self.timestamp = timestamp
+        self.cpu_load = cpu_load
+        self.cpu_frequency = cpu_frequency
+        self.max_cpu_frequency = max_cpu_frequency
+        self.memory_percent = memory_percent
+        self.memory_used_gb = memory_used_gb
+        self.memory_total_gb = memory_total_gb
+        self.disk_percent = disk_percent
+        self.disk_free_gb = disk_free_gb
+        self.battery_percent = battery_percent
+        self.battery_plugged = battery_plugged
+        self.battery_power = battery_power
+        self.battery_time_left = battery_time_left
+        self.gpu_usage = gpu_usage
+        self.gpu_frequency = gpu_frequency
+        self.gpus = gpus if gpus is not None else []
+        self.cpu_total = cpu_total
+        self.cpu_iowait = cpu_iowait
+        self.cpu_steal = cpu_steal
+        self.cpu_irq = cpu_irq
+        self.processes = processes if processes is not None else []
+        self.cgroups = cgroups if cgroups is not None else []
+        self.disk_io = disk_io if disk_io is not None else []
+        self.mounts = mounts if mounts is not None else []
+        self.network = network if network is not None else []
+        self.tcp_sockets = tcp_sockets
+        self.pressure = pressure if pressure is not None else {}
+        self.sensors = sensors if sensors is not None else []
+        self.core_frequencies = core_frequencies if core_frequencies is not None else []
+        self.power = power if power is not None else []
+        self.gpu_processes = gpu_processes if gpu_processes is not None else []
+        self.history = history if history is not None else {}
+
+    @property
+    def battery_status(self) -> Optional[str]:
+        """
+        Returns the battery status in the same form as Battery.get_battery_status().
+
+        Returns:
+            str or None: "Charging", "Discharging" or None if there is no battery.
+        """
+        if self.battery_plugged is None:
+            return None
+        return "Charging" if self.battery_plugged else "Discharging"
+
+    @property
+    def cpu_temperature(self) -> Optional[float]:
+        """
+        Returns the CPU package temperature, or the hottest CPU sensor if there is no package sensor.
+
+        Returns:
+            float or None: Degrees Celsius, or None if no sensor measures the CPU.
+        """
+        cpu_temperatures = [reading for reading in self.sensors if reading.cpu and reading.kind == TEMPERATURE]
+        for reading in cpu_temperatures:
+            if reading.label.startswith(CPU_PACKAGE_LABELS) or reading.label in CPU_THERMAL_ZONES:
+                return reading.value
+        return max((reading.value for reading in cpu_temperatures), default=None)
+
+    @property
+    def cpu_power(self) -> Optional[float]:
+        """
+        Returns the power of all CPU packages together.
+
+        Returns:
+            float or None: Watts, or None if RAPL is not available.
+        """
+        packages = [reading.watts for reading in self.power if reading.is_package]
+        return round(sum(packages), 2) if packages else None
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Returns the numeric values of the snapshot by metric name, as stored by MetricHistory.
+
+        Returns:
+            Dict[str, float]: "cpu" and "cpu1".."cpuN" loads, "ram", "disk" and, when available,
+            "gpu" and "battery" percentages, the "psi_cpu", "psi_memory" and "psi_io" stall rates and,
+            when available, the "cpu_temp" temperature and "cpu_power" watts.
+        """
+        metrics = {"cpu": self.cpu_total, "ram": self.memory_percent, "disk": self.disk_percent}
+        for i, load in enumerate(self.cpu_load):
+            metrics[f"cpu{i + 1}"] = load
+        if self.gpu_usage is not None:
+            metrics["gpu"] = float(self.gpu_usage)
+        if self.battery_percent is not None:
+            metrics["battery"] = self.battery_percent
+        for resource, stats in self.pressure.items():
+            metrics[f"psi_{resource}"] = stats.some_rate
+        cpu_temperature = self.cpu_temperature
+        if cpu_temperature is not None:
+            metrics["cpu_temp"] = cpu_temperature
+        cpu_power = self.cpu_power
+        if cpu_power is not None:
+            metrics["cpu_power"] = cpu_power
+        return metrics
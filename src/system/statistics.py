@@ -0,0 +1,22 @@
+import math
+from typing import Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Returns the q-th percentile of already sorted values, interpolating linearly between neighbours.
+
+    The module has no dependencies, so the standalone query tool can use it without loading the collectors.
+
+    Args:
+        sorted_values (Sequence[float]): The values in ascending order. Must not be empty.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The percentile value.
+    """
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
@@ -1,11 +1,46 @@
-from typing import List
+import logging
+import time
+from typing import Dict, List, Optional
+
+import consts
+import settings
+from data_storage.metrics.columnar_log import ColumnarLog
+from data_storage.metrics.metric_store import MetricStore
 
-from .battery import Battery
 from .checkers import nvidia_checker
-from .disk import Disk
-from .memory import Memory
+from .collector import SnapshotCollector
+from .history import MetricHistory
 from .processor import Processor
-from .video_cards.nvidia import Nvidia
+from .rollup import MetricRollup
+from .sensors import FAN, TEMPERATURE
+from .snapshot import HistorySummary, SystemSnapshot
+from .ticker import Ticker
+from .video_cards.nvidia import GpuReading, Nvidia
+
+# The metrics of the history bars, their long-term window (one day) and the window of their p95 (5 minutes).
+HISTORY_METRICS = (("cpu", "CPU"), ("ram", "RAM"), ("gpu", "GPU"))
+HISTORY_WINDOW = 86400.0
+RECENT_WINDOW = 300.0
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Formats a duration as its two largest units, for example "2d 4h", "3h 20m" or "12m".
+
+    Args:
+        seconds (float): The duration in seconds.
+
+    Returns:
+        str: The formatted duration.
+    """
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
 
 
 class SystemInterface:
@@ -13,14 +48,24 @@ class SystemInterface:
     A class that provides an interface to retrieve system information and generate progress bars.
 
     Methods:
+        get_snapshot() -> SystemSnapshot: Reads the system sources that are due and returns a snapshot.
+        next_deadline() -> float: Returns the monotonic time at which the next snapshot is due.
+        tick_interval() -> float: Returns the period at which the sampler has to tick.
+        close() -> None: Releases the collector's file descriptors and closes the metric store and log.
         get_progress_bars() -> List[str]: Retrieves system information and returns a list of progress bars.
+        get_history_bars() -> List[str]: Renders the history of CPU, RAM and GPU published on a snapshot.
+        get_process_bars() -> List[str]: Renders the top processes of a snapshot as a table.
+        get_cgroup_bars() -> List[str]: Renders the top services and containers of a snapshot as a table.
+        get_gpu_process_bars() -> List[str]: Renders the processes using the GPUs most as a table.
+        get_ticker_bar() -> str: Summarises the rate, lateness and skipped ticks of a Ticker.
 
     Usage:
         1. Initialize an instance of the SystemInterface class:
             sys_interface = SystemInterface()
 
         2. Access the interface methods:
-            progress_bars = sys_interface.get_progress_bars()
+            snapshot = sys_interface.get_snapshot()
+            progress_bars = sys_interface.get_progress_bars(snapshot)
 
     Notes:
         - The SystemInterface class provides an interface to gather system information,
@@ -28,65 +73,368 @@ class SystemInterface:
 
     Attributes:
         processor (Processor): An instance of the Processor class to retrieve CPU-related information.
-        battery (Battery): An instance of the Battery class to retrieve battery-related information.
-        memory (Memory): An instance of the Memory class to retrieve memory-related information.
-        disk (Disk): An instance of the Disk class to retrieve disk-related information.
         nvidia (Nvidia): An instance of the Nvidia class to retrieve NVIDIA GPU-related information.
         nvidia_checker (CheckNvidia): An instance of the CheckNvidia class to check NVIDIA GPU presence.
+        collector (SnapshotCollector): Reads every system source once per tick.
+        history (MetricHistory): The last hour of every snapshot taken through get_snapshot(), sized from the tick.
+        rollup (MetricRollup): Multi-resolution rollups of every snapshot taken through get_snapshot().
+        store (MetricStore or None): The on-disk metric store, opened on the first snapshot.
+        log (ColumnarLog or None): The queryable columnar metric log, opened on the first snapshot.
     """
 
     def __init__(self) -> None:
         self.processor = Processor()
-        self.battery = Battery()
-        self.memory = Memory()
-        self.disk = Disk()
         self.nvidia = Nvidia()
         self.nvidia_checker = nvidia_checker.CheckNvidia()
+        self.collector = SnapshotCollector(
+            self.processor, self.nvidia, self.nvidia_checker, backend=settings.SystemInfo.backend
+        )
+        self.history = MetricHistory.for_interval(self.tick_interval())
+        self.rollup = MetricRollup()
+        self.store: Optional[MetricStore] = None
+        self.log: Optional[ColumnarLog] = None
+        self._store_failed = False
+
+    def get_snapshot(self) -> SystemSnapshot:
+        """
+        Reads the system sources that are due, records the snapshot in the history and returns it.
+
+        The history and rollup are only touched here, on the sampler thread; their summary is published
+        on the snapshot, so the interfaces never read the arrays while they are being updated.
+
+        Returns:
+            SystemSnapshot: The values of the current tick.
+        """
+        snapshot = self.collector.collect()
+        self.history.append(snapshot)
+        self.rollup.append(snapshot)
+        snapshot.history = self._summarise_history(snapshot.timestamp)
+        self._persist(snapshot)
+        return snapshot
+
+    def _summarise_history(self, now: float) -> Dict[str, HistorySummary]:
+        """Summarises the day-long rollup and the recent p95 of the history metrics."""
+        summaries = {}
+        for metric, _ in HISTORY_METRICS:
+            stats = self.rollup.stats(metric, HISTORY_WINDOW, now)
+            if stats is not None:
+                p95 = self.history.percentile(metric, 95, RECENT_WINDOW, now)
+                summaries[metric] = HistorySummary(stats.mean, stats.maximum, p95)
+        return summaries
+
+    def next_deadline(self) -> float:
+        """
+        Returns the monotonic time at which the collector has the next source due.
+
+        Returns:
+            float: The deadline of the next snapshot.
+        """
+        return self.collector.next_deadline()
 
-    def get_progress_bars(self) -> List[str]:
+    def tick_interval(self) -> float:
+        """
+        Returns the shortest interval at which the collector reads a source, the period of the sampler.
+
+        Returns:
+            float: The interval in seconds.
+        """
+        return self.collector.scheduler.shortest_interval()
+
+    def _persist(self, snapshot: SystemSnapshot) -> None:
+        """Appends the snapshot to the on-disk metric store and log, opening them on the first call."""
+        if self._store_failed:
+            return
+        values = snapshot.metrics()
+        if self.store is None or self.log is None:
+            try:
+                self.store = MetricStore(consts.METRIC_STORE_PATH, self.collector.metric_names())
+                self.log = ColumnarLog(consts.METRIC_LOG_PATH)
+            except OSError:
+                logging.exception("Could not open the metric store, samples will not be persisted.")
+                self._store_failed = True
+                return
+        now = time.time()
+        self.store.append(now, values)
+        self.log.append(now, values)
+
+    def close(self) -> None:
+        """
+        Releases the collector's file descriptors and closes the metric store and log.
+        """
+        self.collector.close()
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def get_progress_bars(self, snapshot: Optional[SystemSnapshot] = None) -> List[str]:
         """
         Retrieves system information and returns a list of progress bars.
 
+        Args:
+            snapshot (SystemSnapshot, optional): The snapshot to render. A new one is taken if omitted.
+
         Returns:
             progress_bars (list): A list of progress bars representing CPU load, memory usage, disk usage, and GPU usage.
         """
-        cpu_load: List[float] = self.processor.get_cpu_load()
-        memory_usage = self.memory.get_memory_usage()
-        memory_usage_gb = self.memory.get_memory_usage_gb()
-        max_memory = self.memory.get_max_memory()
-        disk_usage = self.disk.get_disk_usage()
-        disk_free_space = self.disk.get_disk_free_space()
-        cpu_frequency = self.processor.get_cpu_frequency()
-        max_cpu_frequency = self.processor.get_max_cpu_frequency()
-        battery_status = self.battery.get_battery_status()
+        if snapshot is None:
+            snapshot = self.get_snapshot()
 
         gpu_bars = []
 
-        if self.nvidia_checker.is_nvidia_gpu_present():
-            nvidia_usage = self.nvidia.get_gpu_usage()
-            nvidia_frequency = self.nvidia.get_gpu_frequency()
-            gpu_bars.append(f"GPU: {nvidia_usage}%")
+        if snapshot.gpu_usage is not None:
+            gpu_bars.append(f"GPU: {snapshot.gpu_usage}%")
             gpu_bars.append(
-                f"GPU Frequency: {nvidia_frequency} MHz",
+                f"GPU Frequency: {round(snapshot.gpu_frequency or 0, 2)} MHz",
             )
+        gpu_bars += [self._gpu_bar(reading) for reading in snapshot.gpus]
 
         progress_bars = (
-            [f"CPU{i + 1}: {load}%" for i, load in enumerate(cpu_load)]
+            self._core_bars(snapshot)
             + gpu_bars
+            + [f"CPU Wait: iowait {snapshot.cpu_iowait}% | steal {snapshot.cpu_steal}% | irq {snapshot.cpu_irq}%"]
+            + self._pressure_bars(snapshot, "cpu", "CPU")
+            + [f"CPU Frequency: \n {round(snapshot.cpu_frequency, 2)} MHz / {snapshot.max_cpu_frequency} MHz"]
+            + self._sensor_bars(snapshot)
             + [
-                f"CPU Frequency: \n {round(cpu_frequency, 2)} MHz / {max_cpu_frequency} MHz",
-                f"RAM: {memory_usage}% ({round(memory_usage_gb, 2)} / {round(max_memory, 2)} GB)",
-                f"Disk: {disk_usage}%",
-                f"Disk Free Space: {disk_free_space:.2f} GB",
+                f"RAM: {snapshot.memory_percent}% "
+                f"({round(snapshot.memory_used_gb, 2)} / {round(snapshot.memory_total_gb, 2)} GB)",
+            ]
+            + self._pressure_bars(snapshot, "memory", "RAM")
+            + [
+                f"Disk: {snapshot.disk_percent}%",
+                f"Disk Free Space: {snapshot.disk_free_gb:.2f} GB",
+            ]
+            + self._pressure_bars(snapshot, "io", "IO")
+            + [
+                f"Disk {device.name}: R {device.read_rate} MB/s | W {device.write_rate} MB/s | "
+                f"{device.iops:g} IOPS | await {device.await_ms} ms | util {device.utilisation}%"
+                for device in snapshot.disk_io
             ]
         )
 
-        if battery_status is not None:
-            battery_percent = self.battery.get_battery_percent()
-            progress_bars.append(f"Battery: {battery_percent}% - {battery_status}")
+        for interface in snapshot.network:
+            progress_bars.append(
+                f"Net {interface.name}: RX {interface.rx_rate / 1024**2:.2f} MB/s ({interface.rx_packets:g} pkt/s) | "
+                f"TX {interface.tx_rate / 1024**2:.2f} MB/s ({interface.tx_packets:g} pkt/s) | "
+                f"err {interface.errors} | drop {interface.drops}"
+            )
+
+        if snapshot.tcp_sockets is not None:
+            progress_bars.append(
+                f"TCP: {snapshot.tcp_sockets.in_use} in use | {snapshot.tcp_sockets.time_wait} time-wait | "
+                f"{snapshot.tcp_sockets.orphan} orphan"
+            )
+
+        for mount in snapshot.mounts:
+            mount_bar = f"Mount {mount.mountpoint}: {mount.percent}% | {mount.free / 1024**3:.2f} GB free"
+            if mount.time_to_full is not None:
+                mount_bar += f" | full in {format_duration(mount.time_to_full)}"
+            progress_bars.append(mount_bar)
+
+        if snapshot.battery_status is not None:
+            progress_bars.append(self._battery_bar(snapshot))
+
+        if snapshot.power:
+            progress_bars.append(
+                "CPU Power: " + " | ".join(f"{reading.domain} {reading.watts:.1f} W" for reading in snapshot.power)
+            )
 
         return progress_bars
 
+    @staticmethod
+    def _gpu_bar(reading: GpuReading) -> str:
+        """Renders the telemetry of one GPU, leaving out the values it does not report."""
+        device = reading.device
+        parts = [f"{reading.usage}%"] if reading.usage is not None else []
+        memory = [f"{reading.memory_usage}%"] if reading.memory_usage is not None else []
+        if reading.memory_used is not None and device.memory_total:
+            memory.append(f"{reading.memory_used / 1024**3:.1f}/{device.memory_total / 1024**3:.1f} GB")
+        if memory:
+            parts.append("mem " + " ".join(memory))
+        if reading.temperature is not None:
+            parts.append(f"{reading.temperature}°C")
+        if reading.power is not None:
+            parts.append(
+                f"{reading.power:.0f}" + (f"/{reading.power_limit:.0f} W" if reading.power_limit is not None else " W")
+            )
+        parts.append(f"{reading.frequency:.0f}/{device.max_graphics_clock} MHz")
+        if reading.throttled_by:
+            parts.append(f"throttled: {', '.join(reading.throttled_by)}")
+        return f"{device.vendor} GPU{device.index} {device.name}: " + " | ".join(parts)
+
+    @staticmethod
+    def _battery_bar(snapshot: SystemSnapshot) -> str:
+        """Renders the battery percentage and status, with the power and time remaining when they are known."""
+        battery_bar = f"Battery: {snapshot.battery_percent}% - {snapshot.battery_status}"
+        if snapshot.battery_power is not None:
+            battery_bar += f" | {snapshot.battery_power:.1f} W"
+        if snapshot.battery_time_left is not None:
+            if snapshot.battery_plugged:
+                battery_bar += f" | full in {format_duration(snapshot.battery_time_left)}"
+            else:
+                battery_bar += f" | {format_duration(snapshot.battery_time_left)} left"
+        return battery_bar
+
+    @staticmethod
+    def _core_bars(snapshot: SystemSnapshot) -> List[str]:
+        """Renders the load of each CPU core, with its current frequency beside it when it is known."""
+        if len(snapshot.core_frequencies) != len(snapshot.cpu_load):
+            return [f"CPU{i + 1}: {load}%" for i, load in enumerate(snapshot.cpu_load)]
+        return [
+            f"CPU{i + 1}: {load}% | {frequency:.0f} MHz"
+            for i, (load, frequency) in enumerate(zip(snapshot.cpu_load, snapshot.core_frequencies))
+        ]
+
+    @staticmethod
+    def _pressure_bars(snapshot: SystemSnapshot, resource: str, label: str) -> List[str]:
+        """Renders the pressure stall line of a resource, or nothing if PSI is not available."""
+        stats = snapshot.pressure.get(resource)
+        if stats is None:
+            return []
+        return [
+            f"{label} Pressure: some {stats.some_rate}% | full {stats.full_rate}% "
+            f"(avg10 {stats.some_avg10}% / {stats.full_avg10}%, avg60 {stats.some_avg60}% / {stats.full_avg60}%)"
+        ]
+
+    @staticmethod
+    def _sensor_bars(snapshot: SystemSnapshot) -> List[str]:
+        """Renders the CPU temperature, the other temperatures and the fan speeds, if there are sensors."""
+        sensor_bars = []
+        cpu_temperature = snapshot.cpu_temperature
+        if cpu_temperature is not None:
+            hottest = max(reading.value for reading in snapshot.sensors if reading.cpu and reading.kind == TEMPERATURE)
+            sensor_bars.append(f"CPU Temperature: {cpu_temperature:.1f}°C (hottest sensor {hottest:.1f}°C)")
+
+        temperatures = [
+            f"{reading.label} {reading.value:.1f}°C"
+            for reading in snapshot.sensors
+            if not reading.cpu and reading.kind == TEMPERATURE
+        ]
+        if temperatures:
+            sensor_bars.append("Temperatures: " + " | ".join(temperatures))
+
+        fans = [f"{reading.label} {reading.value:.0f} RPM" for reading in snapshot.sensors if reading.kind == FAN]
+        if fans:
+            sensor_bars.append("Fans: " + " | ".join(fans))
+        return sensor_bars
+
+    def get_history_bars(self, snapshot: SystemSnapshot) -> List[str]:
+        """
+        Renders the day-long average and maximum of CPU, RAM and GPU, with their p95 of the last 5 minutes.
+
+        Args:
+            snapshot (SystemSnapshot): The snapshot whose history summary is rendered.
+
+        Returns:
+            history_bars (list): One "avg / max / p95" line per metric that has samples in the window.
+        """
+        hours = round(HISTORY_WINDOW / 3600, 1)
+        history_bars = []
+        for metric, label in HISTORY_METRICS:
+            summary = snapshot.history.get(metric)
+            if summary is None:
+                continue
+            history_bar = f"{label} {hours:g}h: avg {summary.mean:.1f}% | max {summary.maximum:.1f}%"
+            if summary.p95 is not None:
+                history_bar += f" | p95 {format_duration(RECENT_WINDOW)} {summary.p95:.1f}%"
+            history_bars.append(history_bar)
+        return history_bars
+
+    def get_process_bars(self, snapshot: Optional[SystemSnapshot] = None) -> List[str]:
+        """
+        Renders the processes using the most CPU as a fixed-width table.
+
+        Args:
+            snapshot (SystemSnapshot, optional): The snapshot to render. A new one is taken if omitted.
+
+        Returns:
+            process_bars (list): A header line followed by one line per process.
+        """
+        if snapshot is None:
+            snapshot = self.get_snapshot()
+
+        process_bars = [f"{'PID':>7} {'USER':<10} {'CPU%':>6} {'MEM MB':>8} {'IO KB/s':>8}  COMMAND"]
+        for process in snapshot.processes:
+            process_bars.append(
+                f"{process.pid:>7} {process.info.user[:10]:<10} {process.cpu_percent:>6.1f} "
+                f"{process.rss / 1024**2:>8.1f} {process.io_rate / 1024:>8.1f}  {process.info.cmdline[:40]}"
+            )
+        return process_bars
+
+    def get_cgroup_bars(self, snapshot: Optional[SystemSnapshot] = None) -> List[str]:
+        """
+        Renders the cgroups (services and containers) using the most CPU as a fixed-width table.
+
+        Args:
+            snapshot (SystemSnapshot, optional): The snapshot to render. A new one is taken if omitted.
+
+        Returns:
+            cgroup_bars (list): A header line followed by one line per cgroup, or an empty list
+            if cgroup v2 is not available.
+        """
+        if snapshot is None:
+            snapshot = self.get_snapshot()
+        if not snapshot.cgroups:
+            return []
+
+        cgroup_bars = [f"{'CPU%':>6} {'MEM MB':>8} {'IO KB/s':>8} {'PSI%':>6}  CGROUP"]
+        for cgroup in snapshot.cgroups:
+            cgroup_bars.append(
+                f"{cgroup.cpu_percent:>6.1f} {cgroup.memory / 1024**2:>8.1f} {cgroup.io_rate / 1024:>8.1f} "
+                f"{cgroup.memory_pressure:>6.2f}  {cgroup.path[-50:]}"
+            )
+        return cgroup_bars
+
+    def get_gpu_process_bars(self, snapshot: Optional[SystemSnapshot] = None) -> List[str]:
+        """
+        Renders the processes using the GPUs most as a fixed-width table.
+
+        Args:
+            snapshot (SystemSnapshot, optional): The snapshot to render. A new one is taken if omitted.
+
+        Returns:
+            gpu_process_bars (list): A header line followed by one line per process and GPU, or an
+            empty list if no process uses an NVIDIA GPU.
+        """
+        if snapshot is None:
+            snapshot = self.get_snapshot()
+        if not snapshot.gpu_processes:
+            return []
+
+        gpu_process_bars = [f"{'PID':>7} {'GPU':>3} {'SM%':>5} {'MEM%':>5} {'GPU MB':>8}  COMMAND"]
+        for process in snapshot.gpu_processes:
+            sm_usage = f"{process.sm_usage}" if process.sm_usage is not None else "-"
+            memory_usage = f"{process.memory_usage}" if process.memory_usage is not None else "-"
+            memory_used = f"{process.memory_used / 1024**2:.1f}" if process.memory_used is not None else "-"
+            gpu_process_bars.append(
+                f"{process.pid:>7} {process.gpu:>3} {sm_usage:>5} {memory_usage:>5} {memory_used:>8}  {process.name}"
+            )
+        return gpu_process_bars
+
+    @staticmethod
+    def get_ticker_bar(name: str, ticker: Ticker) -> str:
+        """
+        Summarises how steadily a Ticker fires: its rate, its lateness percentiles and the ticks it skipped.
+
+        Args:
+            name (str): The label of the line, for example "Sampler".
+            ticker (Ticker): The ticker to summarise.
+
+        Returns:
+            str: One line, for example "Sampler: 2.0 Hz | late p50 <=1 ms, p99 <=5 ms, max 3.2 ms | skipped 0/120".
+        """
+        lateness = ticker.lateness
+        ticker_bar = f"{name}: {1 / ticker.interval:.1f} Hz"
+        if lateness.count:
+            ticker_bar += (
+                f" | late p50 <={lateness.percentile(50):g} ms, p99 <={lateness.percentile(99):g} ms, "
+                f"max {lateness.maximum:.1f} ms"
+            )
+        return ticker_bar + f" | skipped {ticker.skipped}/{ticker.ticks + ticker.skipped}"
+
 
 class ExtendedSystemInterface(SystemInterface):
     """
@@ -118,10 +466,13 @@ class ExtendedSystemInterface(SystemInterface):
     def __init__(self) -> None:
         super().__init__()
 
-    def get_average_cpu_load(self) -> str:
+    def get_average_cpu_load(self, snapshot: Optional[SystemSnapshot] = None) -> str:
         """
         Calculates and returns the average CPU load.
 
+        Args:
+            snapshot (SystemSnapshot, optional): The snapshot to render. A new one is taken if omitted.
+
         Returns:
             average_load (str): The average CPU load.
 
@@ -129,15 +480,19 @@ class ExtendedSystemInterface(SystemInterface):
             avg_cpu_load = extended_sys_interface.get_average_cpu_load()
             print(avg_cpu_load)  # Output: "AVG CPU: 45.23%"
         """
-        cpu_load = self.processor.get_cpu_load()
-        average_load = round(sum(cpu_load) / len(cpu_load), 2)
+        if snapshot is None:
+            snapshot = self.get_snapshot()
+        average_load = round(snapshot.cpu_total, 2)
 
         return f"AVG CPU: {average_load}%"
 
-    def get_gpu_usage_percentage(self) -> str:
+    def get_gpu_usage_percentage(self, snapshot: Optional[SystemSnapshot] = None) -> str:
         """
         Retrieves the GPU usage and returns it as a string.
 
+        Args:
+            snapshot (SystemSnapshot, optional): The snapshot to render. A new one is taken if omitted.
+
         Returns:
             gpu_usage (str): GPU usage information.
 
@@ -145,16 +500,21 @@ class ExtendedSystemInterface(SystemInterface):
             gpu_usage = extended_sys_interface.get_gpu_usage_percentage()
             print(gpu_usage)  # Output: "GPU: 54%"
         """
-        if self.nvidia_checker.is_nvidia_gpu_present():
-            nvidia_usage = self.nvidia.get_gpu_usage()
-            return f"GPU: {nvidia_usage}%"
+        if snapshot is None:
+            snapshot = self.get_snapshot()
+
+        if snapshot.gpu_usage is not None:
+            return f"GPU: {snapshot.gpu_usage}%"
         else:
             return "GPU: no info"
 
-    def get_memory_usage_gb(self) -> str:
+    def get_memory_usage_gb(self, snapshot: Optional[SystemSnapshot] = None) -> str:
         """
         Retrieves the memory usage and maximum memory and returns it as a string.
 
+        Args:
+            snapshot (SystemSnapshot, optional): The snapshot to render. A new one is taken if omitted.
+
         Returns:
             memory_usage (str): Memory usage information.
 
@@ -162,6 +522,6 @@ class ExtendedSystemInterface(SystemInterface):
             memory_usage = extended_sys_interface.get_memory_usage_gb()
             print(memory_usage)  # Output: "RAM: 4.21 GB / 16.0 GB"
         """
-        memory_usage_gb = self.memory.get_memory_usage_gb()
-        max_memory = self.memory.get_max_memory()
-        return f"RAM: {round(memory_usage_gb, 2)} GB / {round(max_memory, 2)} GB"
+        if snapshot is None:
+            snapshot = self.get_snapshot()
+        return f"RAM: {round(snapshot.memory_used_gb, 2)} GB / {round(snapshot.memory_total_gb, 2)} GB"
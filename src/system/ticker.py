@@ -0,0 +1,161 @@
+import bisect
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# Upper bounds of the lateness histogram buckets in milliseconds; later ticks land in an overflow bucket.
+LATENESS_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatenessHistogram:
+    """
+    A fixed-size histogram of how late ticks fired, with logarithmically spaced buckets.
+
+    Attributes:
+        bounds (Tuple[int, ...]): Upper bounds of the buckets in milliseconds.
+        counts (List[int]): Ticks per bucket; the last entry counts ticks later than the last bound.
+        count (int): Number of recorded ticks.
+        maximum (float): The latest tick in milliseconds.
+
+    Methods:
+        record(lateness: float) -> None: Records the lateness of one tick, in seconds.
+        percentile(q: float) -> Optional[float]: Returns the bucket bound below which q% of the ticks fired.
+    """
+
+    def __init__(self, bounds: Tuple[int, ...] = LATENESS_BUCKETS_MS) -> None:
+        self.bounds = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.maximum = 0.0
+
+    def record(self, lateness: float) -> None:
+        """
+        Records the lateness of one tick.
+
+        Args:
+            lateness (float): Seconds between the deadline and the moment the tick fired.
+        """
+        milliseconds = max(lateness, 0.0) * 1000
+        self.counts[bisect.bisect_left(self.bounds, milliseconds)] += 1
+        self.count += 1
+        self.maximum = max(self.maximum, milliseconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Returns the upper bound of the bucket that holds the q-th percentile.
+
+        Args:
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            float or None: Milliseconds, the observed maximum for the overflow bucket, or None if
+            nothing was recorded.
+        """
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.maximum
+
+
+class Ticker:
+    """
+    A drift-free periodic clock that fires on absolute time.monotonic() deadlines.
+
+    Rescheduling "interval seconds after the work is done" stretches every period by the time the
+    work took, so the samples drift and are unevenly spaced. A Ticker instead keeps the deadlines on
+    a fixed grid (start, start + interval, start + 2 * interval, ...): a tick that fires late is
+    followed by a shorter wait, and if whole periods were missed they are counted as skipped and
+    the next deadline is the next one still in the future, instead of firing a burst to catch up.
+
+    Attributes:
+        interval (float): The period in seconds.
+        deadline (float): Monotonic time of the next tick.
+        ticks (int): Number of ticks that fired.
+        skipped (int): Number of deadlines that passed without a tick.
+        lateness (LatenessHistogram): How late the ticks fired.
+
+    Methods:
+        reset(now: Optional[float] = None) -> None: Restarts the grid, with the first tick due now.
+        remaining(now: Optional[float] = None) -> float: Returns the seconds until the next deadline.
+        tick(now: Optional[float] = None) -> int: Records a tick and moves to the next deadline.
+        wait(stop_event: threading.Event) -> bool: Sleeps until the next deadline or until the event is set.
+
+    Usage:
+        1. Initialize an instance of the Ticker class:
+            ticker = Ticker(1.0)
+
+        2. Run the work on every tick:
+            while not ticker.wait(stop_event):
+                ticker.tick()
+                do_work()
+
+        3. Show how steady the ticks are:
+            print(ticker.lateness.percentile(99), ticker.skipped)
+    """
+
+    def __init__(self, interval: float) -> None:
+        if interval <= 0:
+            raise ValueError(f"The interval must be positive, got {interval}")
+        self.interval = interval
+        self.deadline = time.monotonic()
+        self.ticks = 0
+        self.skipped = 0
+        self.lateness = LatenessHistogram()
+
+    def reset(self, now: Optional[float] = None) -> None:
+        """
+        Restarts the grid, with the first tick due now.
+
+        Args:
+            now (float, optional): The current monotonic time.
+        """
+        self.deadline = time.monotonic() if now is None else now
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """
+        Returns the seconds until the next deadline.
+
+        Args:
+            now (float, optional): The current monotonic time.
+
+        Returns:
+            float: Seconds to wait, 0 if the deadline has passed.
+        """
+        now = time.monotonic() if now is None else now
+        return max(self.deadline - now, 0.0)
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """
+        Records a tick, counts the deadlines it missed and moves to the next deadline in the future.
+
+        Args:
+            now (float, optional): The current monotonic time.
+
+        Returns:
+            int: The number of deadlines skipped since the previous tick.
+        """
+        now = time.monotonic() if now is None else now
+        late = now - self.deadline
+        self.lateness.record(late)
+        skipped = int(late // self.interval) if late > 0 else 0
+        self.deadline += (skipped + 1) * self.interval
+        self.ticks += 1
+        self.skipped += skipped
+        return skipped
+
+    def wait(self, stop_event: threading.Event) -> bool:
+        """
+        Sleeps until the next deadline.
+
+        Args:
+            stop_event (threading.Event): Ends the wait early when it is set.
+
+        Returns:
+            bool: True if the event was set, False if the deadline was reached.
+        """
+        return stop_event.wait(self.remaining())
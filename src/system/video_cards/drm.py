@@ -0,0 +1,278 @@
+import glob
+import logging
+import os
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from ..procfs import PersistentFile, read_attribute
+from .nvidia import TOP_GPU_PROCESSES, GpuDevice, GpuProcess, GpuReading
+
+DRM_PATH = "/sys/class/drm"
+
+# PCI vendor ids of the GPUs read from sysfs; NVIDIA cards are read through NVML instead.
+VENDORS = {"0x1002": "AMD", "0x8086": "Intel"}
+
+# Card directories are "card0", "card1", ...; their connectors ("card0-HDMI-A-1") are skipped.
+_CARD_PATTERN = re.compile(r"card(\d+)$")
+
+
+def _open(path: str, size: int = 32) -> Optional[PersistentFile]:
+    """Opens a sysfs attribute that is re-read every tick, or returns None if the driver does not provide it."""
+    try:
+        return PersistentFile(path, size=size)
+    except OSError:
+        return None
+
+
+def parse_dpm_levels(content: str) -> Tuple[float, float]:
+    """
+    Parses an amdgpu pp_dpm_* file such as pp_dpm_sclk.
+
+    Each line is one clock level, for example "1: 1800Mhz *"; the current level is marked with "*".
+    Levels that are not a clock in MHz, as some drivers and firmwares print, are skipped.
+
+    Args:
+        content (str): The content of the file.
+
+    Returns:
+        Tuple[float, float]: The current and the highest clock in megahertz (MHz), 0 if unknown.
+    """
+    current = maximum = 0.0
+    for line in content.splitlines():
+        _, _, level = line.partition(":")
+        fields = level.split()
+        if not fields:
+            continue
+        try:
+            value = float(fields[0].lower().removesuffix("mhz"))
+        except ValueError:
+            logging.debug("Skipping the DPM level %r", line)
+            continue
+        maximum = max(maximum, value)
+        if fields[-1] == "*":
+            current = value
+    return current, maximum
+
+
+class _DrmCard:
+    """A discovered card: its static information and the attributes re-read every tick, kept open."""
+
+    def __init__(self, device: GpuDevice, device_path: str, card_path: str) -> None:
+        self.device = device
+        self.busy = _open(os.path.join(device_path, "gpu_busy_percent"))
+        self.memory_busy = _open(os.path.join(device_path, "mem_busy_percent"))
+        self.vram_used = _open(os.path.join(device_path, "mem_info_vram_used"))
+        self.sclk = _open(os.path.join(device_path, "pp_dpm_sclk"), size=512)
+        self.mclk = _open(os.path.join(device_path, "pp_dpm_mclk"), size=512)
+        # i915 has no DPM tables, but reports the actual GPU frequency per card.
+        self.actual_frequency = _open(os.path.join(card_path, "gt_act_freq_mhz"))
+
+        hwmon = next(iter(sorted(glob.glob(os.path.join(device_path, "hwmon", "hwmon*")))), None)
+        self.temperature: Optional[PersistentFile] = None
+        self.power: Optional[PersistentFile] = None
+        self.energy: Optional[PersistentFile] = None
+        self.power_limit: Optional[float] = None
+        if hwmon is not None:
+            self.temperature = _open(os.path.join(hwmon, "temp1_input"))
+            self.power = _open(os.path.join(hwmon, "power1_average")) or _open(os.path.join(hwmon, "power1_input"))
+            # i915 only exposes a cumulative energy counter, which is turned into power between two reads.
+            self.energy = _open(os.path.join(hwmon, "energy1_input")) if self.power is None else None
+            power_limit = read_attribute(os.path.join(hwmon, "power1_cap")) or read_attribute(
+                os.path.join(hwmon, "power1_max")
+            )
+            self.power_limit = int(power_limit) / 1e6 if power_limit and power_limit.isdigit() else None
+        self._last_energy: Optional[Tuple[int, float]] = None
+
+    def files(self) -> List[PersistentFile]:
+        candidates = (
+            self.busy,
+            self.memory_busy,
+            self.vram_used,
+            self.sclk,
+            self.mclk,
+            self.actual_frequency,
+            self.temperature,
+            self.power,
+            self.energy,
+        )
+        return [file for file in candidates if file is not None]
+
+    def read_power(self) -> Optional[float]:
+        """Returns the power draw in watts, from power1_average/power1_input or the change of energy1_input."""
+        if self.power is not None:
+            return self.power.read_uint() / 1e6
+        if self.energy is None:
+            return None
+        now = time.monotonic()
+        energy = self.energy.read_uint()
+        previous, self._last_energy = self._last_energy, (energy, now)
+        if previous is None or now <= previous[1] or energy < previous[0]:
+            return None
+        return (energy - previous[0]) / 1e6 / (now - previous[1])
+
+    def read(self) -> GpuReading:
+        frequency = memory_frequency = None
+        if self.sclk is not None:
+            frequency = parse_dpm_levels(self.sclk.read_text())[0]
+        elif self.actual_frequency is not None:
+            frequency = float(self.actual_frequency.read_uint())
+        if self.mclk is not None:
+            memory_frequency = parse_dpm_levels(self.mclk.read_text())[0]
+        return GpuReading(
+            self.device,
+            self.busy.read_uint() if self.busy is not None else None,
+            self.memory_busy.read_uint() if self.memory_busy is not None else None,
+            self.vram_used.read_uint() if self.vram_used is not None else None,
+            self.temperature.read_int() // 1000 if self.temperature is not None else None,
+            self.read_power(),
+            self.power_limit,
+            frequency or 0.0,
+            memory_frequency,
+        )
+
+    def close(self) -> None:
+        for file in self.files():
+            file.close()
+
+
+class Drm:
+    """
+    A class that reads AMD (amdgpu) and Intel (i915) GPUs from the DRM class in sysfs.
+
+    It reports through the same records and methods as the Nvidia class: every card under
+    /sys/class/drm is resolved once into a GpuDevice, and its attributes (gpu_busy_percent,
+    mem_info_vram_used, pp_dpm_sclk, the hwmon temperature and power files) are kept open and
+    re-read with pread every tick. Attributes a driver does not provide are left out of the
+    reading. If a read fails, for example after a GPU reset, the cards are resolved again on the
+    next call.
+
+    Methods:
+        devices() -> List[GpuDevice]: Returns the static information of every AMD and Intel GPU.
+        read() -> List[GpuReading]: Returns the utilisation, memory, temperature, power and clocks of every GPU.
+        read_processes(n: int = TOP_GPU_PROCESSES) -> List[GpuProcess]: Returns the processes using the GPUs most.
+        close() -> None: Closes the sysfs attributes.
+
+    Usage:
+        1. Initialize an instance of the Drm class:
+            drm = Drm()
+
+        2. Read the telemetry of every GPU:
+            for reading in drm.read():
+                print(reading.device.name, reading.usage, reading.memory_used, reading.frequency)
+
+    Notes:
+        - NVIDIA cards are skipped, they are read through NVML by the Nvidia class.
+        - i915 does not report utilisation or VRAM in sysfs, so only its clock, temperature and power are
+          known; the other values of its readings are None.
+        - The kernel keeps no per-process GPU accounting in sysfs, so read_processes() returns an empty list.
+    """
+
+    def __init__(self, drm_path: str = DRM_PATH) -> None:
+        self.drm_path = drm_path
+        self._cards: Optional[List[_DrmCard]] = None
+
+    def _resolve(self, card_path: str, index: int) -> Optional[_DrmCard]:
+        device_path = os.path.join(card_path, "device")
+        vendor = VENDORS.get(read_attribute(os.path.join(device_path, "vendor")) or "")
+        if vendor is None:
+            return None
+        uevent = dict(
+            line.partition("=")[::2]
+            for line in (read_attribute(os.path.join(device_path, "uevent")) or "").splitlines()
+        )
+        driver = uevent.get("DRIVER", "")
+        vram_total = read_attribute(os.path.join(device_path, "mem_info_vram_total"))
+        sclk = read_attribute(os.path.join(device_path, "pp_dpm_sclk"))
+        mclk = read_attribute(os.path.join(device_path, "pp_dpm_mclk"))
+        max_graphics_clock = read_attribute(os.path.join(card_path, "gt_RP0_freq_mhz"))
+        device = GpuDevice(
+            index,
+            card_path,
+            read_attribute(os.path.join(device_path, "product_name")) or f"{vendor} {driver}".strip(),
+            read_attribute(os.path.join(device_path, "unique_id")) or "",
+            uevent.get("PCI_SLOT_NAME", ""),
+            int(vram_total) if vram_total and vram_total.isdigit() else 0,
+            int(parse_dpm_levels(sclk)[1]) if sclk else int(max_graphics_clock or 0),
+            int(parse_dpm_levels(mclk)[1]) if mclk else 0,
+            vendor,
+        )
+        return _DrmCard(device, device_path, card_path)
+
+    def _cards_or_resolve(self) -> List[_DrmCard]:
+        if self._cards is None:
+            self._cards = []
+            indexes = {}
+            for card_path in glob.glob(os.path.join(self.drm_path, "card*")):
+                match = _CARD_PATTERN.match(os.path.basename(card_path))
+                if match is not None:
+                    indexes[card_path] = int(match.group(1))
+            for card_path in sorted(indexes, key=indexes.__getitem__):
+                card = self._resolve(card_path, indexes[card_path])
+                if card is not None:
+                    self._cards.append(card)
+        return self._cards
+
+    def devices(self) -> List[GpuDevice]:
+        """
+        Returns the static information of every AMD and Intel GPU, resolving the cards on the first call.
+
+        Returns:
+            List[GpuDevice]: One entry per card, ordered by card number.
+        """
+        return [card.device for card in self._cards_or_resolve()]
+
+    def read(self) -> List[GpuReading]:
+        """
+        Returns the utilisation, memory, temperature, power and clocks of every GPU.
+
+        Returns:
+            List[GpuReading]: One reading per card, or an empty list if the cards could not be read.
+        """
+        try:
+            return [card.read() for card in self._cards_or_resolve()]
+        except (OSError, ValueError) as err:
+            logging.debug("Failed to read the DRM GPUs, they will be resolved again: %s", err)
+            self.close()
+            return []
+
+    @staticmethod
+    def read_processes(n: int = TOP_GPU_PROCESSES) -> List[GpuProcess]:
+        """
+        Returns the processes using the GPUs most. Not available from sysfs.
+
+        Args:
+            n (int): The number of processes to return.
+
+        Returns:
+            List[GpuProcess]: Always an empty list.
+        """
+        return []
+
+    def close(self) -> None:
+        """Closes the sysfs attributes; the cards are resolved again on the next call."""
+        for card in self._cards or []:
+            card.close()
+        self._cards = None
+
+
+_shared_drm: Optional[Drm] = None
+_shared_drm_lock = threading.Lock()
+
+
+def get_drm() -> Drm:
+    """
+    Returns the Drm reader shared by the whole process, creating it on the first call.
+
+    main() checks for GPUs through it before the interface starts, and the collector then reads the
+    cards it already resolved.
+
+    Returns:
+        Drm: The shared reader.
+    """
+    global _shared_drm
+    with _shared_drm_lock:
+        if _shared_drm is None:
+            _shared_drm = Drm()
+        return _shared_drm
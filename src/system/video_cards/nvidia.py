@@ -1,85 +1,426 @@
-import pynvml
+import heapq
+import logging
+import os
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .nvml_session import NvmlSession, get_session
+
+PROC_PATH = "/proc"
+TOP_GPU_PROCESSES = 10
+
+# The errors after which the cached device handles are no longer valid, so the GPUs are resolved again.
+# Any other error of a query (no permission under vGPU or MIG, for example) only leaves out that value.
+DEVICE_LOST_ERRORS = ("NVMLError_Uninitialized", "NVMLError_GpuIsLost", "NVMLError_ResetRequired")
+
+# Clock throttle reason bits of nvmlDeviceGetCurrentClocksThrottleReasons and their short names.
+THROTTLE_REASONS = (
+    (0x1, "idle"),
+    (0x2, "app clocks"),
+    (0x4, "power cap"),
+    (0x8, "hw slowdown"),
+    (0x10, "sync boost"),
+    (0x20, "thermal"),
+    (0x40, "hw thermal"),
+    (0x80, "power brake"),
+    (0x100, "display clocks"),
+)
+
+
+def _text(value: Any) -> str:
+    """Returns an NVML string, which older pynvml versions return as bytes."""
+    return value.decode(errors="replace") if isinstance(value, bytes) else str(value)
+
+
+class GpuDevice:
+    """
+    The static information of one GPU, which is read once.
+
+    Attributes:
+        index (int): The NVML device index, or the card number of an AMD or Intel GPU read from DRM.
+        handle (Any): The NVML device handle, or the DRM card directory.
+        name (str): The product name, for example "NVIDIA A100-SXM4-80GB".
+        uuid (str): The GPU UUID.
+        pci_bus_id (str): The PCI bus id, for example "00000000:01:00.0".
+        memory_total (int): Total memory in bytes, or 0 if unknown.
+        max_graphics_clock (int): Maximum graphics clock in megahertz (MHz), or 0 if unknown.
+        max_memory_clock (int): Maximum memory clock in megahertz (MHz), or 0 if unknown.
+        vendor (str): "NVIDIA", "AMD" or "Intel"; it tells apart NVML index 0 and DRM card0.
+        unsupported (Set[str]): The queries the device answered with "not supported", which are not retried.
+    """
+
+    __slots__ = (
+        "index",
+        "handle",
+        "name",
+        "uuid",
+        "pci_bus_id",
+        "memory_total",
+        "max_graphics_clock",
+        "max_memory_clock",
+        "vendor",
+        "unsupported",
+    )
+
+    def __init__(
+        self,
+        index: int,
+        handle: Any,
+        name: str,
+        uuid: str = "",
+        pci_bus_id: str = "",
+        memory_total: int = 0,
+        max_graphics_clock: int = 0,
+        max_memory_clock: int = 0,
+        vendor: str = "NVIDIA",
+    ) -> None:
+        self.index = index
+        self.handle = handle
+        self.name = name
+        self.uuid = uuid
+        self.pci_bus_id = pci_bus_id
+        self.memory_total = memory_total
+        self.max_graphics_clock = max_graphics_clock
+        self.max_memory_clock = max_memory_clock
+        self.vendor = vendor
+        self.unsupported: Set[str] = set()
+
+
+class GpuReading:
+    """
+    The telemetry of one GPU on one tick, gathered in a single NVML pass or read from DRM sysfs.
+
+    Values the GPU does not report (for example power on some consumer cards, or utilisation and
+    memory on Intel GPUs) are None.
+
+    Attributes:
+        device (GpuDevice): The GPU the reading belongs to.
+        usage (Optional[int]): SM utilisation as a percentage.
+        memory_usage (Optional[int]): Memory controller utilisation as a percentage.
+        memory_used (Optional[int]): Used memory in bytes.
+        temperature (Optional[int]): Core temperature in degrees Celsius.
+        power (Optional[float]): Power draw in watts.
+        power_limit (Optional[float]): Enforced power limit in watts.
+        frequency (float): Current graphics clock in megahertz (MHz), 0 if unknown.
+        memory_frequency (Optional[float]): Current memory clock in megahertz (MHz).
+        throttle_reasons (int): Bit mask of the reasons the clocks are held down (see THROTTLE_REASONS).
+    """
+
+    __slots__ = (
+        "device",
+        "usage",
+        "memory_usage",
+        "memory_used",
+        "temperature",
+        "power",
+        "power_limit",
+        "frequency",
+        "memory_frequency",
+        "throttle_reasons",
+    )
+
+    def __init__(
+        self,
+        device: GpuDevice,
+        usage: Optional[int],
+        memory_usage: Optional[int] = None,
+        memory_used: Optional[int] = None,
+        temperature: Optional[int] = None,
+        power: Optional[float] = None,
+        power_limit: Optional[float] = None,
+        frequency: float = 0.0,
+        memory_frequency: Optional[float] = None,
+        throttle_reasons: int = 0,
+    ) -> None:
+        self.device = device
+        self.usage = usage
+        self.memory_usage = memory_usage
+        self.memory_used = memory_used
+        self.temperature = temperature
+        self.power = power
+        self.power_limit = power_limit
+        self.frequency = frequency
+        self.memory_frequency = memory_frequency
+        self.throttle_reasons = throttle_reasons
+
+    @property
+    def throttled_by(self) -> List[str]:
+        """
+        Returns the reasons the clocks are held down, leaving out an idle GPU.
+
+        Returns:
+            List[str]: Short names from THROTTLE_REASONS.
+        """
+        return [name for mask, name in THROTTLE_REASONS if self.throttle_reasons & mask and name != "idle"]
+
+
+class GpuProcess:
+    """
+    The GPU usage of one process on one GPU.
+
+    Attributes:
+        pid (int): The process id.
+        name (str): The command name from /proc, or "?" if the process is not visible (another PID namespace).
+        gpu (int): The NVML index of the GPU.
+        memory_used (Optional[int]): GPU memory used by the process in bytes, None if the driver does not report it.
+        sm_usage (Optional[int]): Share of the SMs used by the process as a percentage, None without a recent sample.
+        memory_usage (Optional[int]): Share of the memory controller used by the process as a percentage.
+    """
+
+    __slots__ = ("pid", "name", "gpu", "memory_used", "sm_usage", "memory_usage")
+
+    def __init__(
+        self,
+        pid: int,
+        name: str,
+        gpu: int,
+        memory_used: Optional[int] = None,
+        sm_usage: Optional[int] = None,
+        memory_usage: Optional[int] = None,
+    ) -> None:
+        self.pid = pid
+        self.name = name
+        self.gpu = gpu
+        self.memory_used = memory_used
+        self.sm_usage = sm_usage
+        self.memory_usage = memory_usage
 
 
 class Nvidia:
     """
     A class that provides methods to retrieve NVIDIA GPU-related information.
 
+    The device handles and the static information of every GPU (name, UUID, PCI bus, total
+    memory, maximum clocks) are resolved once, on first use, and cached. A tick then makes one
+    pass over the cached handles that gathers utilisation, memory, temperature, power, clocks and
+    throttle reasons of each GPU into a GpuReading. Queries a device does not support are
+    remembered and not retried, and a query that fails otherwise only leaves its value out. If a
+    GPU is lost or NVML is no longer initialised, for example after a GPU reset, the devices are
+    resolved again on the next call.
+
+    Attributes:
+        session (NvmlSession): The NVML session, the one shared by the process unless another one is given.
+        nvml (ModuleType): The NVML binding of the session.
+
     Methods:
-        get_gpu_usage() -> int: Returns the GPU usage as a percentage if an NVIDIA GPU is available,
-        otherwise returns 0.
-        get_gpu_frequency() -> int: Returns the current frequency of the GPU in megahertz (MHz)
-        if an NVIDIA GPU is available,
-        otherwise returns 0.
+        devices() -> List[GpuDevice]: Returns the static information of every NVIDIA GPU.
+        read() -> List[GpuReading]: Returns the telemetry of every GPU.
+        read_processes(n: int = TOP_GPU_PROCESSES) -> List[GpuProcess]: Returns the processes using the GPUs most.
+        close() -> None: Releases the reference to the NVML session.
 
     Usage:
         1. Initialize an instance of the Nvidia class:
             nvidia = Nvidia()
 
-        2. Access the methods to retrieve NVIDIA GPU information:
-            gpu_usage = nvidia.get_gpu_usage()
-            gpu_frequency = nvidia.get_gpu_frequency()
+        2. Read the telemetry of every GPU:
+            for reading in nvidia.read():
+                print(reading.device.name, reading.usage, reading.memory_used, reading.power)
+
+        3. Find the processes behind the load:
+            for process in nvidia.read_processes():
+                print(process.pid, process.name, process.gpu, process.sm_usage, process.memory_used)
 
     Notes:
-        - The Nvidia class depends on the pynvml module for NVIDIA GPU information.
+        - The Nvidia class depends on the pynvml module for NVIDIA GPU information. Any module with
+          the same functions and exceptions can be passed instead, for example a stand-in without GPUs;
+          it then gets an NVML session of its own.
+        - NVML is not initialised here: the first call takes a reference to the session, and without an
+          NVIDIA GPU every call returns an empty list.
+        - Process names are read from /proc once per pid and cached until the pid stops using a GPU.
+          Per-process utilisation only covers the samples NVML took since the previous call, so
+          read_processes() is meant to be called on a slower cadence than read().
     """
 
-    def __init__(self) -> None:
-        self._pynvml_initialized = False
+    def __init__(
+        self, nvml: Optional[ModuleType] = None, proc_path: str = PROC_PATH, session: Optional[NvmlSession] = None
+    ) -> None:
+        if session is None:
+            session = NvmlSession(nvml) if nvml is not None else get_session()
+        self.session = session
+        self.nvml = session.nvml
+        self._device_lost_errors = tuple(
+            getattr(self.nvml, name) for name in DEVICE_LOST_ERRORS if hasattr(self.nvml, name)
+        )
+        self.proc_path = proc_path
+        self._session_acquired = False
+        self._devices: Optional[List[GpuDevice]] = None
+        self._process_names: Dict[int, str] = {}
+        self._utilization_timestamps: Dict[int, int] = {}
 
-    def _initialize_pynvml(self) -> None:
-        if not self._pynvml_initialized:
-            pynvml.nvmlInit()
-            self._pynvml_initialized = True
+    def close(self) -> None:
+        """Releases the reference to the NVML session; NVML is shut down with the last reference."""
+        if self._session_acquired:
+            self._session_acquired = False
+            self._devices = None
+            self.session.release()
 
-    def get_gpu_usage(self) -> int:
-        """
-        Returns the GPU usage as a percentage if an NVIDIA GPU is available, otherwise returns 0.
+    def _query(self, function: Callable[..., Any], *args: Any, default: Any = None) -> Any:
+        """Calls a static NVML query, returning `default` if the device does not answer it."""
+        try:
+            return function(*args)
+        except self.nvml.NVMLError:
+            return default
 
-        Returns:
-            int: GPU usage as a percentage or 0 if no NVIDIA GPU is available.
+    def _resolve(self, index: int) -> GpuDevice:
+        nvml = self.nvml
+        handle = nvml.nvmlDeviceGetHandleByIndex(index)
+        pci_info = self._query(nvml.nvmlDeviceGetPciInfo, handle)
+        memory = self._query(nvml.nvmlDeviceGetMemoryInfo, handle)
+        return GpuDevice(
+            index,
+            handle,
+            _text(self._query(nvml.nvmlDeviceGetName, handle, default=f"GPU {index}")),
+            _text(self._query(nvml.nvmlDeviceGetUUID, handle, default="")),
+            _text(pci_info.busId) if pci_info is not None else "",
+            int(memory.total) if memory is not None else 0,
+            int(self._query(nvml.nvmlDeviceGetMaxClockInfo, handle, nvml.NVML_CLOCK_GRAPHICS, default=0)),
+            int(self._query(nvml.nvmlDeviceGetMaxClockInfo, handle, nvml.NVML_CLOCK_MEM, default=0)),
+        )
 
-        Example:
-            nvidia = Nvidia()
-            gpu_usage = nvidia.get_gpu_usage()
-            print(gpu_usage)  # Output: 54
+    def devices(self) -> List[GpuDevice]:
         """
-        self._initialize_pynvml()
+        Returns the static information of every NVIDIA GPU, resolving the devices on the first call.
 
-        device_count = pynvml.nvmlDeviceGetCount()
+        Returns:
+            List[GpuDevice]: One entry per GPU, in NVML index order.
+        """
+        if self._devices is None:
+            if not self._session_acquired:
+                self._session_acquired = True
+                if not self.session.acquire().available:
+                    self._devices = []
+                    return self._devices
+            self._devices = [self._resolve(index) for index in range(self.nvml.nvmlDeviceGetCount())]
+        return self._devices
 
-        for i in range(device_count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-            device_name = pynvml.nvmlDeviceGetName(handle)
+    def _sample(self, device: GpuDevice, name: str, *args: Any, key: Optional[str] = None) -> Any:
+        """
+        Calls a per-tick NVML query, returning None if it fails.
 
-            if "NVIDIA" in device_name:
-                utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
-                return int(utilization.gpu)
+        The query is skipped for good once the device said it does not support it; key tells apart the
+        queries of one function with different arguments, such as the graphics and memory clocks. Only the
+        errors of DEVICE_LOST_ERRORS are raised, so that the devices are resolved again.
+        """
+        key = key or name
+        if key in device.unsupported:
+            return None
+        try:
+            return getattr(self.nvml, name)(device.handle, *args)
+        except (self.nvml.NVMLError_NotSupported, AttributeError):
+            device.unsupported.add(key)
+            return None
+        except self._device_lost_errors:
+            raise
+        except self.nvml.NVMLError as err:
+            logging.debug("%s failed for GPU %d: %s", name, device.index, err)
+            return None
 
-        return 0
+    def _read_device(self, device: GpuDevice) -> GpuReading:
+        nvml = self.nvml
+        # MIG instances and vGPUs may refuse even utilisation and memory; those values are then unknown.
+        utilization = self._sample(device, "nvmlDeviceGetUtilizationRates")
+        memory = self._sample(device, "nvmlDeviceGetMemoryInfo")
+        power = self._sample(device, "nvmlDeviceGetPowerUsage")
+        power_limit = self._sample(device, "nvmlDeviceGetEnforcedPowerLimit")
+        clock = self._sample(device, "nvmlDeviceGetClockInfo", nvml.NVML_CLOCK_GRAPHICS, key="graphics clock")
+        memory_clock = self._sample(device, "nvmlDeviceGetClockInfo", nvml.NVML_CLOCK_MEM, key="memory clock")
+        # Renamed to "clocks event reasons" in recent drivers; the old name is kept as an alias.
+        throttle_reasons = self._sample(device, "nvmlDeviceGetCurrentClocksThrottleReasons")
+        return GpuReading(
+            device,
+            int(utilization.gpu) if utilization is not None else None,
+            int(utilization.memory) if utilization is not None else None,
+            int(memory.used) if memory is not None else None,
+            self._sample(device, "nvmlDeviceGetTemperature", nvml.NVML_TEMPERATURE_GPU),
+            power / 1000 if power is not None else None,
+            power_limit / 1000 if power_limit is not None else None,
+            float(clock or 0),
+            float(memory_clock) if memory_clock is not None else None,
+            int(throttle_reasons or 0),
+        )
 
-    def get_gpu_frequency(self) -> float:
+    def read(self) -> List[GpuReading]:
         """
-        Returns the current frequency of the GPU if an NVIDIA GPU is available, otherwise returns 0.
+        Returns the utilisation, memory, temperature, power, clocks and throttle reasons of every GPU.
 
         Returns:
-            int: Current frequency of the GPU in megahertz (MHz) or 0 if no NVIDIA GPU is available.
-
-        Example:
-            nvidia = Nvidia()
-            gpu_frequency = nvidia.get_gpu_frequency()
-            print(gpu_frequency)  # Output: 1750
+            List[GpuReading]: One reading per GPU, or an empty list if the GPUs could not be read.
         """
-        self._initialize_pynvml()
+        try:
+            return [self._read_device(device) for device in self.devices()]
+        except self._device_lost_errors as err:
+            logging.debug("Lost the NVIDIA GPUs, they will be resolved again: %s", err)
+            self._devices = None
+        except self.nvml.NVMLError as err:
+            logging.debug("Failed to read the NVIDIA GPUs: %s", err)
+        return []
 
-        device_count = pynvml.nvmlDeviceGetCount()
+    def _process_name(self, pid: int) -> str:
+        name = self._process_names.get(pid)
+        if name is None:
+            try:
+                with open(os.path.join(self.proc_path, str(pid), "comm")) as comm_file:
+                    name = comm_file.read().strip()
+            except OSError:
+                # NVML reports host pids, which a monitor inside a container cannot see.
+                name = "?"
+            self._process_names[pid] = name
+        return name
 
-        for i in range(device_count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-            device_name = pynvml.nvmlDeviceGetName(handle)
+    def _process_utilization(self, device: GpuDevice) -> Dict[int, Tuple[int, int]]:
+        """Returns the latest (SM, memory) utilisation of each process sampled since the previous call."""
+        # NotFound means that no process was sampled since the previous call.
+        samples = self._sample(
+            device, "nvmlDeviceGetProcessUtilization", self._utilization_timestamps.get(device.index, 0)
+        )
+        utilization: Dict[int, Tuple[int, int]] = {}
+        for sample in sorted(samples or [], key=lambda sample: sample.timeStamp):
+            utilization[sample.pid] = (int(sample.smUtil), int(sample.memUtil))
+            self._utilization_timestamps[device.index] = sample.timeStamp
+        return utilization
 
-            if "NVIDIA" in device_name:
-                clock_info = pynvml.nvmlDeviceGetClockInfo(handle, pynvml.NVML_CLOCK_GRAPHICS)
-                return float(clock_info / 1000)  # Convert to MHz
+    def _device_processes(self, device: GpuDevice) -> List[GpuProcess]:
+        running = (self._sample(device, "nvmlDeviceGetComputeRunningProcesses") or []) + (
+            self._sample(device, "nvmlDeviceGetGraphicsRunningProcesses") or []
+        )
+        utilization = self._process_utilization(device)
+        processes: Dict[int, GpuProcess] = {}
+        for process in running:
+            # A process with both a compute and a graphics context is listed twice.
+            memory_used = getattr(process, "usedGpuMemory", None)
+            if process.pid in processes:
+                if memory_used is not None:
+                    processes[process.pid].memory_used = max(processes[process.pid].memory_used or 0, memory_used)
+                continue
+            sm_usage, memory_usage = utilization.get(process.pid, (None, None))
+            processes[process.pid] = GpuProcess(
+                process.pid, self._process_name(process.pid), device.index, memory_used, sm_usage, memory_usage
+            )
+        return list(processes.values())
+
+    def read_processes(self, n: int = TOP_GPU_PROCESSES) -> List[GpuProcess]:
+        """
+        Returns the processes using the GPUs, with their memory and utilisation on each GPU.
+
+        Args:
+            n (int): The number of processes to return.
+
+        Returns:
+            List[GpuProcess]: The n processes with the highest SM utilisation, then GPU memory, heaviest first.
+        """
+        processes: List[GpuProcess] = []
+        try:
+            for device in self.devices():
+                processes += self._device_processes(device)
+        except self._device_lost_errors as err:
+            logging.debug("Lost the NVIDIA GPUs, they will be resolved again: %s", err)
+            self._devices = None
+            return []
+        except self.nvml.NVMLError as err:
+            logging.debug("Failed to read the NVIDIA GPU processes: %s", err)
+            return []
 
-        return 0
+        # Forget the names of processes that left the GPUs, so a reused pid is looked up again.
+        pids = {process.pid for process in processes}
+        self._process_names = {pid: name for pid, name in self._process_names.items() if pid in pids}
+        return heapq.nlargest(n, processes, key=lambda process: (process.sm_usage or 0, process.memory_used or 0))
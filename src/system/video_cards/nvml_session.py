@@ -0,0 +1,168 @@
+import logging
+import threading
+from types import ModuleType
+from typing import Optional
+
+import pynvml
+
+
+class NvmlCapabilities:
+    """
+    What the NVML probe found, which is determined once per session.
+
+    Attributes:
+        available (bool): Whether NVML could be initialised and reports at least one GPU.
+        device_count (int): Number of NVIDIA GPUs.
+        driver_version (str): The NVIDIA driver version, or "" if unknown.
+        cuda_driver_version (int): The CUDA version supported by the driver (for example 12040), or 0 if unknown.
+        error (str): Why NVML is not available, or "" if it is.
+    """
+
+    __slots__ = ("available", "device_count", "driver_version", "cuda_driver_version", "error")
+
+    def __init__(
+        self,
+        available: bool = False,
+        device_count: int = 0,
+        driver_version: str = "",
+        cuda_driver_version: int = 0,
+        error: str = "",
+    ) -> None:
+        self.available = available
+        self.device_count = device_count
+        self.driver_version = driver_version
+        self.cuda_driver_version = cuda_driver_version
+        self.error = error
+
+
+class NvmlSession:
+    """
+    A reference-counted NVML session shared by everything in the process that talks to NVML.
+
+    The first acquire() initialises NVML and probes it once: whether the library is installed, how
+    many GPUs there are and which driver runs them. Later acquire() calls only count a reference
+    and return the cached capabilities, and the last release() shuts NVML down. A missing library
+    or driver never raises or exits; it is reported through NvmlCapabilities.error.
+
+    Attributes:
+        nvml (ModuleType): The NVML binding, the pynvml module unless another one is injected.
+
+    Methods:
+        acquire() -> NvmlCapabilities: Takes a reference, initialising and probing NVML on the first one.
+        release() -> None: Drops a reference, shutting NVML down with the last one.
+        capabilities -> Optional[NvmlCapabilities]: The result of the probe, or None before the first acquire.
+
+    Usage:
+        1. Take a reference to the shared session:
+            session = get_session()
+            capabilities = session.acquire()
+            if capabilities.available:
+                print(capabilities.device_count, capabilities.driver_version)
+
+        2. Release it when done:
+            session.release()
+
+    Notes:
+        - The probe is kept after NVML is shut down, so re-acquiring the session does not probe again.
+        - The methods are thread-safe; the sampler thread and the interfaces share one session.
+    """
+
+    def __init__(self, nvml: Optional[ModuleType] = None) -> None:
+        self.nvml = nvml if nvml is not None else pynvml
+        self._lock = threading.Lock()
+        self._references = 0
+        self._initialized = False
+        self._capabilities: Optional[NvmlCapabilities] = None
+
+    @property
+    def capabilities(self) -> Optional[NvmlCapabilities]:
+        """
+        Returns the result of the probe.
+
+        Returns:
+            NvmlCapabilities or None: The cached capabilities, or None if the session was never acquired.
+        """
+        return self._capabilities
+
+    def _initialize(self) -> Optional[str]:
+        """Initialises NVML, returning why it failed or None."""
+        try:
+            self.nvml.nvmlInit()
+        except self.nvml.NVMLError_LibraryNotFound:
+            return (
+                "The NVIDIA System Management Interface library (libnvidia-ml.so) was not found. "
+                "Please install the appropriate NVIDIA drivers for your GPU."
+            )
+        except self.nvml.NVMLError as err:
+            return f"NVIDIA video card verification error: {err}"
+        self._initialized = True
+        return None
+
+    def _probe(self) -> NvmlCapabilities:
+        try:
+            device_count = int(self.nvml.nvmlDeviceGetCount())
+        except self.nvml.NVMLError as err:
+            return NvmlCapabilities(error=f"NVIDIA video card verification error: {err}")
+        try:
+            driver_version = self.nvml.nvmlSystemGetDriverVersion()
+            driver_version = driver_version.decode() if isinstance(driver_version, bytes) else str(driver_version)
+        except (self.nvml.NVMLError, AttributeError):
+            driver_version = ""
+        try:
+            cuda_driver_version = int(self.nvml.nvmlSystemGetCudaDriverVersion())
+        except (self.nvml.NVMLError, AttributeError):
+            cuda_driver_version = 0
+        return NvmlCapabilities(
+            device_count > 0, device_count, driver_version, cuda_driver_version, "" if device_count else "No NVIDIA GPU"
+        )
+
+    def acquire(self) -> NvmlCapabilities:
+        """
+        Takes a reference to the session, initialising NVML on the first one and probing it once.
+
+        Returns:
+            NvmlCapabilities: What the probe found.
+        """
+        with self._lock:
+            self._references += 1
+            if self._capabilities is None:
+                error = self._initialize()
+                self._capabilities = self._probe() if error is None else NvmlCapabilities(error=error)
+                logging.debug("NVML probe: %s", self._capabilities.error or "available")
+            elif not self._initialized and self._capabilities.available:
+                # The session was shut down by its last release; the probe is kept, only NVML is initialised again.
+                self._initialize()
+            return self._capabilities
+
+    def release(self) -> None:
+        """
+        Drops a reference to the session, shutting NVML down when the last one is released.
+        """
+        with self._lock:
+            if self._references == 0:
+                return
+            self._references -= 1
+            if self._references == 0 and self._initialized:
+                try:
+                    self.nvml.nvmlShutdown()
+                except self.nvml.NVMLError as err:
+                    logging.debug("NVML shutdown failed: %s", err)
+                self._initialized = False
+
+
+_shared_session: Optional[NvmlSession] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_session() -> NvmlSession:
+    """
+    Returns the NVML session shared by the whole process, creating it on the first call.
+
+    Returns:
+        NvmlSession: The shared session.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = NvmlSession()
+        return _shared_session
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+from tests.fake_pynvml import FakeNvml
+
+try:
+    import pynvml  # noqa: F401
+except ImportError:
+    # system.video_cards imports pynvml at module level; the tests pass their own FakeNvml to every class.
+    sys.modules["pynvml"] = FakeNvml()
+
+
+def pytest_sessionstart(session: pytest.Session) -> None:
+    # The paths in consts (settings, metric store and log) are relative to src/, where main.py runs, and
+    # data_storage reads the settings on import; run the tests from there too.
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,211 @@
+"""
+A stand-in for the pynvml module that simulates NVIDIA GPUs, so the NVML code can be tested without a driver.
+
+Usage:
+    nvml = FakeNvml([FakeGpu("NVIDIA A100"), FakeGpu("NVIDIA A100")])
+    nvidia = Nvidia(nvml)
+    nvml.gpus[0].unsupported.add("nvmlDeviceGetPowerUsage")
+    nvml.gpus[1].errors["nvmlDeviceGetTemperature"] = NVMLError_GpuIsLost()
+"""
+
+from collections import Counter
+from types import ModuleType, SimpleNamespace
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class NVMLError(Exception):
+    pass
+
+
+class NVMLError_LibraryNotFound(NVMLError):
+    pass
+
+
+class NVMLError_NotSupported(NVMLError):
+    pass
+
+
+class NVMLError_NotFound(NVMLError):
+    pass
+
+
+class NVMLError_NoPermission(NVMLError):
+    pass
+
+
+class NVMLError_Uninitialized(NVMLError):
+    pass
+
+
+class NVMLError_GpuIsLost(NVMLError):
+    pass
+
+
+class NVMLError_ResetRequired(NVMLError):
+    pass
+
+
+class FakeGpu:
+    """
+    One simulated GPU; the fake NVML functions return its attributes, which tests change between calls.
+
+    Attributes:
+        unsupported (Set[str]): NVML functions that raise NVMLError_NotSupported for this GPU.
+        errors (Dict[str, NVMLError]): NVML functions that raise the given error for this GPU.
+        compute_processes (List[Tuple[int, Optional[int]]]): (pid, used memory) of the compute contexts.
+        graphics_processes (List[Tuple[int, Optional[int]]]): (pid, used memory) of the graphics contexts.
+        process_samples (List[Tuple[int, int, int, int]]): (timestamp, pid, SM %, memory %) utilisation samples.
+    """
+
+    def __init__(self, name: str = "NVIDIA Fake", memory_total: int = 8 * 1024**3) -> None:
+        self.name = name
+        self.memory_total = memory_total
+        self.memory_used = 1024**3
+        self.usage = 42
+        self.memory_usage = 10
+        self.temperature = 60
+        self.power = 120_000
+        self.power_limit = 250_000
+        self.clocks = {FakeNvml.NVML_CLOCK_GRAPHICS: 1500, FakeNvml.NVML_CLOCK_MEM: 5000}
+        self.max_clocks = {FakeNvml.NVML_CLOCK_GRAPHICS: 2000, FakeNvml.NVML_CLOCK_MEM: 6000}
+        self.throttle_reasons = 0
+        self.unsupported: Set[str] = set()
+        self.errors: Dict[str, NVMLError] = {}
+        self.compute_processes: List[Tuple[int, Optional[int]]] = []
+        self.graphics_processes: List[Tuple[int, Optional[int]]] = []
+        self.process_samples: List[Tuple[int, int, int, int]] = []
+
+
+class FakeNvml(ModuleType):
+    """
+    The fake pynvml module: the NVML functions the monitor calls, backed by a list of FakeGpu.
+
+    Attributes:
+        gpus (List[FakeGpu]): The simulated GPUs; the device handle of a GPU is the FakeGpu itself.
+        library_found (bool): Whether nvmlInit() succeeds or raises NVMLError_LibraryNotFound.
+        calls (Counter): Number of calls per NVML function name.
+        last_seen (List[int]): The lastSeenTimeStamp argument of every nvmlDeviceGetProcessUtilization call.
+    """
+
+    NVMLError = NVMLError
+    NVMLError_LibraryNotFound = NVMLError_LibraryNotFound
+    NVMLError_NotSupported = NVMLError_NotSupported
+    NVMLError_NotFound = NVMLError_NotFound
+    NVMLError_NoPermission = NVMLError_NoPermission
+    NVMLError_Uninitialized = NVMLError_Uninitialized
+    NVMLError_GpuIsLost = NVMLError_GpuIsLost
+    NVMLError_ResetRequired = NVMLError_ResetRequired
+
+    NVML_CLOCK_GRAPHICS = 0
+    NVML_CLOCK_SM = 1
+    NVML_CLOCK_MEM = 2
+    NVML_TEMPERATURE_GPU = 0
+
+    def __init__(self, gpus: Optional[List[FakeGpu]] = None, library_found: bool = True) -> None:
+        super().__init__("pynvml")
+        self.gpus = gpus if gpus is not None else []
+        self.library_found = library_found
+        self.calls: Counter = Counter()
+        self.last_seen: List[int] = []
+
+    def _call(self, name: str, handle: Optional[FakeGpu] = None) -> None:
+        self.calls[name] += 1
+        if handle is not None:
+            if name in handle.unsupported:
+                raise NVMLError_NotSupported()
+            if name in handle.errors:
+                raise handle.errors[name]
+
+    def nvmlInit(self) -> None:
+        self._call("nvmlInit")
+        if not self.library_found:
+            raise NVMLError_LibraryNotFound()
+
+    def nvmlShutdown(self) -> None:
+        self._call("nvmlShutdown")
+
+    def nvmlSystemGetDriverVersion(self) -> bytes:
+        self._call("nvmlSystemGetDriverVersion")
+        return b"550.54.14"
+
+    def nvmlSystemGetCudaDriverVersion(self) -> int:
+        self._call("nvmlSystemGetCudaDriverVersion")
+        return 12040
+
+    def nvmlDeviceGetCount(self) -> int:
+        self._call("nvmlDeviceGetCount")
+        return len(self.gpus)
+
+    def nvmlDeviceGetHandleByIndex(self, index: int) -> FakeGpu:
+        self._call("nvmlDeviceGetHandleByIndex")
+        return self.gpus[index]
+
+    def nvmlDeviceGetName(self, handle: FakeGpu) -> bytes:
+        self._call("nvmlDeviceGetName", handle)
+        return handle.name.encode()
+
+    def nvmlDeviceGetUUID(self, handle: FakeGpu) -> str:
+        self._call("nvmlDeviceGetUUID", handle)
+        return f"GPU-{self.gpus.index(handle)}"
+
+    def nvmlDeviceGetPciInfo(self, handle: FakeGpu) -> Any:
+        self._call("nvmlDeviceGetPciInfo", handle)
+        return SimpleNamespace(busId=f"00000000:0{self.gpus.index(handle) + 1}:00.0")
+
+    def nvmlDeviceGetMemoryInfo(self, handle: FakeGpu) -> Any:
+        self._call("nvmlDeviceGetMemoryInfo", handle)
+        return SimpleNamespace(
+            total=handle.memory_total, used=handle.memory_used, free=handle.memory_total - handle.memory_used
+        )
+
+    def nvmlDeviceGetMaxClockInfo(self, handle: FakeGpu, clock: int) -> int:
+        self._call("nvmlDeviceGetMaxClockInfo", handle)
+        return handle.max_clocks[clock]
+
+    def nvmlDeviceGetUtilizationRates(self, handle: FakeGpu) -> Any:
+        self._call("nvmlDeviceGetUtilizationRates", handle)
+        return SimpleNamespace(gpu=handle.usage, memory=handle.memory_usage)
+
+    def nvmlDeviceGetClockInfo(self, handle: FakeGpu, clock: int) -> int:
+        """Raises NVMLError_NotSupported for the clocks missing from the clocks of the GPU."""
+        self._call("nvmlDeviceGetClockInfo", handle)
+        if clock not in handle.clocks:
+            raise NVMLError_NotSupported()
+        return handle.clocks[clock]
+
+    def nvmlDeviceGetTemperature(self, handle: FakeGpu, sensor: int) -> int:
+        self._call("nvmlDeviceGetTemperature", handle)
+        return handle.temperature
+
+    def nvmlDeviceGetPowerUsage(self, handle: FakeGpu) -> int:
+        self._call("nvmlDeviceGetPowerUsage", handle)
+        return handle.power
+
+    def nvmlDeviceGetEnforcedPowerLimit(self, handle: FakeGpu) -> int:
+        self._call("nvmlDeviceGetEnforcedPowerLimit", handle)
+        return handle.power_limit
+
+    def nvmlDeviceGetCurrentClocksThrottleReasons(self, handle: FakeGpu) -> int:
+        self._call("nvmlDeviceGetCurrentClocksThrottleReasons", handle)
+        return handle.throttle_reasons
+
+    def nvmlDeviceGetComputeRunningProcesses(self, handle: FakeGpu) -> List[Any]:
+        self._call("nvmlDeviceGetComputeRunningProcesses", handle)
+        return [SimpleNamespace(pid=pid, usedGpuMemory=memory) for pid, memory in handle.compute_processes]
+
+    def nvmlDeviceGetGraphicsRunningProcesses(self, handle: FakeGpu) -> List[Any]:
+        self._call("nvmlDeviceGetGraphicsRunningProcesses", handle)
+        return [SimpleNamespace(pid=pid, usedGpuMemory=memory) for pid, memory in handle.graphics_processes]
+
+    def nvmlDeviceGetProcessUtilization(self, handle: FakeGpu, last_seen: int) -> List[Any]:
+        """Returns the samples newer than last_seen, or raises NVMLError_NotFound if there are none, like NVML."""
+        self._call("nvmlDeviceGetProcessUtilization", handle)
+        self.last_seen.append(last_seen)
+        samples = [
+            SimpleNamespace(timeStamp=timestamp, pid=pid, smUtil=sm, memUtil=memory)
+            for timestamp, pid, sm, memory in handle.process_samples
+            if timestamp > last_seen
+        ]
+        if not samples:
+            raise NVMLError_NotFound()
+        return samples
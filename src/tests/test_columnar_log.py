@@ -0,0 +1,154 @@
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from data_storage.metrics import columnar_log
+from data_storage.metrics.columnar_log import TRIM_JOURNAL, ColumnarLog, list_columns, open_columns
+from data_storage.metrics.query import QueryResult, query
+
+
+def read_columns(directory: Path) -> Dict[str, List[float]]:
+    names = list_columns(str(directory))
+    timestamps, columns = open_columns(str(directory), names)
+    try:
+        result: Dict[str, List[float]] = {"timestamp": list(timestamps.values)}
+        result.update((name, list(column.values)) for name, column in zip(names, columns))
+        return result
+    finally:
+        for view in [timestamps] + columns:
+            view.close()
+
+
+def is_nan(values: List[float]) -> List[bool]:
+    return [math.isnan(value) for value in values]
+
+
+def test_rows_survive_a_reopen(tmp_path: Path) -> None:
+    log = ColumnarLog(str(tmp_path), flush_every=2)
+    for second in range(3):
+        log.append(100.0 + second, {"cpu": float(second)})
+    log.append(103.0, {"cpu": 3.0, "gpu": 50.0})
+    # Older than the last row, so dropped.
+    log.append(102.5, {"cpu": 9.0})
+    log.close()
+
+    log = ColumnarLog(str(tmp_path), flush_every=2)
+    assert log.rows == 4
+    log.append(104.0, {"gpu": 60.0})
+    log.close()
+
+    columns = read_columns(tmp_path)
+    assert columns["timestamp"] == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert columns["cpu"][:4] == [0.0, 1.0, 2.0, 3.0]
+    assert is_nan(columns["cpu"]) == [False] * 4 + [True]
+    assert is_nan(columns["gpu"]) == [True] * 3 + [False] * 2
+    assert columns["gpu"][3:] == [50.0, 60.0]
+
+
+def test_uneven_columns_are_repaired_on_open(tmp_path: Path) -> None:
+    log = ColumnarLog(str(tmp_path))
+    for second in range(3):
+        log.append(100.0 + second, {"cpu": float(second), "ram": 1.0})
+    log.close()
+    # A crash between the writes of a batch: cpu got a row the timestamps did not, ram lost one.
+    with open(tmp_path / "cpu.f64", "ab") as file:
+        file.write(bytes(8))
+    with open(tmp_path / "ram.f64", "r+b") as file:
+        file.truncate(16)
+
+    ColumnarLog(str(tmp_path)).close()
+
+    columns = read_columns(tmp_path)
+    assert columns["cpu"] == [0.0, 1.0, 2.0]
+    assert is_nan(columns["ram"]) == [False, False, True]
+
+
+def test_old_rows_are_trimmed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(columnar_log, "TRIM_SLACK", 5)
+    log = ColumnarLog(str(tmp_path), flush_every=5, retention=10)
+    for second in range(20):
+        log.append(float(second), {"cpu": float(second)})
+    log.close()
+
+    columns = read_columns(tmp_path)
+    assert columns["timestamp"] == [float(second) for second in range(9, 20)]
+    assert columns["cpu"] == columns["timestamp"]
+    assert not (tmp_path / TRIM_JOURNAL).exists()
+    assert ColumnarLog(str(tmp_path)).rows == 11
+
+
+def test_rows_appended_during_a_trim_are_written_after_it(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(columnar_log, "TRIM_SLACK", 5)
+    release = threading.Event()
+    trim = ColumnarLog._trim
+
+    def slow_trim(log: ColumnarLog, rows: int, cut: int) -> None:
+        release.wait(5)
+        trim(log, rows, cut)
+
+    monkeypatch.setattr(ColumnarLog, "_trim", slow_trim)
+    log = ColumnarLog(str(tmp_path), flush_every=5, retention=10)
+    for second in range(20):
+        log.append(float(second), {"cpu": float(second)})
+    for second in range(20, 30):
+        log.append(float(second), {"cpu": float(second), "gpu": 1.0})
+
+    # The trim waits, so the new rows stay buffered and the files keep their old length.
+    assert os.path.getsize(tmp_path / "timestamp.f64") == 20 * 8
+    release.set()
+    log.close()
+
+    columns = read_columns(tmp_path)
+    assert columns["timestamp"] == [float(second) for second in range(9, 30)]
+    assert columns["cpu"] == columns["timestamp"]
+    assert is_nan(columns["gpu"]) == [True] * 11 + [False] * 10
+
+
+def test_interrupted_trim_is_finished_on_open(tmp_path: Path) -> None:
+    log = ColumnarLog(str(tmp_path))
+    for second in range(6):
+        log.append(float(second), {"cpu": float(second), "ram": 10.0 + second})
+    log.close()
+    # A crash in the middle of a trim of 2 rows: cpu was rewritten, ram and the timestamps were not.
+    (tmp_path / TRIM_JOURNAL).write_text("6 2\n")
+    with open(tmp_path / "cpu.f64", "r+b") as file:
+        data = file.read()
+        file.seek(0)
+        file.write(data[16:])
+        file.truncate(len(data) - 16)
+
+    with pytest.raises(TimeoutError):
+        open_columns(str(tmp_path), ["cpu"], wait=0)
+
+    log = ColumnarLog(str(tmp_path))
+    assert log.rows == 4
+    log.close()
+
+    columns = read_columns(tmp_path)
+    assert columns == {
+        "timestamp": [2.0, 3.0, 4.0, 5.0],
+        "cpu": [2.0, 3.0, 4.0, 5.0],
+        "ram": [12.0, 13.0, 14.0, 15.0],
+    }
+
+
+def test_query_aggregates_steps(tmp_path: Path) -> None:
+    log = ColumnarLog(str(tmp_path))
+    for second in range(10):
+        # The metric is missing from every fourth row.
+        log.append(1000.0 + second, {"cpu": float(second)} if second % 4 else {"ram": 1.0})
+    log.close()
+
+    def run(aggregation: str) -> List[QueryResult]:
+        return query("cpu", 1000.0, 1010.0, 5.0, aggregation, str(tmp_path))
+
+    assert run("avg") == [QueryResult(1000.0, 2.0, 3), QueryResult(1005.0, 6.75, 4)]
+    assert run("max") == [QueryResult(1000.0, 3.0, 3), QueryResult(1005.0, 9.0, 4)]
+    assert run("p50") == [QueryResult(1000.0, 2.0, 3), QueryResult(1005.0, 6.5, 4)]
+    assert query("cpu", 1002.0, 1004.0, 60.0, "min", str(tmp_path)) == [QueryResult(1002.0, 2.0, 2)]
+    with pytest.raises(KeyError):
+        query("gpu", 1000.0, 1010.0, 5.0, "avg", str(tmp_path))
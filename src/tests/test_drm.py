@@ -0,0 +1,148 @@
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from system.video_cards import drm as drm_module
+from system.video_cards.drm import Drm, get_drm, parse_dpm_levels
+
+SCLK = "0: 500Mhz\n1: 1800Mhz *\n2: 2500Mhz\n"
+MCLK = "0: 96Mhz\n1: 1000Mhz *\n"
+
+
+def make_card(drm_path: Path, name: str, device: Dict[str, str], card: Dict[str, str], hwmon: Dict[str, str]) -> Path:
+    card_path = drm_path / name
+    (card_path / "device" / "hwmon" / "hwmon3").mkdir(parents=True)
+    for attributes, directory in (
+        (device, card_path / "device"),
+        (card, card_path),
+        (hwmon, card_path / "device" / "hwmon" / "hwmon3"),
+    ):
+        for attribute, content in attributes.items():
+            (directory / attribute).write_text(content + "\n")
+    return card_path
+
+
+def make_amdgpu(drm_path: Path, name: str) -> Path:
+    device = {
+        "vendor": "0x1002",
+        "uevent": "DRIVER=amdgpu\nPCI_SLOT_NAME=0000:03:00.0",
+        "product_name": "Radeon RX 7900 XT",
+        "unique_id": "abc123",
+        "gpu_busy_percent": "37",
+        "mem_busy_percent": "12",
+        "mem_info_vram_total": str(20 * 1024**3),
+        "mem_info_vram_used": str(2 * 1024**3),
+        "pp_dpm_sclk": SCLK,
+        "pp_dpm_mclk": MCLK,
+    }
+    hwmon = {"temp1_input": "54000", "power1_average": "85000000", "power1_cap": "300000000"}
+    return make_card(drm_path, name, device, {}, hwmon)
+
+
+def make_i915(drm_path: Path, name: str) -> Path:
+    device = {"vendor": "0x8086", "uevent": "DRIVER=i915\nPCI_SLOT_NAME=0000:00:02.0"}
+    card = {"gt_act_freq_mhz": "900", "gt_RP0_freq_mhz": "1300"}
+    return make_card(drm_path, name, device, card, {"temp1_input": "48000", "energy1_input": "1000000"})
+
+
+def test_amdgpu_is_read(tmp_path: Path) -> None:
+    make_amdgpu(tmp_path, "card0")
+    drm = Drm(str(tmp_path))
+
+    (reading,) = drm.read()
+
+    device = reading.device
+    assert (device.index, device.vendor, device.name, device.uuid, device.pci_bus_id) == (
+        0,
+        "AMD",
+        "Radeon RX 7900 XT",
+        "abc123",
+        "0000:03:00.0",
+    )
+    assert (device.memory_total, device.max_graphics_clock, device.max_memory_clock) == (20 * 1024**3, 2500, 1000)
+    assert (reading.usage, reading.memory_usage, reading.memory_used, reading.temperature) == (37, 12, 2 * 1024**3, 54)
+    assert (reading.power, reading.power_limit) == (85.0, 300.0)
+    assert (reading.frequency, reading.memory_frequency) == (1800.0, 1000.0)
+
+
+def test_connectors_and_nvidia_cards_are_skipped(tmp_path: Path) -> None:
+    make_amdgpu(tmp_path, "card10")
+    make_amdgpu(tmp_path, "card2")
+    make_amdgpu(tmp_path, "card2-DP-1")
+    make_card(tmp_path, "card1", {"vendor": "0x10de", "uevent": "DRIVER=nvidia"}, {}, {})
+
+    assert [device.index for device in Drm(str(tmp_path)).devices()] == [2, 10]
+
+
+def test_i915_reports_clock_temperature_and_power(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    card_path = make_i915(tmp_path, "card0")
+    clock: List[float] = [100.0]
+    monkeypatch.setattr(drm_module.time, "monotonic", lambda: clock[0])
+    drm = Drm(str(tmp_path))
+
+    (first,) = drm.read()
+    (card_path / "device" / "hwmon" / "hwmon3" / "energy1_input").write_text("21000000\n")
+    clock[0] = 102.0
+    (second,) = drm.read()
+
+    assert first.device.name == "Intel i915"
+    assert first.device.max_graphics_clock == 1300
+    assert (first.usage, first.memory_usage, first.memory_used) == (None, None, None)
+    assert (first.frequency, first.memory_frequency, first.temperature) == (900.0, None, 48)
+    # The power is the change of the energy counter, so the first reading has none.
+    assert first.power is None
+    assert second.power == 10.0
+
+
+def test_parse_dpm_levels() -> None:
+    assert parse_dpm_levels(SCLK) == (1800.0, 2500.0)
+    assert parse_dpm_levels("0: 300MHz\n1: 1200MHz\n") == (0.0, 1200.0)
+    assert parse_dpm_levels("") == (0.0, 0.0)
+    assert parse_dpm_levels("0: 500Mhz\n1: auto *\nOD_RANGE:\n") == (0.0, 500.0)
+
+
+def test_unexpected_dpm_table_only_loses_its_clock(tmp_path: Path) -> None:
+    card_path = make_amdgpu(tmp_path, "card0")
+    (card_path / "device" / "pp_dpm_sclk").write_text("0: unknown *\n")
+    drm = Drm(str(tmp_path))
+
+    (device,) = drm.devices()
+    (reading,) = drm.read()
+
+    assert (device.max_graphics_clock, device.max_memory_clock) == (0, 1000)
+    assert (reading.usage, reading.frequency, reading.memory_frequency) == (37, 0.0, 1000.0)
+
+
+def test_attributes_are_re_read(tmp_path: Path) -> None:
+    card_path = make_amdgpu(tmp_path, "card0")
+    drm = Drm(str(tmp_path))
+    drm.read()
+
+    (card_path / "device" / "gpu_busy_percent").write_text("99\n")
+    (card_path / "device" / "pp_dpm_sclk").write_text("0: 500Mhz *\n1: 1800Mhz\n2: 2500Mhz\n")
+    (reading,) = drm.read()
+
+    assert (reading.usage, reading.frequency) == (99, 500.0)
+
+
+def test_failed_read_resolves_the_cards_again(tmp_path: Path) -> None:
+    card_path = make_amdgpu(tmp_path, "card0")
+    drm = Drm(str(tmp_path))
+    drm.read()
+
+    (card_path / "device" / "hwmon" / "hwmon3" / "temp1_input").write_text("hot\n")
+    assert drm.read() == []
+
+    (card_path / "device" / "hwmon" / "hwmon3" / "temp1_input").write_text("61000\n")
+    assert [reading.temperature for reading in drm.read()] == [61]
+
+
+def test_no_processes_are_reported(tmp_path: Path) -> None:
+    make_amdgpu(tmp_path, "card0")
+
+    assert Drm(str(tmp_path)).read_processes() == []
+
+
+def test_the_process_shares_one_drm() -> None:
+    assert get_drm() is get_drm()
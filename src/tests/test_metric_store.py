@@ -0,0 +1,79 @@
+import math
+from pathlib import Path
+from typing import List
+
+from data_storage.metrics.metric_store import MetricStore, MetricStoreReader
+
+
+def open_store(tmp_path: Path, capacity: int = 3) -> MetricStore:
+    return MetricStore(str(tmp_path / "metrics.bin"), ["cpu", "ram"], capacity=capacity)
+
+
+def read(tmp_path: Path, name: str = "cpu") -> List[float]:
+    reader = MetricStoreReader(str(tmp_path / "metrics.bin"))
+    try:
+        return reader.column(name)
+    finally:
+        reader.close()
+
+
+def test_ring_keeps_the_newest_records(tmp_path: Path) -> None:
+    store = open_store(tmp_path)
+    for i in range(5):
+        store.append(1000.0 + i, {"cpu": 100.0 + i, "unknown": 1.0})
+    store.close()
+
+    reader = MetricStoreReader(str(tmp_path / "metrics.bin"))
+    assert (reader.fields, reader.count) == (["cpu", "ram"], 5)
+    assert reader.timestamps() == [1002.0, 1003.0, 1004.0]
+    assert reader.column("cpu", last=2) == [103.0, 104.0]
+    assert all(math.isnan(value) for value in reader.column("ram"))
+    reader.close()
+
+
+def test_record_interrupted_mid_write_is_dropped(tmp_path: Path) -> None:
+    store = open_store(tmp_path)
+    for i in range(5):
+        store.append(1000.0 + i, {"cpu": 100.0 + i})
+    # Die while overwriting the slot of record 3: the sequence number is cleared, the values half new.
+    assert store._map is not None
+    offset = store._header_size + (store.count % store.capacity) * store._record.size
+    store._sequence.pack_into(store._map, offset, 0.0)
+    store._values.pack_into(store._map, offset + 8, 1005.0, 105.0, math.nan)
+    store.close()
+
+    assert read(tmp_path) == [103.0, 104.0]
+
+    reopened = open_store(tmp_path)
+    assert reopened.count == 5
+    reopened.append(1005.0, {"cpu": 105.0})
+    reopened.close()
+    assert read(tmp_path) == [103.0, 104.0, 105.0]
+
+
+def test_record_committed_before_the_header_is_recovered(tmp_path: Path) -> None:
+    store = open_store(tmp_path)
+    for i in range(2):
+        store.append(1000.0 + i, {"cpu": 100.0 + i})
+    # Die after the record carries its sequence number, but before the header count is updated.
+    assert store._map is not None
+    offset = store._header_size + (store.count % store.capacity) * store._record.size
+    store._record.pack_into(store._map, offset, 3.0, 1002.0, 102.0, 50.0)
+    store.close()
+
+    assert read(tmp_path) == [100.0, 101.0]
+    reopened = open_store(tmp_path)
+    assert reopened.count == 3
+    reopened.close()
+    assert read(tmp_path) == [100.0, 101.0, 102.0]
+    assert read(tmp_path, "ram")[-1] == 50.0
+
+
+def test_changed_fields_recreate_the_store(tmp_path: Path) -> None:
+    first = open_store(tmp_path)
+    first.append(1000.0, {"cpu": 1.0})
+    first.close()
+    store = MetricStore(str(tmp_path / "metrics.bin"), ["cpu", "ram", "gpu"], capacity=3)
+
+    assert store.count == 0
+    store.close()
@@ -0,0 +1,181 @@
+from pathlib import Path
+from typing import Dict, List
+
+from system.video_cards.nvidia import Nvidia
+from tests.fake_pynvml import FakeGpu, FakeNvml, NVMLError_GpuIsLost, NVMLError_NoPermission
+
+
+def make_nvidia(count: int = 2) -> Nvidia:
+    return Nvidia(FakeNvml([FakeGpu(f"NVIDIA Fake {index}") for index in range(count)]))
+
+
+def fake(nvidia: Nvidia) -> FakeNvml:
+    assert isinstance(nvidia.nvml, FakeNvml)
+    return nvidia.nvml
+
+
+def gpus(nvidia: Nvidia) -> List[FakeGpu]:
+    return fake(nvidia).gpus
+
+
+def test_read_reports_every_gpu() -> None:
+    nvidia = make_nvidia()
+    gpus(nvidia)[1].usage = 7
+    gpus(nvidia)[1].throttle_reasons = 0x1 | 0x4 | 0x20
+
+    first, second = nvidia.read()
+
+    assert (first.device.index, first.device.name, first.device.uuid) == (0, "NVIDIA Fake 0", "GPU-0")
+    assert first.device.pci_bus_id == "00000000:01:00.0"
+    assert (first.device.memory_total, first.device.max_graphics_clock, first.device.max_memory_clock) == (
+        8 * 1024**3,
+        2000,
+        6000,
+    )
+    assert (first.usage, first.memory_usage, first.memory_used, first.temperature) == (42, 10, 1024**3, 60)
+    assert (first.power, first.power_limit) == (120.0, 250.0)
+    assert (first.frequency, first.memory_frequency) == (1500.0, 5000.0)
+    assert first.throttled_by == []
+    assert second.usage == 7
+    assert second.throttled_by == ["power cap", "thermal"]
+
+
+def test_devices_are_resolved_once() -> None:
+    nvidia = make_nvidia()
+    nvidia.read()
+    count_calls = fake(nvidia).calls["nvmlDeviceGetCount"]
+
+    nvidia.read()
+    nvidia.read()
+
+    assert fake(nvidia).calls["nvmlDeviceGetCount"] == count_calls
+    assert fake(nvidia).calls["nvmlDeviceGetHandleByIndex"] == 2
+    assert fake(nvidia).calls["nvmlDeviceGetName"] == 2
+    assert fake(nvidia).calls["nvmlDeviceGetUtilizationRates"] == 6
+
+
+def test_unsupported_query_is_not_retried() -> None:
+    nvidia = make_nvidia(1)
+    gpus(nvidia)[0].unsupported.add("nvmlDeviceGetPowerUsage")
+
+    readings = [nvidia.read()[0] for _ in range(3)]
+
+    assert [reading.power for reading in readings] == [None, None, None]
+    assert readings[-1].power_limit == 250.0
+    assert fake(nvidia).calls["nvmlDeviceGetPowerUsage"] == 1
+
+
+def test_failing_optional_query_leaves_out_the_value() -> None:
+    nvidia = make_nvidia()
+    gpus(nvidia)[0].errors["nvmlDeviceGetPowerUsage"] = NVMLError_NoPermission()
+
+    first, second = nvidia.read()
+    nvidia.read()
+
+    assert first.power is None
+    assert second.power == 120.0
+    # The query is retried, but the devices are not resolved again.
+    assert fake(nvidia).calls["nvmlDeviceGetPowerUsage"] == 4
+    assert fake(nvidia).calls["nvmlDeviceGetHandleByIndex"] == 2
+
+
+def test_refused_utilisation_and_memory_only_affect_their_gpu() -> None:
+    nvidia = make_nvidia()
+    gpus(nvidia)[0].unsupported.add("nvmlDeviceGetUtilizationRates")
+    gpus(nvidia)[1].errors["nvmlDeviceGetMemoryInfo"] = NVMLError_NoPermission()
+
+    first, second = nvidia.read()
+    nvidia.read()
+
+    assert (first.usage, first.memory_usage, first.memory_used) == (None, None, 1024**3)
+    assert (second.usage, second.memory_usage, second.memory_used) == (42, 10, None)
+    assert first.frequency == second.frequency == 1500.0
+    assert fake(nvidia).calls["nvmlDeviceGetUtilizationRates"] == 3
+
+
+def test_unsupported_memory_clock_keeps_the_graphics_clock() -> None:
+    nvidia = make_nvidia(1)
+    del gpus(nvidia)[0].clocks[FakeNvml.NVML_CLOCK_MEM]
+
+    readings = [nvidia.read()[0] for _ in range(2)]
+
+    assert [(reading.frequency, reading.memory_frequency) for reading in readings] == [(1500.0, None)] * 2
+
+
+def test_lost_gpu_is_resolved_again() -> None:
+    nvidia = make_nvidia()
+    gpus(nvidia)[1].errors["nvmlDeviceGetTemperature"] = NVMLError_GpuIsLost()
+
+    assert nvidia.read() == []
+
+    del gpus(nvidia)[1].errors["nvmlDeviceGetTemperature"]
+    assert len(nvidia.read()) == 2
+    assert fake(nvidia).calls["nvmlDeviceGetHandleByIndex"] == 4
+
+
+def test_without_gpus_nothing_is_read() -> None:
+    nvidia = make_nvidia(0)
+
+    assert nvidia.devices() == []
+    assert nvidia.read() == []
+    assert fake(nvidia).calls["nvmlDeviceGetUtilizationRates"] == 0
+
+
+def make_proc(tmp_path: Path, names: Dict[int, str]) -> str:
+    for pid, name in names.items():
+        (tmp_path / str(pid)).mkdir()
+        (tmp_path / str(pid) / "comm").write_text(name + "\n")
+    return str(tmp_path)
+
+
+def test_read_processes_merges_the_contexts_of_a_process(tmp_path: Path) -> None:
+    nvml = FakeNvml([FakeGpu(), FakeGpu()])
+    nvml.gpus[0].compute_processes = [(100, 256), (200, None)]
+    nvml.gpus[0].graphics_processes = [(100, 512)]
+    nvml.gpus[1].compute_processes = [(100, 64)]
+    nvidia = Nvidia(nvml, proc_path=make_proc(tmp_path, {100: "python", 200: "Xorg"}))
+
+    processes = {(process.pid, process.gpu): process for process in nvidia.read_processes()}
+
+    # A process with a compute and a graphics context on one GPU is listed once, with its larger memory.
+    assert sorted(processes) == [(100, 0), (100, 1), (200, 0)]
+    assert processes[100, 0].memory_used == 512
+    assert processes[100, 1].memory_used == 64
+    assert processes[200, 0].memory_used is None
+    assert (processes[100, 0].name, processes[200, 0].name) == ("python", "Xorg")
+
+
+def test_read_processes_names_invisible_pids(tmp_path: Path) -> None:
+    nvml = FakeNvml([FakeGpu()])
+    nvml.gpus[0].compute_processes = [(300, 128)]
+    nvidia = Nvidia(nvml, proc_path=make_proc(tmp_path, {}))
+
+    assert [process.name for process in nvidia.read_processes()] == ["?"]
+
+
+def test_read_processes_only_uses_new_utilisation_samples(tmp_path: Path) -> None:
+    nvml = FakeNvml([FakeGpu()])
+    nvml.gpus[0].compute_processes = [(100, 256)]
+    nvml.gpus[0].process_samples = [(10, 100, 20, 1), (20, 100, 35, 2)]
+    nvidia = Nvidia(nvml, proc_path=make_proc(tmp_path, {100: "python"}))
+
+    first = nvidia.read_processes()[0]
+    # No sample since the previous call: NVML answers NotFound.
+    second = nvidia.read_processes()[0]
+    nvml.gpus[0].process_samples.append((30, 100, 50, 3))
+    third = nvidia.read_processes()[0]
+
+    assert (first.sm_usage, first.memory_usage) == (35, 2)
+    assert second.sm_usage is None
+    assert (third.sm_usage, third.memory_usage) == (50, 3)
+    assert nvml.last_seen == [0, 20, 20]
+
+
+def test_read_processes_returns_the_heaviest(tmp_path: Path) -> None:
+    nvml = FakeNvml([FakeGpu()])
+    nvml.gpus[0].compute_processes = [(100, 1024), (200, 64), (300, 2048)]
+    nvml.gpus[0].process_samples = [(10, 100, 5, 0), (10, 200, 60, 0)]
+    nvidia = Nvidia(nvml, proc_path=make_proc(tmp_path, {100: "a", 200: "b", 300: "c"}))
+
+    assert [process.pid for process in nvidia.read_processes(2)] == [200, 100]
+    assert [process.pid for process in nvidia.read_processes()] == [300, 100, 200]
@@ -0,0 +1,77 @@
+from system.checkers.nvidia_checker import CheckNvidia
+from system.video_cards.nvidia import Nvidia
+from system.video_cards.nvml_session import NvmlSession
+from tests.fake_pynvml import FakeGpu, FakeNvml
+
+
+def test_probe_runs_once_and_last_release_shuts_down() -> None:
+    nvml = FakeNvml([FakeGpu(), FakeGpu()])
+    session = NvmlSession(nvml)
+
+    first = session.acquire()
+    second = session.acquire()
+    session.release()
+
+    assert first is second
+    assert (first.available, first.device_count, first.driver_version, first.cuda_driver_version) == (
+        True,
+        2,
+        "550.54.14",
+        12040,
+    )
+    assert nvml.calls["nvmlInit"] == 1
+    assert nvml.calls["nvmlDeviceGetCount"] == 1
+    assert nvml.calls["nvmlShutdown"] == 0
+
+    session.release()
+    session.release()
+
+    assert nvml.calls["nvmlShutdown"] == 1
+
+
+def test_reacquiring_initialises_again_without_probing() -> None:
+    nvml = FakeNvml([FakeGpu()])
+    session = NvmlSession(nvml)
+    session.acquire()
+    session.release()
+
+    assert session.acquire().available
+    assert nvml.calls["nvmlInit"] == 2
+    assert nvml.calls["nvmlDeviceGetCount"] == 1
+
+
+def test_missing_library_is_reported_not_raised() -> None:
+    nvml = FakeNvml(library_found=False)
+    session = NvmlSession(nvml)
+
+    capabilities = session.acquire()
+    session.release()
+
+    assert not capabilities.available
+    assert "libnvidia-ml.so" in capabilities.error
+    assert nvml.calls["nvmlShutdown"] == 0
+
+
+def test_no_gpu_is_not_available() -> None:
+    capabilities = NvmlSession(FakeNvml([])).acquire()
+
+    assert not capabilities.available
+    assert capabilities.error == "No NVIDIA GPU"
+
+
+def test_checker_and_collector_share_one_session() -> None:
+    nvml = FakeNvml([FakeGpu()])
+    session = NvmlSession(nvml)
+    checker = CheckNvidia(session)
+    nvidia = Nvidia(session=session)
+
+    assert checker.is_nvidia_gpu_present()
+    assert len(nvidia.read()) == 1
+
+    checker.close()
+    checker.close()
+    assert nvml.calls["nvmlShutdown"] == 0
+
+    nvidia.close()
+    assert nvml.calls["nvmlInit"] == 1
+    assert nvml.calls["nvmlShutdown"] == 1